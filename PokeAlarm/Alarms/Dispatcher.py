@@ -0,0 +1,120 @@
+# Standard Library Imports
+import traceback
+# 3rd Party Imports
+import gevent
+from gevent.queue import Queue, Full, Empty
+# Local Imports
+
+# Policies available when a Dispatcher queue is full
+overflow_options = ['drop_oldest', 'drop_new', 'block']
+
+
+class Dispatcher(object):
+    """ Outbound stage used to send notifications for a single Alarm.
+
+    Notifications are placed on a bounded queue and sent by a pool of worker
+    greenlets, so a slow or unreachable service never holds up the Manager.
+    """
+
+    def __init__(self, mgr, name, alarm, concurrency=1, queue_size=1000,
+                 overflow='drop_oldest'):
+        """ Initializes a new dispatcher for the given alarm. """
+        self._log = mgr.get_child_logger("alarms")
+        self._name = name
+        self._alarm = alarm
+
+        if concurrency < 1:
+            raise ValueError("Alarm concurrency must be at least 1.")
+        if queue_size < 1:
+            raise ValueError("Alarm queue size must be at least 1.")
+        if overflow not in overflow_options:
+            raise ValueError("{} is not a valid overflow policy! Options: "
+                             "{}".format(overflow, overflow_options))
+        self._concurrency = concurrency
+        self._overflow = overflow
+
+        self._queue = Queue(maxsize=queue_size)
+        self._workers = []
+        self._closing = False
+
+        # Counters
+        self._queued = 0
+        self._sent = 0
+        self._failed = 0
+        self._dropped = 0
+        self._max_depth = 0
+
+    def start(self):
+        """ Spawns the workers used to send notifications. """
+        self._closing = False
+        for _ in range(self._concurrency):
+            self._workers.append(gevent.spawn(self._run))
+
+    def stop(self, timeout=10):
+        """ Sends any remaining notifications and stops the workers. """
+        self._closing = True
+        gevent.joinall(self._workers, timeout=timeout)
+        remaining = [w for w in self._workers if not w.ready()]
+        if len(remaining) > 0:
+            self._log.warning(
+                "Alarm %s could not finish sending in time! %s "
+                "notification(s) were discarded.",
+                self._name, self._queue.qsize())
+            gevent.killall(remaining, timeout=2)
+        self._workers = []
+
+    def put(self, func_name, dts):
+        """ Queues a notification, returning False if it was dropped. """
+        item = (func_name, dts)
+        if self._overflow == 'block':
+            self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except Full:
+                self._dropped += 1
+                if self._dropped % 100 == 1:
+                    self._log.warning(
+                        "Alarm %s queue is full! %s notification(s) have "
+                        "been dropped so far.", self._name, self._dropped)
+                if self._overflow == 'drop_new':
+                    return False
+                try:  # Make room by discarding the oldest notification
+                    self._queue.get_nowait()
+                except Empty:
+                    pass
+                self._queue.put_nowait(item)
+        self._queued += 1
+        self._max_depth = max(self._max_depth, self._queue.qsize())
+        return True
+
+    def get_stats(self):
+        """ Returns a dict of counters describing this dispatcher. """
+        return {
+            'depth': self._queue.qsize(),
+            'max_depth': self._max_depth,
+            'queued': self._queued,
+            'sent': self._sent,
+            'failed': self._failed,
+            'dropped': self._dropped
+        }
+
+    def _run(self):
+        """ Worker loop that sends queued notifications. """
+        while True:
+            try:
+                func_name, dts = self._queue.get(block=True, timeout=1)
+            except Empty:
+                if self._closing:
+                    break
+                continue
+            try:
+                getattr(self._alarm, func_name)(dts)
+                self._sent += 1
+            except Exception as e:
+                self._failed += 1
+                self._log.error(
+                    "Alarm %s encountered error while sending notification: "
+                    "%s: %s", self._name, type(e).__name__, e)
+                self._log.debug(
+                    "Stack trace: \n {}".format(traceback.format_exc()))
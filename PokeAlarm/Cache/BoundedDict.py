@@ -0,0 +1,88 @@
+# Standard Library Imports
+from collections import OrderedDict
+import re
+import sys
+# 3rd Party Imports
+# Local Imports
+from PokeAlarm import config
+
+# Items kept in each map by default (0 keeps them all)
+DEFAULT_MAP_SIZE = 200000
+
+
+class BoundedDict(OrderedDict):
+    """ Dict that forgets its least recently used items past a capacity.
+
+    It also keeps a rough count of the memory its items take, from the size
+    of each key and value plus the overhead of an entry in the dict.
+    """
+
+    # Approximate bytes taken by an entry, besides its key and value
+    entry_overhead = 100
+
+    def __init__(self, capacity=0, items=()):
+        """ Creates a dict holding at most capacity items (0 for any). """
+        super(BoundedDict, self).__init__()
+        self._capacity = capacity
+        self._bytes = 0
+        self._evicted = 0
+        for key, value in items:
+            self[key] = value
+
+    def __setitem__(self, key, value):
+        old = super(BoundedDict, self).get(key, self)
+        if old is not self:
+            self._bytes -= sys.getsizeof(old)
+            self.move_to_end(key)
+        else:
+            self._bytes += sys.getsizeof(key) + self.entry_overhead
+        super(BoundedDict, self).__setitem__(key, value)
+        self._bytes += sys.getsizeof(value)
+        if 0 < self._capacity < len(self):
+            key, value = self.popitem(last=False)
+            self._bytes -= (sys.getsizeof(key) + sys.getsizeof(value)
+                            + self.entry_overhead)
+            self._evicted += 1
+
+    def __delitem__(self, key):
+        self._bytes -= (sys.getsizeof(key) + sys.getsizeof(self[key])
+                        + self.entry_overhead)
+        super(BoundedDict, self).__delitem__(key)
+
+    def get(self, key, default=None):
+        """ Returns the value of a key, marking it as recently used. """
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def copy(self):
+        return BoundedDict(self._capacity, self.items())
+
+    def __reduce__(self):
+        return BoundedDict, (self._capacity, list(self.items()))
+
+    def get_stats(self):
+        """ Returns the size, capacity and approximate memory of the dict. """
+        return {
+            'size': len(self),
+            'capacity': self._capacity,
+            'evicted': self._evicted,
+            'bytes': self._bytes
+        }
+
+
+def parse_map_limit(value):
+    """ Parses the limit of a map given in the format 'name:size'. """
+    match = re.match(r'^\s*([a-z_]+)\s*:\s*(\d+)\s*$', str(value).lower())
+    if match is None:
+        raise ValueError("'{}' is not a valid map limit! Map limits must be "
+                         "in the format 'name:size'.".format(value))
+    return match.group(1), int(match.group(2))
+
+
+def new_map(name, items=()):
+    """ Returns a BoundedDict with the capacity configured for a map. """
+    capacity = dict(config.get('CACHE_MAP_LIMITS', ())).get(
+        name, config.get('CACHE_MAP_SIZE', DEFAULT_MAP_SIZE))
+    return BoundedDict(capacity, items)
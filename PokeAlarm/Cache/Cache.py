@@ -1,9 +1,43 @@
 # Standard Library Imports
 from datetime import datetime
+import heapq
 # 3rd Party Imports
+import gevent
 # Local Imports
 from PokeAlarm import Unknown
 from PokeAlarm.Utils import get_image_url
+from .BoundedDict import new_map
+from .MonsterHistory import MonsterHistory
+
+
+class ExpiryWheel(object):
+    """ Keys of a history, grouped by the minute they expire in.
+
+    Cleaning only visits the minutes that have passed, instead of every
+    key in the history. Keys whose expiration changed are left in their
+    old minute, and are checked against the history before being removed.
+    Keys expiring during the current minute are left for the next clean.
+    """
+
+    def __init__(self):
+        self._slots = {}  # minute -> list of keys expiring in it
+        self._order = []  # heap of the minutes in _slots
+
+    def add(self, key, expiration):
+        """ Schedules a key to be checked once its expiration has passed. """
+        slot = expiration.replace(second=0, microsecond=0)
+        keys = self._slots.get(slot)
+        if keys is None:
+            keys = self._slots[slot] = []
+            heapq.heappush(self._order, slot)
+        keys.append(key)
+
+    def pop_expired(self, now):
+        """ Yields the keys of every minute that has entirely passed. """
+        current = now.replace(second=0, microsecond=0)
+        while len(self._order) > 0 and self._order[0] < current:
+            for key in self._slots.pop(heapq.heappop(self._order)):
+                yield key
 
 
 class Cache(object):
@@ -11,129 +45,102 @@ class Cache(object):
 
     This object caches and manages information in Memory. Information will
     be lost between run times if save has not been implemented correctly.
+    Information shared by every manager is kept in the WorldState instead.
     """
 
     default_image_url = get_image_url("regular/gyms/0.png"),
 
+    # Expired items removed before yielding to other greenlets
+    clean_batch_size = 1000
+
+    # Dicts holding the expiration of items, which are cleaned out
+    hist_names = ('mon_hist', 'stop_hist', 'egg_hist', 'raid_hist',
+                  'quest_hist', 'grunt_hist')
+
+    # Dicts that never expire, limited to their most recently used items
+    map_names = ('gym_team', 'gym_slots', 'quest_reward', 'quest_task',
+                 'quest_last_modified')
+
     def __init__(self, mgr):
         """ Initializes a new cache object for storing data between events. """
         self._log = mgr.get_child_logger("cache")
 
-        self._mon_hist = {}
+        self._mon_hist = MonsterHistory()
         self._stop_hist = {}
         self._egg_hist = {}
         self._raid_hist = {}
         self._quest_hist = {}
         self._grunt_hist = {}
-        self._gym_team = {}
-        self._gym_slots = {}
-        self._gym_name = {}
-        self._gym_desc = {}
-        self._gym_image = {}
-        self._cell_weather_id = {}
-        self._severity_id = {}
-        self._day_or_night_id = {}
-        self._quest_reward = {}
-        self._quest_task = {}
-        self._quest_last_modified = {}
+        for name in self.map_names:
+            setattr(self, '_' + name, new_map(name))
+        self._build_expiry()
 
     def monster_expiration(self, mon_id, expiration=None):
         """ Update and return the datetime that a monster expires."""
         if expiration is not None:
-            self._mon_hist[mon_id] = expiration
+            self._update('mon_hist', mon_id, expiration)
         return self._mon_hist.get(mon_id)
 
     def stop_expiration(self, stop_id, expiration=None):
         """ Update and return the datetime that a stop expires."""
         if expiration is not None:
-            self._stop_hist[stop_id] = expiration
+            self._update('stop_hist', stop_id, expiration)
         return self._stop_hist.get(stop_id)
 
     def egg_expiration(self, egg_id, expiration=None):
         """ Update and return the datetime that an egg expires."""
         if expiration is not None:
-            self._egg_hist[egg_id] = expiration
+            self._update('egg_hist', egg_id, expiration)
         return self._egg_hist.get(egg_id)
 
     def raid_expiration(self, raid_id, expiration=None):
         """ Update and return the datetime that a raid expires."""
         if expiration is not None:
-            self._raid_hist[raid_id] = expiration
+            self._update('raid_hist', raid_id, expiration)
         return self._raid_hist.get(raid_id)
 
     def quest_expiration(self, stop_id, last_modified=None):
         """ Update and return the datetime that the stop last had a quest."""
         if last_modified is not None:
-            self._quest_hist[stop_id] = last_modified
+            self._update('quest_hist', stop_id, last_modified)
         return self._quest_hist.get(stop_id)
 
     def grunt_expiration(self, stop_id, expiration=None):
         """ Update and return the datetime that a stop expires."""
         if expiration is not None:
-            self._grunt_hist[stop_id] = expiration
+            self._update('grunt_hist', stop_id, expiration)
         return self._grunt_hist.get(stop_id)
 
     def gym_team(self, gym_id, team_id=Unknown.TINY):
         """ Update and return the team_id of a gym. """
         if Unknown.is_not(team_id):
-            self._gym_team[gym_id] = team_id
+            self._update('gym_team', gym_id, team_id)
         return self._gym_team.get(gym_id, Unknown.TINY)
 
     def gym_slots(self, gym_id, available_slots=Unknown.TINY):
         """ Update and return the team_id of a gym. """
         if Unknown.is_not(available_slots):
-            self._gym_slots[gym_id] = available_slots
+            self._update('gym_slots', gym_id, available_slots)
         return self._gym_slots.get(gym_id, Unknown.TINY)
 
-    def gym_name(self, gym_id, gym_name=Unknown.REGULAR):
-        """ Update and return the gym_name for a gym. """
-        if Unknown.is_not(gym_name):
-            self._gym_name[gym_id] = gym_name
-        return self._gym_name.get(gym_id, Unknown.REGULAR)
-
-    def gym_desc(self, gym_id, gym_desc=Unknown.REGULAR):
-        """ Update and return the gym_desc for a gym. """
-        if Unknown.is_not(gym_desc):
-            self._gym_desc[gym_id] = gym_desc
-        return self._gym_desc.get(gym_id, Unknown.REGULAR)
-
-    def gym_image(self, gym_id, gym_image=Unknown.REGULAR):
-        """ Update and return the gym_image for a gym. """
-        if Unknown.is_not(gym_image):
-            self._gym_image[gym_id] = gym_image
-        return self._gym_image.get(gym_id, get_image_url('icons/gym_0.png'))
-
-    def cell_weather_id(self, s2_cell_id, cell_weather_id=Unknown.REGULAR):
-        """ Update and return weather_id for a cell """
-        if Unknown.is_not(cell_weather_id):
-            self._cell_weather_id[s2_cell_id] = cell_weather_id
-        return self._cell_weather_id.get(s2_cell_id, Unknown.REGULAR)
-
-    def severity_id(self, s2_cell_id, severity_id=Unknown.REGULAR):
-        """ Update and return severity_id for a cell """
-        if Unknown.is_not(severity_id):
-            self._severity_id[s2_cell_id] = severity_id
-        return self._severity_id.get(s2_cell_id, Unknown.REGULAR)
-
-    def day_or_night_id(self, s2_cell_id, day_or_night_id=Unknown.REGULAR):
-        """ Update and return day_or_night_id for a cell """
-        if Unknown.is_not(day_or_night_id):
-            self._day_or_night_id[s2_cell_id] = day_or_night_id
-        return self._day_or_night_id.get(s2_cell_id, Unknown.REGULAR)
-
     def quest_reward(self, stop_id, reward=None, task=None,
                      last_modified=None):
         """ Update and return the reward and task for a quest."""
         if Unknown.is_not(reward):
-            self._quest_reward[stop_id] = reward
+            self._update('quest_reward', stop_id, reward)
         if Unknown.is_not(task):
-            self._quest_task[stop_id] = task
+            self._update('quest_task', stop_id, task)
         if Unknown.is_not(last_modified):
-            self._quest_last_modified[stop_id] = last_modified
+            self._update('quest_last_modified', stop_id, last_modified)
         return self._quest_reward.get(stop_id, Unknown.REGULAR), \
             self._quest_task.get(stop_id, Unknown.REGULAR), \
             self._quest_last_modified.get(stop_id, Unknown.REGULAR)
 
+    def get_stats(self):
+        """ Returns the size and approximate memory of each map. """
+        return {name: getattr(self, '_' + name).get_stats()
+                for name in self.map_names}
+
     def clean_and_save(self):
         """ Cleans the cache and saves the contents if capable. """
         self._clean_hist()
@@ -143,16 +150,43 @@ class Cache(object):
         """ Export the data to a more permanent location. """
         pass  # Mem cache isn't backed up.
 
+    def _update(self, name, key, value):
+        """ Stores a value in one of the dicts of the cache. """
+        getattr(self, '_' + name)[key] = value
+        wheel = self._expiry.get(name)
+        if wheel is not None:  # Schedule the expiration of history
+            wheel.add(key, value)
+
+    def _build_expiry(self):
+        """ Schedules the expiration of every item in the histories. """
+        self._expiry = {}
+        for name in self.hist_names:
+            hist = getattr(self, '_' + name)
+            if isinstance(hist, MonsterHistory):
+                continue  # Keeps its own wheel of slots
+            wheel = self._expiry[name] = ExpiryWheel()
+            for key, expiration in hist.items():
+                wheel.add(key, expiration)
+
     def _clean_hist(self):
         """ Clean expired objects to free up memory. """
-        for hist in (
-                self._mon_hist, self._stop_hist, self._egg_hist,
-                self._raid_hist, self._quest_hist, self._grunt_hist):
-            old = []
-            now = datetime.utcnow()
-            for key, expiration in hist.items():
-                if expiration < now:  # Track expired items
-                    old.append(key)
-            for key in old:  # Remove expired events
-                del hist[key]
-        self._log.debug("Cleared %s items from cache.", len(old))
+        now = datetime.utcnow()
+        checked, removed = 0, 0
+        for name in self.hist_names:
+            hist = getattr(self, '_' + name)
+            if name not in self._expiry:
+                for cleared in hist.clean(now):
+                    removed += cleared
+                    checked += 1
+                    if checked % self.clean_batch_size == 0:
+                        gevent.sleep(0)  # Let other greenlets run
+                continue
+            for key in self._expiry[name].pop_expired(now):
+                expiration = hist.get(key)
+                if expiration is not None and expiration < now:
+                    del hist[key]
+                    removed += 1
+                checked += 1
+                if checked % self.clean_batch_size == 0:
+                    gevent.sleep(0)  # Let other greenlets run
+        self._log.debug("Cleared %s items from cache.", removed)
@@ -6,7 +6,8 @@ import portalocker
 import traceback
 # Local Imports
 from ..Utils import get_path
-from . import Cache
+from . import Cache, MonsterHistory
+from .BoundedDict import new_map
 
 
 class FileCache(Cache):
@@ -31,20 +32,17 @@ class FileCache(Cache):
         try:
             with portalocker.Lock(self._file, mode="rb") as f:
                 data = pickle.load(f)
-                self._mon_hist = data.get('mon_hist', {})
+                self._mon_hist = data.get('mon_hist', MonsterHistory())
+                if isinstance(self._mon_hist, dict):  # From older versions
+                    self._mon_hist = MonsterHistory(self._mon_hist.items())
                 self._stop_hist = data.get('stop_hist', {})
                 self._grunt_hist = data.get('grunt_hist', {})
                 self._egg_hist = data.get('egg_hist', {})
                 self._raid_hist = data.get('raid_hist', {})
-                self._gym_team = data.get('gym_team', {})
-                self._gym_name = data.get('gym_name', {})
-                self._gym_desc = data.get('gym_desc', {})
-                self._gym_image = data.get('gym_image', {})
-                self._cell_weather_id = data.get('cell_weather_id', {})
-                self._severity_id = data.get('severity_id', {})
-                self._day_or_night_id = data.get('day_or_night_id', {})
-                self._quest_reward = data.get('quest_reward', {})
-                self._quest_task = data.get('quest_task', {})
+                for name in ('gym_team', 'quest_reward', 'quest_task'):
+                    setattr(self, '_' + name,
+                            new_map(name, data.get(name, {}).items()))
+                self._build_expiry()
 
                 self._log.debug("Cache loaded successfully.")
         except Exception as e:
@@ -63,12 +61,6 @@ class FileCache(Cache):
             'egg_hist': self._egg_hist,
             'raid_hist': self._raid_hist,
             'gym_team': self._gym_team,
-            'gym_name': self._gym_name,
-            'gym_desc': self._gym_desc,
-            'gym_image': self._gym_image,
-            'cell_weather_id': self._cell_weather_id,
-            'severity_id': self._severity_id,
-            'day_or_night_id': self._day_or_night_id,
             'quest_reward': self._quest_reward,
             'quest_task': self._quest_task
         }
@@ -0,0 +1,173 @@
+# Standard Library Imports
+from glob import glob
+import os
+import pickle
+import traceback
+# 3rd Party Imports
+import gevent
+# Local Imports
+from ..Utils import get_path
+from . import Cache, MonsterHistory
+from .BoundedDict import new_map
+
+
+class JournalCache(Cache):
+    """ Cache that saves its changes as they happen.
+
+    Every change is appended to a journal, written out every few seconds.
+    When the cache is saved, a snapshot of its contents is written in the
+    background and the journals it includes are removed. On start up the
+    snapshot is loaded and the remaining journals are replayed on top of it.
+    """
+
+    # Dicts saved by this cache
+    table_names = Cache.hist_names + (
+        'gym_team', 'gym_slots', 'quest_reward', 'quest_task',
+        'quest_last_modified')
+
+    # Seconds that changes may wait before being written to the journal
+    flush_interval = 2
+
+    def __init__(self, mgr):
+        """ Initializes a new cache object for storing data between events. """
+        super(JournalCache, self).__init__(mgr)
+        self._name = mgr.get_name()
+        self._base = get_path(os.path.join("cache", self._name))
+        self._pending = []
+        self._flushing = None
+        self._compacting = None
+
+        cache_folder = get_path("cache")
+        if not os.path.exists(cache_folder):
+            os.makedirs(cache_folder)
+        last = self._load()
+        self._build_expiry()
+
+        # Start a new journal for the changes made from now on
+        self._journal_num = last + 1
+        self._journal = open(self._get_journal(self._journal_num), 'ab')
+
+    def _get_journal(self, num):
+        return "{}.journal.{}".format(self._base, num)
+
+    def _get_journals(self):
+        """ Returns a sorted list of (number, path) of every journal. """
+        journals = []
+        for path in glob(self._base + ".journal.*"):
+            try:
+                journals.append((int(path.rsplit('.', 1)[1]), path))
+            except ValueError:
+                continue
+        return sorted(journals)
+
+    def _load(self):
+        """ Loads the snapshot and journals, returning the last journal. """
+        last = 0
+        try:
+            with open(self._base + ".snapshot", 'rb') as f:
+                data = pickle.load(f)
+            for name in self.table_names:
+                setattr(self, '_' + name, data.get(name, {}))
+            if isinstance(self._mon_hist, dict):  # From older versions
+                self._mon_hist = MonsterHistory(self._mon_hist.items())
+            for name in self.map_names:  # With the current capacities
+                setattr(self, '_' + name,
+                        new_map(name, getattr(self, '_' + name).items()))
+            last = data.get('journal', 0)
+            self._log.debug("Cache snapshot loaded successfully.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._log.error(
+                "There was an error attempting to load the cache snapshot. "
+                "Only its journals will be used.")
+            self._log.error("{}: {}".format(type(e).__name__, e))
+
+        for num, path in self._get_journals():
+            if num <= last:
+                continue  # Already part of the snapshot
+            count = 0
+            with open(path, 'rb') as f:
+                while True:
+                    try:
+                        changes = pickle.load(f)
+                    except EOFError:
+                        break
+                    except Exception as e:  # Cut short by a crash
+                        self._log.warning(
+                            "Journal %s ends with an incomplete write: "
+                            "%s: %s", path, type(e).__name__, e)
+                        break
+                    for name, key, value in changes:
+                        if name in self.table_names:
+                            getattr(self, '_' + name)[key] = value
+                    count += len(changes)
+            self._log.debug("Replayed %s changes from %s.", count, path)
+            last = num
+        return last
+
+    def _update(self, name, key, value):
+        """ Stores a value in the cache and records it in the journal. """
+        super(JournalCache, self)._update(name, key, value)
+        self._pending.append((name, key, value))
+        if self._flushing is None:
+            self._flushing = gevent.spawn_later(
+                self.flush_interval, self._flush)
+
+    def _flush(self):
+        """ Appends the pending changes to the journal. """
+        self._flushing = None
+        if len(self._pending) == 0:
+            return
+        changes, self._pending = self._pending, []
+        try:
+            self._journal.write(
+                pickle.dumps(changes, protocol=pickle.HIGHEST_PROTOCOL))
+            self._journal.flush()
+        except Exception as e:
+            self._log.error("Encountered error while writing cache journal: "
+                            "{}: {}".format(type(e).__name__, e))
+            self._log.debug(
+                "Stack trace: \n {}".format(traceback.format_exc()))
+
+    def _save(self):
+        """ Starts writing a snapshot of the cache in the background. """
+        if self._flushing is not None:
+            self._flushing.kill()
+        self._flush()
+        if self._compacting is not None and not self._compacting.ready():
+            self._log.debug("Cache snapshot is still being written.")
+            return
+
+        # Changes from now on go to the next journal
+        self._journal.close()
+        num = self._journal_num
+        self._journal_num += 1
+        self._journal = open(self._get_journal(self._journal_num), 'ab')
+
+        data = {name: getattr(self, '_' + name).copy()
+                for name in self.table_names}
+        data['journal'] = num
+        self._compacting = gevent.spawn(self._compact, data)
+
+    def _compact(self, data):
+        """ Writes a snapshot in a thread, without blocking the Manager. """
+        self._log.debug("Writing cache snapshot...")
+        try:
+            gevent.get_hub().threadpool.apply(self._write_snapshot, (data,))
+            self._log.debug("Cache snapshot saved successfully.")
+        except Exception as e:
+            self._log.error("Encountered error while saving cache snapshot: "
+                            "{}: {}".format(type(e).__name__, e))
+            self._log.error(
+                "Stack trace: \n {}".format(traceback.format_exc()))
+
+    def _write_snapshot(self, data):
+        """ Writes a snapshot and removes the journals it includes. """
+        temp = self._base + ".snapshot.new"
+        with open(temp, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self._base + ".snapshot")
+        for num, path in self._get_journals():
+            if num <= data['journal']:
+                os.remove(path)
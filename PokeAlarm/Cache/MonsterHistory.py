@@ -0,0 +1,171 @@
+# Standard Library Imports
+from array import array
+from datetime import datetime, timedelta
+from hashlib import blake2b
+import heapq
+# 3rd Party Imports
+# Local Imports
+
+_epoch = datetime(1970, 1, 1)
+_second = timedelta(seconds=1)
+
+# Values of a slot that doesn't hold a key
+_EMPTY = 0
+_REMOVED = 1
+
+
+def _to_seconds(time):
+    """ Returns a datetime as seconds since the epoch, rounded up. """
+    return -((_epoch - time) // _second)
+
+
+class MonsterHistory(object):
+    """ Compact table of the expiration of monsters, by encounter key.
+
+    Keys are stored as a 64-bit hash and expirations as whole seconds, in
+    two arrays using open addressing, so each entry takes a few dozen bytes
+    instead of a str key and a datetime. Expirations are rounded up to the
+    second. It is used like the dict it replaces, except that its keys can't
+    be listed: expired entries are removed with clean instead.
+
+    Like the ExpiryWheel of the Cache, the slots are grouped by the minute
+    their entry expires in, so cleaning only visits the slots of the minutes
+    that have passed. Slots whose entry changed since are left in their old
+    minute, and are checked against the table before being cleared.
+    """
+
+    # Smallest number of slots (always a power of two)
+    min_capacity = 1024
+
+    def __init__(self, items=()):
+        """ Creates a table, filled with (key, expiration) items. """
+        self._allocate(self.min_capacity)
+        for key, expiration in items:
+            self[key] = expiration
+
+    def _allocate(self, capacity):
+        self._keys = array('Q', bytes(8 * capacity))
+        self._expirations = array('q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._used = 0
+        self._removed = 0
+        self._wheel = {}  # minute -> array of the slots expiring in it
+        self._minutes = []  # heap of the minutes in _wheel
+
+    @staticmethod
+    def _hash(key):
+        """ Returns a hash of the key, never equal to a special value. """
+        if type(key) is not str:
+            key = str(key)
+        h = int.from_bytes(
+            blake2b(key.encode(), digest_size=8).digest(), 'little')
+        return h if h > _REMOVED else h + 2
+
+    def _schedule(self, i, seconds):
+        """ Adds a slot to the minute its entry expires in. """
+        minute = seconds // 60
+        slots = self._wheel.get(minute)
+        if slots is None:
+            slots = self._wheel[minute] = array('I')
+            heapq.heappush(self._minutes, minute)
+        slots.append(i)
+
+    def _find(self, h):
+        """ Returns the slot holding a hash, or -1. """
+        keys, mask = self._keys, self._mask
+        i = h & mask
+        while True:
+            k = keys[i]
+            if k == h:
+                return i
+            if k == _EMPTY:
+                return -1
+            i = (i + 1) & mask
+
+    def _resize(self):
+        """ Moves the entries (and the wheel) to a table with a third of its
+        slots used. """
+        keys, expirations = self._keys, self._expirations
+        capacity = self.min_capacity
+        while capacity < self._used * 3:
+            capacity *= 2
+        self._allocate(capacity)
+        for i in range(len(keys)):
+            if keys[i] > _REMOVED:
+                self._insert(keys[i], expirations[i])
+
+    def _insert(self, h, seconds):
+        """ Stores a hash that isn't in the table yet. """
+        keys, mask = self._keys, self._mask
+        i = h & mask
+        while keys[i] > _REMOVED:
+            i = (i + 1) & mask
+        if keys[i] == _REMOVED:
+            self._removed -= 1
+        keys[i] = h
+        self._expirations[i] = seconds
+        self._used += 1
+        self._schedule(i, seconds)
+
+    def __setitem__(self, key, expiration):
+        h = self._hash(key)
+        seconds = _to_seconds(expiration)
+        i = self._find(h)
+        if i >= 0:
+            if self._expirations[i] != seconds:
+                self._expirations[i] = seconds
+                self._schedule(i, seconds)
+            return
+        if (self._used + self._removed + 1) * 3 > len(self._keys) * 2:
+            self._resize()
+        self._insert(h, seconds)
+
+    def get(self, key, default=None):
+        """ Returns the expiration of a key, or default. """
+        i = self._find(self._hash(key))
+        if i < 0:
+            return default
+        return _epoch + timedelta(seconds=self._expirations[i])
+
+    def __contains__(self, key):
+        return self._find(self._hash(key)) >= 0
+
+    def __len__(self):
+        return self._used
+
+    def get_capacity(self):
+        """ Returns the number of slots in the table. """
+        return len(self._keys)
+
+    def clean(self, now):
+        """ Removes the entries expired in the minutes that have passed.
+
+        Yields whether each slot it checks was cleared, so the caller can
+        let other greenlets run (and change the table) in between.
+        """
+        now = (now - _epoch) // _second
+        current = now // 60
+        while len(self._minutes) > 0 and self._minutes[0] < current:
+            for i in self._wheel.pop(heapq.heappop(self._minutes)):
+                # Slots of a resized table may be out of date, but are only
+                # cleared if they hold an expired entry all the same
+                keys = self._keys
+                if i < len(keys) and keys[i] > _REMOVED and \
+                        self._expirations[i] < now:
+                    keys[i] = _REMOVED
+                    self._used -= 1
+                    self._removed += 1
+                    yield True
+                else:
+                    yield False
+
+    def copy(self):
+        """ Returns a copy of the table. """
+        other = MonsterHistory.__new__(MonsterHistory)
+        other.__dict__.update(self.__dict__)
+        other._keys = array('Q', self._keys)
+        other._expirations = array('q', self._expirations)
+        other._wheel = {minute: array('I', slots)
+                        for minute, slots in self._wheel.items()}
+        other._minutes = list(self._minutes)
+        return other
@@ -0,0 +1,234 @@
+# Standard Library Imports
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import logging
+import os
+import pickle
+import sqlite3
+# 3rd Party Imports
+import gevent
+from gevent.lock import Semaphore
+# Local Imports
+from ..Utils import get_path
+from . import Cache
+
+# Databases opened by this process, shared by all of its managers
+_databases = {}
+
+log = logging.getLogger('pokealarm.cache')
+
+# Returned for keys known to be missing from a table
+_missing = object()
+
+_epoch = datetime(1970, 1, 1)
+_microsecond = timedelta(microseconds=1)
+
+
+class SqliteDatabase(object):
+    """ Connection to a cache database, shared by the managers of a process.
+
+    Queries run in the threadpool of gevent, one at a time, so waiting on the
+    database (or on other processes holding its lock) never blocks the other
+    greenlets. Each change is committed as soon as it is made, which the
+    write-ahead log keeps cheap, so no lock is held between queries.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = Semaphore()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "manager TEXT NOT NULL, name TEXT NOT NULL, key TEXT NOT NULL, "
+            "expiration INTEGER NOT NULL, "
+            "PRIMARY KEY (manager, name, key)) WITHOUT ROWID")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS history_expiration "
+            "ON history (manager, expiration)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "manager TEXT NOT NULL, name TEXT NOT NULL, key TEXT NOT NULL, "
+            "value BLOB, PRIMARY KEY (manager, name, key)) WITHOUT ROWID")
+
+    def _connect(self):
+        # Statements are committed as they run, from the threads of gevent
+        conn = sqlite3.connect(self._path, timeout=10, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run(self, func, *args):
+        """ Calls func in the threadpool, once the other queries are done.
+
+        Returns its result and the OperationalError it raised, if any, which
+        is handed back instead of being raised (and reported) in the thread.
+        """
+        with self._lock:
+            return gevent.get_hub().threadpool.apply(_catch, (func, args))
+
+    def _read(self, sql, params):
+        return self._conn.execute(sql, params).fetchone()
+
+    def _write(self, sql, params):
+        return self._conn.execute(sql, params).rowcount
+
+    def read(self, sql, params):
+        """ Returns the first row selected by a query, or None. """
+        row, error = self._run(self._read, sql, params)
+        if error is not None:
+            log.error("Unable to read from the cache database: %s", error)
+        return row
+
+    def write(self, sql, params):
+        """ Runs and commits a statement, returning the rows it changed. """
+        count, error = self._run(self._write, sql, params)
+        if error is not None:
+            log.error("Unable to write to the cache database: %s", error)
+            return 0
+        return count
+
+    def reopen(self):
+        """ Opens a new connection, in a process forked from this one. """
+        self._lock = Semaphore()
+        self._conn = self._connect()
+
+
+def _catch(func, args):
+    try:
+        return func(*args), None
+    except sqlite3.OperationalError as e:
+        return None, e
+
+
+def get_database(path):
+    """ Returns the connection to a cache database, opening it if needed. """
+    database = _databases.get(path)
+    if database is None:
+        database = _databases[path] = SqliteDatabase(path)
+    return database
+
+
+def reopen_databases():
+    """ Reopens the databases inherited by a forked process. """
+    for database in _databases.values():
+        database.reopen()
+
+
+class SqliteTable(object):
+    """ Dict-like view of the values of one manager in the database.
+
+    Recently used keys (including the ones known to be missing) are kept in
+    a small LRU, so repeated lookups don't need to query the database.
+    """
+
+    def __init__(self, db, table, manager, name, lru_size):
+        self._db = db
+        self._table = table
+        self._params = (manager, name)
+        self._lru = OrderedDict()
+        self._lru_size = lru_size
+        if table == 'history':
+            self._select = ("SELECT expiration FROM history "
+                            "WHERE manager=? AND name=? AND key=?")
+            self._insert = ("INSERT OR REPLACE INTO history "
+                            "(manager, name, key, expiration) "
+                            "VALUES (?, ?, ?, ?)")
+        else:
+            self._select = ("SELECT value FROM state "
+                            "WHERE manager=? AND name=? AND key=?")
+            self._insert = ("INSERT OR REPLACE INTO state "
+                            "(manager, name, key, value) VALUES (?, ?, ?, ?)")
+
+    def _encode(self, value):
+        if self._table == 'history':  # Exact number of microseconds
+            return (value - _epoch) // _microsecond
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, value):
+        if self._table == 'history':
+            return _epoch + timedelta(microseconds=value)
+        return pickle.loads(value)
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, key, default=None):
+        key = str(key)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            value = self._lru[key]
+        else:
+            row = self._db.read(self._select, self._params + (key,))
+            value = _missing if row is None else self._decode(row[0])
+            self._remember(key, value)
+        return default if value is _missing else value
+
+    def __setitem__(self, key, value):
+        key = str(key)
+        self._db.write(
+            self._insert, self._params + (key, self._encode(value)))
+        self._remember(key, value)
+
+    def get_stats(self):
+        """ Returns the number of keys remembered in memory. """
+        return {'size': len(self._lru), 'capacity': self._lru_size}
+
+    def forget(self):
+        """ Empties the LRU, after rows were changed in the database. """
+        self._lru.clear()
+
+
+class SqliteCache(Cache):
+    """ Cache stored in a SQLite database instead of in memory.
+
+    Every manager (and every PokeAlarm process on the same host) shares the
+    database at cache/cache.db, with the rows of each manager kept apart by
+    its name. Only a small LRU of each table is kept in memory, so memory
+    stays flat as the number of tracked spawns and gyms grows.
+    """
+
+    # Dicts that describe the manager's view of the world
+    state_names = Cache.map_names
+
+    # Keys of each table remembered in memory
+    lru_size = 1000
+
+    def __init__(self, mgr):
+        """ Initializes a new cache object for storing data between events. """
+        super(SqliteCache, self).__init__(mgr)
+        self._name = mgr.get_name()
+        cache_folder = get_path("cache")
+        if not os.path.exists(cache_folder):
+            os.makedirs(cache_folder)
+        self._db = get_database(os.path.join(cache_folder, "cache.db"))
+
+        for name in self.hist_names:
+            setattr(self, '_' + name, SqliteTable(
+                self._db, 'history', self._name, name, self.lru_size))
+        for name in self.state_names:
+            setattr(self, '_' + name, SqliteTable(
+                self._db, 'state', self._name, name, self.lru_size))
+        self._log.debug("Using the cache database at %s.",
+                        os.path.join(cache_folder, "cache.db"))
+
+    def _build_expiry(self):
+        """ Expired items are found with the index of the database. """
+        self._expiry = {}
+
+    def _clean_hist(self):
+        """ Clean expired objects to free up memory. """
+        now = (datetime.utcnow() - _epoch) // _microsecond
+        removed = self._db.write(
+            "DELETE FROM history WHERE manager=? AND expiration<?",
+            (self._name, now))
+        for name in self.hist_names:
+            getattr(self, '_' + name).forget()
+        self._log.debug("Cleared %s items from cache.", removed)
+
+    def _save(self):
+        """ Changes are committed as they are made. """
+        pass
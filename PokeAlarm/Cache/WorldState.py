@@ -0,0 +1,141 @@
+# Standard Library Imports
+import logging
+import os
+import pickle
+import traceback
+# 3rd Party Imports
+# Local Imports
+from PokeAlarm import Unknown
+from PokeAlarm.Utils import get_image_url, get_path
+from .BoundedDict import new_map
+
+log = logging.getLogger('WorldState')
+
+
+class WorldState(object):
+    """ Information on the world, shared by every manager.
+
+    Each incoming event updates this store once, before it is handed to the
+    managers, so the work and memory it takes don't grow with the number of
+    managers. Managers keep their own Cache for what depends on them, like
+    the history of the events they already sent.
+    """
+
+    # Dicts held by the store, limited to their most recently used items
+    table_names = ('gym_name', 'gym_desc', 'gym_image', 'cell_weather_id',
+                   'severity_id', 'day_or_night_id')
+
+    def __init__(self, persist=False, name="world_state"):
+        """ Creates a store, loading the previous one if persisted. """
+        for table in self.table_names:
+            setattr(self, '_' + table, new_map(table))
+
+        self._file = None
+        self._new = False  # Whether a persisted store was just created
+        if persist:
+            self._file = get_path(
+                os.path.join("cache", "{}.cache".format(name)))
+            cache_folder = get_path("cache")
+            if not os.path.exists(cache_folder):
+                os.makedirs(cache_folder)
+            if os.path.isfile(self._file):
+                self._load()
+            else:
+                self._new = True
+
+    def migrate(self, manager_names):
+        """ Fills a new persisted store with the gym and weather info that
+        older versions kept in the file cache of each manager. """
+        if not self._new:
+            return
+        self._new = False
+        for mgr_name in manager_names:
+            path = get_path(os.path.join("cache", "{}.cache".format(mgr_name)))
+            if not os.path.isfile(path):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    data = pickle.load(f)
+                for name in self.table_names:
+                    getattr(self, '_' + name).update(data.get(name, {}))
+            except Exception as e:
+                log.error("There was an error attempting to migrate the "
+                          "world state from {}.".format(path))
+                log.error("{}: {}".format(type(e).__name__, e))
+                continue
+            log.debug("World state migrated from %s.", path)
+
+    def update(self, event):
+        """ Updates the store with an event, and the event with the store. """
+        event.update_with_world(self)
+
+    def gym_name(self, gym_id, gym_name=Unknown.REGULAR):
+        """ Update and return the gym_name for a gym. """
+        if Unknown.is_not(gym_name):
+            self._gym_name[gym_id] = gym_name
+        return self._gym_name.get(gym_id, Unknown.REGULAR)
+
+    def gym_desc(self, gym_id, gym_desc=Unknown.REGULAR):
+        """ Update and return the gym_desc for a gym. """
+        if Unknown.is_not(gym_desc):
+            self._gym_desc[gym_id] = gym_desc
+        return self._gym_desc.get(gym_id, Unknown.REGULAR)
+
+    def gym_image(self, gym_id, gym_image=Unknown.REGULAR):
+        """ Update and return the gym_image for a gym. """
+        if Unknown.is_not(gym_image):
+            self._gym_image[gym_id] = gym_image
+        return self._gym_image.get(gym_id, get_image_url('icons/gym_0.png'))
+
+    def cell_weather_id(self, s2_cell_id, cell_weather_id=Unknown.REGULAR):
+        """ Update and return weather_id for a cell """
+        if Unknown.is_not(cell_weather_id):
+            self._cell_weather_id[s2_cell_id] = cell_weather_id
+        return self._cell_weather_id.get(s2_cell_id, Unknown.REGULAR)
+
+    def severity_id(self, s2_cell_id, severity_id=Unknown.REGULAR):
+        """ Update and return severity_id for a cell """
+        if Unknown.is_not(severity_id):
+            self._severity_id[s2_cell_id] = severity_id
+        return self._severity_id.get(s2_cell_id, Unknown.REGULAR)
+
+    def day_or_night_id(self, s2_cell_id, day_or_night_id=Unknown.REGULAR):
+        """ Update and return day_or_night_id for a cell """
+        if Unknown.is_not(day_or_night_id):
+            self._day_or_night_id[s2_cell_id] = day_or_night_id
+        return self._day_or_night_id.get(s2_cell_id, Unknown.REGULAR)
+
+    def get_stats(self):
+        """ Returns the size and approximate memory of each dict. """
+        return {name: getattr(self, '_' + name).get_stats()
+                for name in self.table_names}
+
+    def save(self):
+        """ Writes the store to the cache folder, if persisted. """
+        if self._file is None:
+            return
+        data = {name: dict(getattr(self, '_' + name))
+                for name in self.table_names}
+        try:
+            temp = self._file + ".new"
+            with open(temp, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self._file)
+            log.debug("World state saved successfully.")
+        except Exception as e:
+            log.error("Encountered error while saving world state: "
+                      "{}: {}".format(type(e).__name__, e))
+            log.debug("Stack trace: \n {}".format(traceback.format_exc()))
+
+    def _load(self):
+        try:
+            with open(self._file, 'rb') as f:
+                data = pickle.load(f)
+            for name in self.table_names:
+                setattr(self, '_' + name,
+                        new_map(name, data.get(name, {}).items()))
+            log.debug("World state loaded successfully.")
+        except Exception as e:
+            log.error("There was an error attempting to load the world "
+                      "state. It will be overwritten.")
+            log.error("{}: {}".format(type(e).__name__, e))
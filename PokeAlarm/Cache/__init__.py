@@ -1,7 +1,11 @@
+from .MonsterHistory import MonsterHistory  # noqa F401
 from .Cache import Cache
 from .FileCache import FileCache
+from .JournalCache import JournalCache
+from .SqliteCache import SqliteCache
+from .WorldState import WorldState  # noqa F401
 
-cache_options = ["mem", "file"]
+cache_options = ["mem", "file", "journal", "sqlite"]
 
 
 def cache_factory(mgr, kind):
@@ -9,5 +13,9 @@ def cache_factory(mgr, kind):
         return Cache(mgr)
     elif kind == cache_options[1]:
         return FileCache(mgr)
+    elif kind == cache_options[2]:
+        return JournalCache(mgr)
+    elif kind == cache_options[3]:
+        return SqliteCache(mgr)
     else:
         raise ValueError(f"{kind} is not a valid cache type!")
@@ -22,6 +22,10 @@ class BaseEvent(object):
         """ Update event infos using cached data from previous events. """
         raise NotImplementedError("This is an abstract method.")
 
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+        raise NotImplementedError("This is an abstract method.")
+
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
         raise NotImplementedError("This is an abstract method.")
@@ -0,0 +1,89 @@
+# Standard Library Imports
+from collections import OrderedDict
+import time
+# 3rd Party Imports
+# Local Imports
+
+# Fields of the raw message that identify each type of webhook. They are at
+# least as specific as the checks managers use to skip events they already
+# processed, so a repeat is only dropped if every manager would skip it, and
+# include the details of gyms they cache, so updates to those get through.
+IDENTITY_FIELDS = {
+    'pokemon': (
+        'encounter_id', 'pokemon_id', 'form', 'weight', 'weather',
+        'individual_attack', 'individual_defense', 'individual_stamina',
+        'disappear_time'),
+    'pokestop': (
+        'pokestop_id', 'lure_id', 'lure_expiration', 'incident_grunt_type',
+        'grunt_type', 'incident_expiration', 'incident_expire_timestamp'),
+    'raid': (
+        'gym_id', 'pokemon_id', 'start', 'raid_begin', 'end', 'raid_end',
+        'name', 'description', 'url', 'team_id', 'team'),
+    'quest': (
+        'pokestop_id', 'timestamp', 'quest_type_raw', 'quest_reward_type_raw')
+}
+IDENTITY_FIELDS['invasion'] = IDENTITY_FIELDS['pokestop']
+
+
+def get_identity(data):
+    """ Returns a key identifying a webhook, or None if it has none. """
+    try:
+        kind = data['type']
+        fields = IDENTITY_FIELDS.get(kind)
+        if fields is None:
+            return None
+        message = data['message']
+        key = (kind,) + tuple(message.get(field) for field in fields)
+        hash(key)
+        return key
+    except Exception:  # Malformed webhooks are left to the event factory
+        return None
+
+
+class DuplicateFilter(object):
+    """ Remembers recent webhooks, to drop repeats before they are parsed.
+
+    Scanners often send the same spawn, raid or stop several times. Keys are
+    remembered for a number of seconds after they were last seen, up to a
+    maximum number of keys, forgetting the oldest ones first.
+    """
+
+    def __init__(self, size, ttl):
+        self._size = size
+        self._ttl = ttl
+        self._seen = OrderedDict()  # key -> time it was last seen
+        self._dropped = {}  # type -> number of repeats dropped
+
+    def is_repeat(self, key):
+        """ Returns True (and counts it) if the key was seen recently. """
+        if key is None or self._ttl <= 0:
+            return False
+        now = time.time()
+        last_seen = self._seen.get(key)
+        if last_seen is None or now - last_seen > self._ttl:
+            return False
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        self._dropped[key[0]] = self._dropped.get(key[0], 0) + 1
+        return True
+
+    def remember(self, key):
+        """ Remembers a key, as its webhook is let in. """
+        if key is None or self._ttl <= 0:
+            return
+        now = time.time()
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        # Keys are in the order they were last seen
+        seen = self._seen
+        while len(seen) > 0 and (len(seen) > self._size or
+                                 now - next(iter(seen.values())) > self._ttl):
+            seen.popitem(last=False)
+
+    def get_stats(self):
+        """ Returns the number of keys remembered and repeats dropped. """
+        return {
+            'size': len(self._seen),
+            'dropped': dict(self._dropped),
+            'total_dropped': sum(self._dropped.values())
+        }
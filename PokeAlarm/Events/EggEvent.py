@@ -65,6 +65,15 @@ class EggEvent(BaseEvent):
         self.geofence = Unknown.REGULAR
         self.custom_dts = {}
 
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
+        # Update Gym details (if they exist)
+        self.gym_name = world.gym_name(self.gym_id, self.gym_name)
+        self.gym_description = world.gym_desc(
+            self.gym_id, self.gym_description)
+        self.gym_image = world.gym_image(self.gym_id, self.gym_image)
+
     def update_with_cache(self, cache):
         """ Update event infos using cached data from previous events. """
 
@@ -81,9 +81,15 @@ class GruntEvent(BaseEvent):
     def update_with_cache(self, cache):
         """ Update event infos using cached data from previous events. """
 
+        # Nothing to update
+        pass
+
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
         # Update weather
         weather_id = get_cached_weather_id_from_coord(
-            self.lat, self.lng, cache)
+            self.lat, self.lng, world)
         if Unknown.is_not(weather_id):
             self.weather_id = BaseEvent.check_for_none(
                 int, weather_id, Unknown.TINY)
@@ -57,6 +57,15 @@ class GymEvent(BaseEvent):
         # Nothing to update
         pass
 
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
+        # Update Gym details (if they exist)
+        self.gym_name = world.gym_name(self.gym_id, self.gym_name)
+        self.gym_description = world.gym_desc(
+            self.gym_id, self.gym_description)
+        self.gym_image = world.gym_image(self.gym_id, self.gym_image)
+
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
         dts = self.custom_dts.copy()
@@ -0,0 +1,117 @@
+# Standard Library Imports
+import logging
+# 3rd Party Imports
+# Local Imports
+from .LaneQueue import LaneQueue, default_weights
+
+log = logging.getLogger('pokealarm.webserver')
+
+# Policies available when the ingest queue is full
+ingest_overflow_options = ['shed', 'reject']
+
+# Types of webhooks shed first when the queue is full, by default
+default_shed_order = ('weather', 'gym', 'gym_details', 'pokestop', 'invasion',
+                      'quest', 'raid', 'pokemon')
+
+
+class IngestQueue(object):
+    """ Queue of the webhooks received but not yet processed.
+
+    Each type of webhook has its own lane, drained by the priority mode (see
+    LaneQueue). When the queue is full, it either rejects whole requests (so
+    scanners back off and send them again later) or sheds webhooks: the
+    oldest webhook of a type shed before the new one is dropped to make room
+    for it, or the new one is dropped if there is none. Types missing from
+    the shed order share a lane, and are shed before every other type.
+    """
+
+    def __init__(self, maxsize=0, overflow='shed',
+                 shed_order=default_shed_order, mode='fifo',
+                 weights=default_weights):
+        """ Creates a queue holding at most maxsize webhooks (0 for any). """
+        if maxsize < 0:
+            raise ValueError("Ingest queue size can't be negative.")
+        if overflow not in ingest_overflow_options:
+            raise ValueError("{} is not a valid overflow policy! Options: "
+                             "{}".format(overflow, ingest_overflow_options))
+        self._maxsize = maxsize
+        self._overflow = overflow
+        # Lane of each type, from the first shed to the last
+        self._lane_of = {kind: i + 1 for i, kind in enumerate(shed_order)}
+        self._queue = LaneQueue(
+            [1] + [weights.get(kind, 1) for kind in shed_order], mode)
+
+        # Counters
+        self._max_depth = 0
+        self._shed = {}  # (type, reason) -> number of webhooks
+        self._total_shed = 0
+
+    @staticmethod
+    def get_type(data):
+        """ Returns the type of a webhook, or None if it has none. """
+        try:
+            kind = data['type']
+            return kind if isinstance(kind, str) else None
+        except Exception:  # Left to the event factory to report
+            return None
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def put_frames(self, frames):
+        """ Queues the webhooks of a request, or returns False to reject.
+
+        A request is only rejected if it doesn't fit behind the webhooks
+        already queued: one too large for even an empty queue is taken, its
+        webhooks past the size of the queue being shed instead.
+        """
+        size = self._queue.qsize()
+        if self._overflow == 'reject' and size > 0 and \
+                0 < self._maxsize < size + len(frames):
+            for data in frames:
+                self._count(data, 'rejected')
+            return False
+        for data in frames:
+            self.put(data)
+        return True
+
+    def put(self, data):
+        """ Queues a webhook, returning False if it was shed instead. """
+        queue = self._queue
+        rank = self._lane_of.get(self.get_type(data), 0)
+        if 0 < self._maxsize <= queue.qsize():
+            # Make room by shedding the oldest webhook of a lesser type
+            lesser = next(
+                (i for i in range(rank) if queue.lane_size(i) > 0), None)
+            if lesser is None:
+                self._count(data, 'shed')
+                return False
+            self._count(queue.pop_oldest(lesser), 'evicted')
+        queue.put(rank, data)
+        self._max_depth = max(self._max_depth, queue.qsize())
+        return True
+
+    def get(self):
+        """ Removes and returns the next webhook, waiting for one. """
+        return self._queue.get()
+
+    def _count(self, data, reason):
+        key = (self.get_type(data), reason)
+        self._shed[key] = self._shed.get(key, 0) + 1
+        self._total_shed += 1
+        if self._total_shed % 1000 == 1:
+            log.warning("Ingest queue is full! %s webhook(s) have been shed "
+                        "or rejected so far.", self._total_shed)
+
+    def get_stats(self):
+        """ Returns the depth of the queue and the webhooks shed, by why. """
+        shed = {}
+        for (kind, reason), count in self._shed.items():
+            shed.setdefault(kind, {})[reason] = count
+        return {
+            'depth': self._queue.qsize(),
+            'max_depth': self._max_depth,
+            'maxsize': self._maxsize,
+            'shed': shed,
+            'total_shed': self._total_shed
+        }
@@ -0,0 +1,140 @@
+# Standard Library Imports
+from collections import deque
+from datetime import datetime
+import heapq
+import itertools
+import re
+# 3rd Party Imports
+from gevent.event import Event
+from gevent.queue import Empty
+# Local Imports
+
+# Orders in which the lanes of a queue may be drained
+priority_options = ['fifo', 'weighted', 'strict']
+
+# Weight of each type of webhook (and of its events) by default
+default_weights = {
+    'raid': 8,
+    'pokestop': 4,
+    'invasion': 4,
+    'quest': 2
+}
+
+
+def parse_priority_weight(value):
+    """ Parses the weight of a type given in the format 'type:weight'. """
+    match = re.match(r'^\s*([a-z_]+)\s*:\s*(\d+)\s*$', str(value).lower())
+    if match is None or int(match.group(2)) < 1:
+        raise ValueError("'{}' is not a valid priority weight! Weights must "
+                         "be in the format 'type:weight', with a weight of "
+                         "at least 1.".format(value))
+    return match.group(1), int(match.group(2))
+
+
+class LaneQueue(object):
+    """ Queue with a lane for each type of item, drained by priority.
+
+    Items of a lane always leave in the order they were put. With 'fifo',
+    items of every lane also leave in that order. With 'weighted', lanes
+    take turns by smooth weighted round-robin, so a lane with twice the
+    weight of another sends twice as many items while both are backlogged.
+    With 'strict', the lanes with the highest weight are always emptied
+    first.
+    """
+
+    def __init__(self, weights, mode='fifo'):
+        """ Creates a queue with a lane for each of the given weights. """
+        if mode not in priority_options:
+            raise ValueError("{} is not a valid priority mode! Options: "
+                             "{}".format(mode, priority_options))
+        self._mode = mode
+        self._weights = list(weights)
+        self._lanes = [deque() for _ in self._weights]
+        self._credits = [0] * len(self._weights)
+        self._size = 0
+        self._order = itertools.count()  # Order each item was put
+        self._ready = Event()
+
+    def qsize(self):
+        return self._size
+
+    def lane_size(self, lane):
+        return len(self._lanes[lane])
+
+    def put(self, lane, item):
+        """ Adds an item to the end of a lane. """
+        self._lanes[lane].append((next(self._order), item))
+        self._size += 1
+        self._ready.set()
+
+    def pop_oldest(self, lane):
+        """ Removes and returns the oldest item of a lane. """
+        self._size -= 1
+        return self._lanes[lane].popleft()[1]
+
+    def get(self, block=True, timeout=None):
+        """ Removes and returns the next item, waiting up to timeout. """
+        while self._size == 0:
+            if not block:
+                raise Empty()
+            self._ready.clear()
+            if not self._ready.wait(timeout):
+                raise Empty()
+        return self.pop_oldest(self._next_lane())
+
+    def _next_lane(self):
+        lanes, weights = self._lanes, self._weights
+        ready = [i for i in range(len(lanes)) if len(lanes[i]) > 0]
+        if len(ready) == 1:
+            return ready[0]
+        if self._mode == 'fifo':
+            return min(ready, key=lambda i: lanes[i][0][0])
+        if self._mode == 'strict':
+            return min(ready, key=lambda i: (-weights[i], lanes[i][0][0]))
+        # Smooth weighted round-robin between the lanes with items
+        credits = self._credits
+        for i in range(len(lanes)):
+            credits[i] = credits[i] + weights[i] if len(lanes[i]) > 0 else 0
+        best = max(ready, key=lambda i: credits[i])
+        credits[best] -= sum(weights[i] for i in ready)
+        return best
+
+
+class DeadlineQueue(object):
+    """ Queue whose items leave in the order of their deadlines.
+
+    Items without a deadline are due as soon as they are put, so they leave
+    in the order they were put, ahead of the items expiring after that. This
+    way they are never held back behind a backlog, and an item of an entity
+    (like a gym's team change) never leaves after later items of the same
+    entity (like its next egg). Items with the same deadline leave in the
+    order they were put.
+    """
+
+    def __init__(self, get_deadline):
+        """ Creates a queue, finding deadlines with get_deadline(item). """
+        self._get_deadline = get_deadline
+        self._heap = []
+        self._order = itertools.count()  # Order each item was put
+        self._ready = Event()
+
+    def qsize(self):
+        return len(self._heap)
+
+    def put(self, lane, item):
+        """ Adds an item. Lanes are ignored, as deadlines decide the order. """
+        deadline = self._get_deadline(item)
+        if deadline is None:
+            deadline = datetime.utcnow()
+        heapq.heappush(self._heap, (deadline, next(self._order), item))
+        self._ready.set()
+
+    def get(self, block=True, timeout=None):
+        """ Removes and returns the item due first, waiting up to timeout. """
+        while len(self._heap) == 0:
+            if not block:
+                raise Empty()
+            self._ready.clear()
+            if not self._ready.wait(timeout):
+                raise Empty()
+        return heapq.heappop(self._heap)[2]
@@ -76,27 +76,13 @@ class MonEvent(BaseEvent):
         if Unknown.is_not(self.atk_iv, self.def_iv, self.sta_iv):
             self.iv = \
                 100 * (self.atk_iv + self.def_iv + self.sta_iv) / float(45)
-            (self.great_product, self.great_id, self.great_cp,
-             self.great_level, self.great_candy, self.great_stardust,
-             self.ultra_product, self.ultra_id, self.ultra_cp,
-             self.ultra_level, self.ultra_candy, self.ultra_stardust) = \
-                PvpUtils.get_pvp_info(
-                    self.monster_id, self.form_id, self.atk_iv, self.def_iv,
-                    self.sta_iv, self.mon_lvl)
+            # PvP info is calculated on first use (see __getattr__)
         else:
             self.iv = Unknown.SMALL
-            self.great_product = Unknown.SMALL
-            self.ultra_product = Unknown.SMALL
-            self.great_id = self.monster_id
-            self.ultra_id = self.monster_id
-            self.great_cp = Unknown.SMALL
-            self.ultra_cp = Unknown.SMALL
-            self.great_level = Unknown.SMALL
-            self.ultra_level = Unknown.SMALL
-            self.great_candy = Unknown.SMALL
-            self.ultra_candy = Unknown.SMALL
-            self.great_stardust = Unknown.SMALL
-            self.ultra_stardust = Unknown.SMALL
+            for field in PvpUtils.get_pvp_fields():
+                setattr(self, field, Unknown.SMALL)
+            for league in PvpUtils.get_leagues():
+                setattr(self, league.name + '_id', self.monster_id)
 
         # Quick Move
         self.quick_id = check_for_none(
@@ -172,12 +158,28 @@ class MonEvent(BaseEvent):
         self.geofence = Unknown.REGULAR
         self.custom_dts = {}
 
+    def __getattr__(self, name):
+        """ Calculates the PvP info the first time any of it is needed. """
+        if name not in PvpUtils.get_pvp_fields():
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, name))
+        self.__dict__.update(PvpUtils.get_pvp_info(
+            self.monster_id, self.form_id, self.atk_iv, self.def_iv,
+            self.sta_iv, self.mon_lvl))
+        return self.__dict__[name]
+
     def update_with_cache(self, cache):
         """ Update event infos using cached data from previous events. """
 
+        # Nothing to update
+        pass
+
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
         # Update weather
         weather_id = get_cached_weather_id_from_coord(
-            self.lat, self.lng, cache)
+            self.lat, self.lng, world)
         if Unknown.is_not(weather_id):
             self.weather_id = BaseEvent.check_for_none(
                 int, weather_id, Unknown.TINY)
@@ -292,6 +294,7 @@ class MonEvent(BaseEvent):
             # PVP Information
             'great_mon_id': self.great_id,
             'great_product': self.great_product,
+            'great_rank': self.great_rank,
             'great_mon_name': locale.get_pokemon_name(self.great_id),
             'great_cp': self.great_cp,
             'great_level': self.great_level,
@@ -305,7 +308,7 @@ class MonEvent(BaseEvent):
                     'def_iv': '"{}"'.format(self.def_iv),
                     'hp_iv': '"{}"'.format(self.sta_iv),
                     'min-iv': '0',
-                    'levelCap': '50'
+                    'levelCap': str(PvpUtils.get_level_cap())
                 }),
             'great_pvpoke':
                 'https://{}/rankings/all/1500/overall/{}{}/'.format(
@@ -325,6 +328,7 @@ class MonEvent(BaseEvent):
             'great_stardust': self.great_stardust,
             'ultra_mon_id': self.ultra_id,
             'ultra_product': self.ultra_product,
+            'ultra_rank': self.ultra_rank,
             'ultra_mon_name': locale.get_pokemon_name(self.ultra_id),
             'ultra_cp': self.ultra_cp,
             'ultra_level': self.ultra_level,
@@ -338,7 +342,7 @@ class MonEvent(BaseEvent):
                     'def_iv': '"{}"'.format(self.def_iv),
                     'hp_iv': '"{}"'.format(self.sta_iv),
                     'min-iv': '0',
-                    'levelCap': '50'
+                    'levelCap': str(PvpUtils.get_level_cap())
                 }),
             'ultra_pvpoke':
                 'https://{}/rankings/all/2500/overall/{}{}/'.format(
@@ -507,4 +511,22 @@ class MonEvent(BaseEvent):
                 'tiny' if self.monster_id == 19 and Unknown.is_not(self.weight)
                 and self.weight <= 2.41 else '')
         })
+
+        # PvP Information for any additional leagues
+        for league in PvpUtils.get_leagues():
+            if league in PvpUtils.default_leagues:
+                continue
+            mon_id = getattr(self, league.name + '_id')
+            dts.update({
+                league.name + '_mon_id': mon_id,
+                league.name + '_product': getattr(
+                    self, league.name + '_product'),
+                league.name + '_rank': getattr(self, league.name + '_rank'),
+                league.name + '_mon_name': locale.get_pokemon_name(mon_id),
+                league.name + '_cp': getattr(self, league.name + '_cp'),
+                league.name + '_level': getattr(self, league.name + '_level'),
+                league.name + '_candy': getattr(self, league.name + '_candy'),
+                league.name + '_stardust': getattr(
+                    self, league.name + '_stardust')
+            })
         return dts
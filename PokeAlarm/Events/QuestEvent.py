@@ -76,6 +76,12 @@ class QuestEvent(BaseEvent):
         # Nothing to update
         pass
 
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
+        # Nothing to update
+        pass
+
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
         form_name = locale.get_form_name(self.monster_id, self.monster_form_id)
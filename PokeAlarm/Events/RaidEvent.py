@@ -106,12 +106,18 @@ class RaidEvent(BaseEvent):
         self.geofence = Unknown.REGULAR
         self.custom_dts = {}
 
-    def update_with_cache(self, cache):
-        """ Update event infos using cached data from previous events. """
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
+        # Update Gym details (if they exist)
+        self.gym_name = world.gym_name(self.gym_id, self.gym_name)
+        self.gym_description = world.gym_desc(
+            self.gym_id, self.gym_description)
+        self.gym_image = world.gym_image(self.gym_id, self.gym_image)
 
         # Update weather
         weather_id = get_cached_weather_id_from_coord(
-            self.lat, self.lng, cache)
+            self.lat, self.lng, world)
         if Unknown.is_not(weather_id):
             self.weather_id = BaseEvent.check_for_none(
                 int, weather_id, Unknown.TINY)
@@ -121,6 +127,9 @@ class RaidEvent(BaseEvent):
                 self.boosted_weather_id = self.weather_id
                 self.boss_level = 25
 
+    def update_with_cache(self, cache):
+        """ Update event infos using cached data from previous events. """
+
         # Update available slots
         self.slots_available = cache.gym_slots(self.gym_id)
         self.guard_count = (
@@ -0,0 +1,150 @@
+# Standard Library Imports
+# 3rd Party Imports
+# Local Imports
+from PokeAlarm import Unknown
+from PokeAlarm.Geofence import GeofenceIndex
+from .MonEvent import MonEvent
+from .StopEvent import StopEvent
+from .GymEvent import GymEvent
+from .EggEvent import EggEvent
+from .RaidEvent import RaidEvent
+from .WeatherEvent import WeatherEvent
+from .QuestEvent import QuestEvent
+from .GruntEvent import GruntEvent
+
+# Actions taken for a type of webhook
+DROP = 'drop'  # Not needed by anyone
+STATE = 'state'  # Only updates the state shared by the managers
+FULL = 'full'  # Sent to the managers that need its events
+
+# Events built from each type of webhook
+WEBHOOK_EVENTS = {
+    'pokemon': (MonEvent,),
+    'pokestop': (GruntEvent, StopEvent),
+    'invasion': (GruntEvent, StopEvent),
+    'gym': (GymEvent,),
+    'gym_details': (GymEvent,),
+    'raid': (EggEvent, RaidEvent),
+    'weather': (WeatherEvent,),
+    'quest': (QuestEvent,)
+}
+
+# Events that use the shared state updated by each event
+STATE_USERS = {
+    GymEvent: (GymEvent, EggEvent, RaidEvent),  # Gym names and images
+    EggEvent: (GymEvent, EggEvent, RaidEvent),
+    RaidEvent: (GymEvent, EggEvent, RaidEvent),
+    WeatherEvent: (MonEvent, GruntEvent, RaidEvent)  # Weather boosts
+}
+
+
+def get_event_lanes(weights):
+    """ Returns the lane of each type of event, and the weight of each lane.
+
+    Events built from the same types of webhooks share a lane, so that the
+    events about an entity (like the egg and raid of a gym) stay in order.
+    """
+    lane_of, lane_weights = {}, []
+    for webhook, events in WEBHOOK_EVENTS.items():
+        lane = next((lane_of[kind] for kind in events if kind in lane_of),
+                    None)
+        if lane is None:
+            lane = len(lane_weights)
+            lane_weights.append(0)
+        lane_weights[lane] = max(lane_weights[lane], weights.get(webhook, 1))
+        for kind in events:
+            lane_of.setdefault(kind, lane)
+    return lane_of, lane_weights
+
+
+class RoutingTable(object):
+    """ Decides what happens to each type of webhook, before it is parsed.
+
+    A webhook is sent to the managers that need one of its events, only
+    updates the shared state if its events are only needed through it, or
+    is dropped if nobody needs it at all.
+
+    With geographic routing, managers whose filters only pass events inside
+    some geofences are only sent the events inside them. Their geofences are
+    combined in a single GeofenceIndex to find them.
+    """
+
+    def __init__(self, managers, geographic=False):
+        """ Builds the routes from the events each manager needs. """
+        receivers = {}  # event type -> managers that need it
+        bounded = {}  # event type -> {manager: keys of its geofences}
+        geofences = {}  # (manager name, geofence name) -> geofence
+        for mgr in managers:
+            for kind in mgr.get_event_types():
+                receivers.setdefault(kind, [])
+                coverage = mgr.get_coverage(kind) if geographic else None
+                if coverage is None:
+                    receivers[kind].append(mgr)
+                    continue
+                keys = set()
+                for name in coverage:
+                    keys.add((mgr.get_name(), name))
+                    geofences[(mgr.get_name(), name)] = mgr.geofences[name]
+                bounded.setdefault(kind, {})[mgr] = frozenset(keys)
+        self._receivers = {kind: tuple(mgrs)
+                           for kind, mgrs in receivers.items()}
+        self._bounded = bounded
+        self._index = GeofenceIndex(geofences.items())
+
+        self._routes = {}
+        for webhook, events in WEBHOOK_EVENTS.items():
+            if any(kind in receivers for kind in events):
+                action = FULL
+            elif any(user in receivers for kind in events
+                     for user in STATE_USERS.get(kind, ())):
+                action = STATE
+            else:
+                action = DROP
+            self._routes[webhook] = action
+        self._counts = {}  # (webhook, action) -> number of webhooks
+
+    def get_action(self, data):
+        """ Returns the action for a webhook, counting it. """
+        try:
+            kind = data['type']
+            action = self._routes[kind]
+        except Exception:  # Left to the event factory to report
+            return FULL
+        key = (kind, action)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        return action
+
+    def get_receivers(self, event):
+        """ Returns the managers that need an event. """
+        receivers = self._receivers.get(type(event), ())
+        bounded = self._bounded.get(type(event))
+        if bounded is None:
+            return receivers
+        if Unknown.is_(event.lat) or Unknown.is_(event.lng):
+            return receivers + tuple(bounded)  # Can't tell where it is
+        containing = self._index.get_containing(event.lat, event.lng)
+        if len(containing) == 0:
+            return receivers
+        return receivers + tuple(
+            mgr for mgr, keys in bounded.items()
+            if not keys.isdisjoint(containing))
+
+    def get_routes(self):
+        """ Returns the action for each type of webhook. """
+        return dict(self._routes)
+
+    def get_coverage(self):
+        """ Returns the geofences of the managers sent events by place. """
+        coverage = {}
+        for kind, mgrs in self._bounded.items():
+            coverage[kind.__name__] = {
+                mgr.get_name(): sorted(name for _, name in keys)
+                for mgr, keys in mgrs.items()}
+        return coverage
+
+    def get_stats(self):
+        """ Returns the number of webhooks of each type, by action. """
+        stats = {}
+        for (kind, action), count in self._counts.items():
+            stats.setdefault(kind, {})[action] = count
+        return stats
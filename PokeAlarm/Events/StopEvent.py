@@ -54,6 +54,12 @@ class StopEvent(BaseEvent):
         # Nothing to update
         pass
 
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
+        # Nothing to update
+        pass
+
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
         time = get_time_as_str(self.expiration, timezone)
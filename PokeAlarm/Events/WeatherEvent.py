@@ -32,6 +32,11 @@ class WeatherEvent(BaseEvent):
             int, data.get('alert_severity') or data.get('severity'), 0)
         self.day_or_night_id = data.get('day') or data.get('world_time')
 
+        # Previous Weather Info (completed by the WorldState)
+        self.old_weather_id = Unknown.REGULAR
+        self.old_severity_id = Unknown.REGULAR
+        self.old_day_or_night_id = Unknown.REGULAR
+
         self.name = self.s2_cell_id
         self.geofence = Unknown.REGULAR
         self.custom_dts = {}
@@ -42,6 +47,19 @@ class WeatherEvent(BaseEvent):
         # Nothing to update
         pass
 
+    def update_with_world(self, world):
+        """ Update event infos using information shared by all managers. """
+
+        # Store copy of the previous weather of the cell
+        self.old_weather_id = world.cell_weather_id(self.s2_cell_id)
+        self.old_severity_id = world.severity_id(self.s2_cell_id)
+        self.old_day_or_night_id = world.day_or_night_id(self.s2_cell_id)
+
+        # Update the weather of the cell
+        world.cell_weather_id(self.s2_cell_id, self.weather_id)
+        world.severity_id(self.s2_cell_id, self.severity_id)
+        world.day_or_night_id(self.s2_cell_id, self.day_or_night_id)
+
     def generate_dts(self, locale, timezone, units):
         """ Return a dict with all the DTS for this event. """
         weather_name = locale.get_weather_name(self.weather_id)
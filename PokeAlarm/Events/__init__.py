@@ -2,6 +2,11 @@ import logging
 import traceback
 
 from .BaseEvent import BaseEvent  # noqa F401
+from .DuplicateFilter import DuplicateFilter, get_identity  # noqa F401
+from .IngestQueue import IngestQueue, ingest_overflow_options, \
+    default_shed_order  # noqa F401
+from .LaneQueue import LaneQueue, DeadlineQueue, priority_options, \
+    default_weights, parse_priority_weight  # noqa F401
 from .MonEvent import MonEvent
 from .StopEvent import StopEvent
 from .GymEvent import GymEvent
@@ -10,6 +15,8 @@ from .RaidEvent import RaidEvent
 from .WeatherEvent import WeatherEvent
 from .QuestEvent import QuestEvent
 from .GruntEvent import GruntEvent
+from .RoutingTable import RoutingTable, DROP, STATE, \
+    get_event_lanes  # noqa F401
 
 log = logging.getLogger('Events')
 
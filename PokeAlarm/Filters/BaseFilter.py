@@ -1,16 +1,50 @@
 # Standard Library Imports
 import logging
 from datetime import datetime, timedelta
+import operator
+import time
 # 3rd Party Imports
+import numpy as np
 # Local Imports
 from PokeAlarm import Unknown
 
 log = logging.getLogger('Filter')
 
+# Comparisons that can also be run over a whole column of numbers
+_column_funcs = {
+    operator.le: np.less_equal,
+    operator.ge: np.greater_equal,
+    operator.gt: np.greater,
+    operator.eq: np.equal,
+    operator.contains: lambda limit, values: np.isin(values, limit)
+}
+
+
+# Comparisons written out in compiled checks, between l<n> (the limit of the
+# n-th check) and the value of the event
+_inline_ops = {
+    operator.le: 'l{0} <= value',
+    operator.ge: 'l{0} >= value',
+    operator.gt: 'l{0} > value',
+    operator.eq: 'l{0} == value',
+    operator.contains: 'value in l{0}'
+}
+
+
+def _is_number(value):
+    """ Returns true if a value is a number NumPy holds exactly. """
+    return type(value) is float or (type(value) is int and
+                                    abs(value) <= 2 ** 53)
+
 
 class BaseFilter(object):
     """ Abstract class representing details related to different events. """
 
+    # With an adaptive order, events checked between measuring every check
+    # on one, and measurements between ordering the checks again
+    sample_interval = 64
+    reorder_interval = 64
+
     def __init__(self, mgr, kind, name, geofences_ref):
         """ Initializes base parameters for a filter. """
 
@@ -23,8 +57,18 @@ class BaseFilter(object):
         # Dict representation for the filter
         self._settings = {}
 
-        # Functions for checking set parameters
+        # Functions for checking set parameters, and all of them compiled
+        # into one (see compile_checks)
         self._check_list = []
+        self._compiled = None
+
+        # Order the checks are run in (None for the order they were added),
+        # and whether it adapts to the cost and rejection rate of each
+        self._order = None
+        self._adaptive = False
+        self._check_stats = {}  # check -> [seconds, rejections, samples]
+        self._checked = 0
+        self._sampled = 0
 
         # Missing Info
         self.is_missing_info = None
@@ -32,6 +76,9 @@ class BaseFilter(object):
         # Geofence references (loaded from the local file)
         self.geofences_ref = geofences_ref
 
+        # Geofences that events must be in to pass (None for anywhere)
+        self._coverage = None
+
     def __str__(self):
         return str(self.to_dict())
 
@@ -40,8 +87,29 @@ class BaseFilter(object):
         raise NotImplementedError("This is an abstract method.")
 
     def check_event(self, event):
-        missing = False  # Event is missing no info to start
+        """ Returns true if the Event passes every check of this filter. """
+        if self._adaptive:
+            self._checked += 1
+            if self._checked % self.sample_interval == 0:
+                self._sample(event)
+        if self._compiled is None:  # Compiled once every check was added
+            if self._order is None:
+                self._compiled = compile_checks(self._check_list, self._name)
+            else:
+                self._compiled = compile_checks(
+                    self._order, self._name, self._check_list)
+        return self._compiled(self, event)
+
+    def _interpret_event(self, event, ran=(), missing=False):
+        """ Same as check_event, running each check of the list in turn.
+
+        Checks already run on the event (and passed) can be given, so that
+        they are not run again, along with whether any of them was missing
+        info.
+        """
         for check in self._check_list:
+            if check in ran:
+                continue
             result = check(self, event)
             if result is False:
                 return False
@@ -55,6 +123,117 @@ class BaseFilter(object):
         self.accept(event)
         return True
 
+    def set_adaptive(self, adaptive):
+        """ Sets whether checks are reordered by how they fare at runtime.
+
+        The checks comparing attributes of the event are measured on some of
+        the events, and each run of them (between the other checks, which
+        stay in place) is ordered by its expected cost per rejection. Events
+        pass or fail (and are missing info) just the same in any order, but
+        may be rejected for a different reason. Measuring a check works out
+        the attribute it needs, even the PvP info of monsters that would
+        otherwise be rejected before it is needed.
+        """
+        self._adaptive = adaptive
+        if not adaptive:
+            self._checks_changed()
+
+    def get_check_stats(self):
+        """ Returns the average cost (in microseconds) and rejection rate
+        of each check measured, in the order they are run. """
+        stats = []
+        for check in self._order or self._check_list:
+            seconds, rejections, samples = self._check_stats.get(
+                check, (0.0, 0, 0))
+            if samples > 0:
+                stats.append((check._attr_name, {
+                    'cost_us': round(seconds / samples * 1e6, 3),
+                    'reject_rate': round(rejections / samples, 3)}))
+        return stats
+
+    def _checks_changed(self):
+        """ Discards what was compiled or learned about the checks. """
+        self._compiled = None
+        self._order = None
+        self._check_stats = {}
+
+    def _sample(self, event):
+        """ Measures every check comparing attributes of the event on it. """
+        for check in self._check_list:
+            if type(check) is not CheckFunction:
+                continue
+            start = time.perf_counter()
+            try:
+                result = check.probe(event)
+            except Exception:  # Left for check_event to raise
+                result = None
+            stats = self._check_stats.setdefault(check, [0.0, 0, 0])
+            stats[0] += time.perf_counter() - start
+            stats[1] += result is False
+            stats[2] += 1
+        self._sampled += 1
+        if self._sampled % self.reorder_interval == 0:
+            self._reorder()
+
+    def _get_cost_per_rejection(self, check):
+        seconds, rejections, samples = self._check_stats[check]
+        return seconds / (rejections + 0.5)  # Even if it never rejects
+
+    def _reorder(self):
+        """ Orders each run of checks comparing attributes of the event by
+        their expected cost per rejection. """
+        order, run = [], []
+        for check in self._check_list + [None]:
+            if type(check) is CheckFunction:
+                run.append(check)
+                continue
+            order += sorted(run, key=self._get_cost_per_rejection)
+            run = []
+            if check is not None:
+                order.append(check)
+        if order != (self._order or self._check_list):
+            self._order = order
+            self._compiled = None
+            self._log.debug("Checks of '%s' reordered: %s", self._name,
+                            [check._attr_name for check in order
+                             if type(check) is CheckFunction])
+        # Let newer measurements outweigh older ones
+        for stats in self._check_stats.values():
+            stats[0] /= 2
+            stats[1] /= 2
+            stats[2] /= 2
+
+    def check_batch(self, columns):
+        """ Runs the leading checks that can run over a batch at once.
+
+        Returns, for each event, the arguments to reject it with, or None if
+        it still has to go through check_event. Events are rejected by the
+        first of these checks they fail, just as check_event would.
+        """
+        checks, masks = [], []
+        for check in self._check_list:
+            mask = check.check_column(columns) \
+                if isinstance(check, CheckFunction) else None
+            if mask is None:
+                break
+            checks.append(check)
+            masks.append(mask)
+        rejects = [None] * len(columns)
+        if len(masks) == 0:
+            return rejects
+        masks = np.vstack(masks)
+        first = masks.argmax(axis=0)  # Index of the first failed check
+        for i in np.flatnonzero(masks.any(axis=0)):
+            check = checks[first[i]]
+            rejects[i] = (check._attr_name,
+                          columns.get_value(i, check._attr_name),
+                          check._limit)
+        return rejects
+
+    def get_coverage(self):
+        """ Returns the geofences events must be in, or None if any. """
+        return self._coverage
+
     def reject(self, event, attr_name, value, required):
         """ Log the reason for rejecting the Event. """
         self._log.info(
@@ -76,6 +255,7 @@ class BaseFilter(object):
 
         # Add check function to our list
         self._check_list.append(check)
+        self._checks_changed()
         return limit
 
     def evaluate_time(self, min_time, max_time):
@@ -92,16 +272,26 @@ class BaseFilter(object):
 
         # Add check function to our list
         self._check_list.append(check)
+        self._checks_changed()
 
     def evaluate_geofences(self, geofences, exclude_mode):
         if geofences is None:
             return None  # limit not set
 
+        # Remember where events can pass, for routing them to the Manager
+        if not exclude_mode and self.geofences_ref is not None:
+            if len(geofences) == 1 and "all" in geofences:
+                self._coverage = set(self.geofences_ref.keys())
+            else:
+                self._coverage = set(geofences) & set(
+                    self.geofences_ref.keys())
+
         # Create a function to compare the current time to time range
         check = CheckGeofence(geofences, self.geofences_ref, exclude_mode)
 
         # Add check function to our list
         self._check_list.append(check)
+        self._checks_changed()
 
     @staticmethod
     def parse_as_type(kind, param_name, data):
@@ -229,20 +419,97 @@ class CheckFunction(object):
         self._limit = limit
         self._eval_func = eval_func
         self._attr_name = attr_name
+        # Same comparison, run over a column of values (if it can be)
+        self._column_func, self._column_limit = None, limit
+        if eval_func is operator.contains:
+            if isinstance(limit, set) and all(_is_number(v) for v in limit):
+                self._column_func = _column_funcs[eval_func]
+                self._column_limit = np.array(sorted(limit), dtype=float)
+        elif _is_number(limit):
+            self._column_func = _column_funcs.get(eval_func)
 
     def __call__(self, filtr, event):
         value = getattr(event, self._attr_name)  # event.event_attr
+        result = self._evaluate(value)
+
+        if result is False:  # Log rejection
+            filtr.reject(event, self._attr_name, value, self._limit)
+
+        return result
+
+    def _evaluate(self, value):
         if (type(value) == list):
             if Unknown.is_(*value):
                 return Unknown.TINY  # Cannot check - missing attribute
         elif Unknown.is_(value):
             return Unknown.TINY  # Cannot check - missing attribute
-        result = self._eval_func(self._limit, value)  # compare value to limit
+        return self._eval_func(self._limit, value)  # compare value to limit
 
-        if result is False:  # Log rejection
-            filtr.reject(event, self._attr_name, value, self._limit)
+    def probe(self, event):
+        """ Returns the result of the check, without logging a rejection. """
+        return self._evaluate(getattr(event, self._attr_name))
 
-        return result
+    def check_column(self, columns):
+        """ Returns which events of a batch fail this check, or None if they
+        can only be checked one at a time. Events missing the attribute
+        don't fail it, as they are only marked as missing info. """
+        if self._column_func is None:
+            return None
+        column = columns.get(self._attr_name)
+        if column is None:
+            return None
+        values, known = column
+        return known & ~self._column_func(self._column_limit, values)
+
+
+class EventColumns(object):
+    """ Attributes of a batch of events, gathered into columns of numbers.
+
+    Columns are gathered the first time they are needed. Attributes that
+    aren't numbers (or unknown) for every event have no column.
+    """
+
+    def __init__(self, events, values=None, skip=()):
+        """ Gathers columns from events, except the values given (by name)
+        and the attributes to skip. """
+        self._events = events
+        self._values = dict(values or {})
+        self._skip = skip
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._events)
+
+    def get_value(self, index, attr_name):
+        """ Returns the value of an attribute for an event of the batch. """
+        if attr_name in self._values:
+            return self._values[attr_name][index]
+        return getattr(self._events[index], attr_name)
+
+    def get(self, attr_name):
+        """ Returns the values of an attribute and which of them are known,
+        or None if it has no column. """
+        if attr_name in self._columns:
+            return self._columns[attr_name]
+        column = None
+        if attr_name not in self._skip:
+            values = self._values.get(attr_name)
+            if values is None:
+                values = [getattr(e, attr_name) for e in self._events]
+            numbers, known = [], []
+            for value in values:
+                if _is_number(value):
+                    numbers.append(value)
+                    known.append(True)
+                elif isinstance(value, str) and Unknown.is_(value):
+                    numbers.append(0)
+                    known.append(False)
+                else:  # Left for the events to be checked one at a time
+                    break
+            else:
+                column = (np.array(numbers, dtype=float), np.array(known))
+        self._columns[attr_name] = column
+        return column
 
 
 class CheckTime(object):
@@ -303,12 +570,14 @@ class CheckGeofence(object):
         targets = self._limit
         if len(targets) == 1 and "all" in targets:
             targets = self._geofences_ref.keys()
+        # Shared by every filter using the same geofences
+        containing = self._geofences_ref.get_containing(lat, lng)
         for name in targets:
             gf = self._geofences_ref.get(name)
             if not gf:  # gf doesn't exist :'(
                 filtr.reject(event, 'geofence name',
                              f'{name} not', 'geofence list')
-            elif gf.contains(lat, lng):  # event in gf
+            elif name in containing:  # event in gf
                 if self._exclude_mode:
                     filtr.reject(event, 'location',
                                  f'{lat},{lng}', f'\'{name}\' geofence')
@@ -327,3 +596,83 @@ class CheckGeofence(object):
     def override_geofences_ref(self, geofences_ref):
         """ For unit tests purposes """
         self._geofences_ref = geofences_ref
+
+
+def compile_checks(check_list, name='filter', usual_order=None):
+    """ Compiles a list of checks into one function, filtr(filtr, event).
+
+    The function gives the same result as running each check in turn (see
+    BaseFilter._interpret_event), rejecting and accepting events the same
+    way, but the checks comparing attributes of the event are written out
+    in it, with no calls between them.
+
+    If the checks were reordered from their usual order, an error raised by
+    a check moved ahead of others is not raised right away: the checks not
+    run yet are run in the usual order instead, so the error is only raised
+    if it would have been in that order.
+    """
+    namespace = {'UNKNOWN': frozenset(
+        (Unknown.TINY, Unknown.SMALL, Unknown.REGULAR)),
+        'is_unknown': Unknown.is_, 'TINY': Unknown.TINY}
+    lines = ['def check_event(filtr, event):',
+             '    missing = False']
+    usual = {check: i for i, check in enumerate(usual_order or check_list)}
+    for i, check in enumerate(check_list):
+        attr = getattr(check, '_attr_name', None)
+        moved = usual_order is not None and any(
+            usual[later] < usual[check] for later in check_list[i + 1:])
+        if type(check) is not CheckFunction or not attr.isidentifier():
+            # Run as is, only handling its result
+            namespace['c{}'.format(i)] = check
+            lines += ['    result = c{}(filtr, event)'.format(i),
+                      '    if result is False:',
+                      '        return False',
+                      '    if result in UNKNOWN:',
+                      '        missing = True']
+            continue
+        namespace['l{}'.format(i)] = check._limit
+        expr = _inline_ops.get(check._eval_func)
+        if expr is None:
+            namespace['f{}'.format(i)] = check._eval_func
+            expr = 'f{0}(l{0}, value)'
+        if moved:  # Errors wait for the checks usually run before it
+            namespace['ran{}'.format(i)] = frozenset(check_list[:i])
+            lines += ['    try:',
+                      '        value = event.{}'.format(attr),
+                      '        result = (TINY if (is_unknown(*value)',
+                      '                  if type(value) == list',
+                      '                  else value in UNKNOWN)',
+                      '                  else ' + expr.format(i) + ')',
+                      '    except Exception:',
+                      '        return filtr._interpret_event(',
+                      '            event, ran{}, missing)'.format(i),
+                      '    if result is False:',
+                      '        filtr.reject(event, {!r}, value, l{})'.format(
+                          attr, i),
+                      '        return False',
+                      '    if result in UNKNOWN:',
+                      '        missing = True']
+            continue
+        lines += ['    value = event.{}'.format(attr),
+                  '    if (is_unknown(*value) if type(value) == list',
+                  '            else value in UNKNOWN):',
+                  '        missing = True',
+                  '    else:',
+                  '        result = ' + expr.format(i),
+                  '        if result is False:',
+                  '            filtr.reject(event, {!r}, value, l{})'.format(
+                      attr, i),
+                  '            return False']
+        if check._eval_func not in _inline_ops:  # Comparisons give bools
+            lines += ['        if result in UNKNOWN:',
+                      '            missing = True']
+    lines += ['    if filtr.is_missing_info is not None \\',
+              '            and missing != filtr.is_missing_info:',
+              '        filtr.reject(event, "missing_info", missing,',
+              '                     filtr.is_missing_info)',
+              '        return False',
+              '    filtr.accept(event)',
+              '    return True']
+    source = '\n'.join(lines) + '\n'
+    exec(compile(source, '<filter {}>'.format(name), 'exec'), namespace)
+    return namespace['check_event']
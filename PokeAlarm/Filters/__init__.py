@@ -1,4 +1,4 @@
-from .BaseFilter import BaseFilter  # noqa F401
+from .BaseFilter import BaseFilter, EventColumns  # noqa F401
 from .MonFilter import MonFilter  # noqa F401
 from .StopFilter import StopFilter  # noqa F401
 from .GymFilter import GymFilter  # noqa F401
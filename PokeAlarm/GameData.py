@@ -0,0 +1,324 @@
+# Standard Library Imports
+from glob import glob
+import json
+import logging
+import os
+import pickle
+import time
+# 3rd Party Imports
+# Local Imports
+from PokeAlarm import config
+
+log = logging.getLogger('GameData')
+
+# Forms that always share the stats, types and evolutions of the base form
+BASE_FORM_NAMES = {"Shadow", "Purified", "Normal"}
+
+# Evolutions into monsters above this id have not been released yet
+MAX_RELEASED_MONSTER_ID = 898
+
+# Locale sections that names can be looked up by (in any language)
+LOCALE_ID_SECTIONS = (
+    'pokemon', 'moves', 'teams', 'weather', 'sizes', 'types', 'rarity',
+    'severity', 'day_or_night', 'lure_types', 'quest_reward_types', 'items')
+
+# Files the store is built from, besides the locales
+DATA_FILES = (
+    'data/pokemon_data.json', 'data/stat_products.json',
+    'data/shiny_data.json', 'data/fast_moves.json',
+    'data/charged_moves.json', 'data/weather_boosts.json',
+    'data/cp_multipliers.json', 'data/powerup_costs.json',
+    'data/invasions.json')
+
+# Compiled copy of the store, rebuilt whenever the files above change
+SNAPSHOT_FILE = 'data/.game_data.pickle'
+# Increase when the layout of GameData changes to discard old snapshots
+SNAPSHOT_VERSION = 1
+
+
+class GameData(object):
+    """ Static game data, parsed once from the files in the data folder.
+
+    Everything is indexed by integer ids, or (monster_id, form_id) tuples
+    for data that depends on the form of a monster.
+    """
+
+    def __init__(self):
+        # (monster_id, form_id) -> { 'attack', 'defense', 'stamina' }
+        self.base_stats = {}
+        # (monster_id, form_id) -> [type1_id, type2_id]
+        self.base_types = {}
+        # (monster_id, form_id) -> [(evo_id, evo_form_id), ...]
+        self.evolutions = {}
+        # (monster_id, form_id) -> [candy cost of each evolution, ...]
+        self.evolution_costs = {}
+        # monster_id -> { form_id -> raw form name }
+        self.form_names = {}
+        # monster_id -> base height / base weight
+        self.base_heights = {}
+        self.base_weights = {}
+        # (monster_id, form_id, cp_limit) -> highest stat product
+        self.best_products = {}
+        # monster ids and (monster_id, form_id) that can be shiny in the wild
+        self.shiny_monsters = set()
+        self.shiny_forms = set()
+        # type name (lowercase) -> type_id
+        self.type_ids = {}
+        # move_id -> { 'type', 'damage', 'dps', 'duration', 'energy' }
+        self.moves = {}
+        # weather_id -> frozenset of boosted type_ids
+        self.weather_boosts = {}
+        # level (as a str) -> cp multiplier
+        self.cp_multipliers = {}
+        # 'stardust' / 'candy' / 'xl_candy' -> { level range -> cost }
+        self.powerup_costs = {}
+        # grunt_id -> { 'name', 'gender', 'type', 'rewards', 'battles' }
+        self.grunts = {}
+        # language -> contents of the locale file
+        self.locales = {}
+        # locale section -> { name (lowercase, any language) -> id }
+        self.locale_ids = {}
+
+    @classmethod
+    def load(cls):
+        """ Builds the indexes from the json files in the data folder. """
+        start = time.time()
+        data = cls()
+        data._load_locales()
+        data._load_types(data.locales['en'])
+        data._load_monsters(_read_json('data/pokemon_data.json'))
+        data._load_best_products(_read_json('data/stat_products.json'))
+        data._load_shiny(_read_json('data/shiny_data.json'))
+        data._load_moves(_read_json('data/fast_moves.json'))
+        data._load_moves(_read_json('data/charged_moves.json'))
+        data._load_weather_boosts(_read_json('data/weather_boosts.json'))
+        data.cp_multipliers = _read_json('data/cp_multipliers.json')
+        data.powerup_costs = _read_json('data/powerup_costs.json')
+        data._load_grunts(_read_json('data/invasions.json'))
+        log.debug("Game data loaded in %.3f seconds.", time.time() - start)
+        return data
+
+    @classmethod
+    def load_snapshot(cls):
+        """ Loads the store from its snapshot, rebuilding it if outdated. """
+        start = time.time()
+        key = _snapshot_key()
+        file_ = _get_path(SNAPSHOT_FILE)
+        try:
+            with open(file_, 'rb') as f:
+                if pickle.load(f) == key:
+                    data = pickle.load(f)
+                    log.debug("Game data snapshot loaded in %.3f seconds.",
+                              time.time() - start)
+                    return data
+            log.info("Game data has changed, rebuilding the snapshot...")
+        except FileNotFoundError:
+            log.info("Building the game data snapshot...")
+        except Exception as e:
+            log.warning("Unable to read the game data snapshot, rebuilding "
+                        "it: %s: %s", type(e).__name__, e)
+
+        data = cls.load()
+        tmp_file = '{}.{}.tmp'.format(file_, os.getpid())
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, file_)
+        except Exception as e:
+            log.warning("Unable to save the game data snapshot: %s: %s",
+                        type(e).__name__, e)
+            if os.path.isfile(tmp_file):
+                os.remove(tmp_file)
+        return data
+
+    def get_type_id(self, type_name):
+        """ Returns the id of a type from its English name, or 0. """
+        return self.type_ids.get(str(type_name).lower(), 0)
+
+    def get_locale_id(self, section, name):
+        """ Returns the id of a name in any locale, or None. """
+        return self.locale_ids.get(section, {}).get(str(name).lower())
+
+    def _load_locales(self):
+        for section in LOCALE_ID_SECTIONS:
+            self.locale_ids[section] = {}
+        for file_ in _get_locale_files():
+            language = os.path.splitext(os.path.basename(file_))[0]
+            with open(file_, 'r') as f:
+                self.locales[language] = json.load(f)
+            for section in LOCALE_ID_SECTIONS:
+                for id_, name_ in self.locales[language].get(
+                        section, {}).items():
+                    self.locale_ids[section][name_.lower()] = int(id_)
+
+    def _load_types(self, locale):
+        for id_, name_ in locale["types"].items():
+            self.type_ids[name_.lower()] = int(id_)
+
+    def _load_monsters(self, j):
+        for id_, monster in j.items():
+            mon_id = int(id_)
+            base = (mon_id, 0)
+            forms = monster.get("forms", {})
+
+            self.base_heights[mon_id] = monster.get('height')
+            self.base_weights[mon_id] = monster.get('weight')
+            self.form_names[mon_id] = {0: "Normal"}
+            for form_id_, form in forms.items():
+                if form_id_ != "0":
+                    self.form_names[mon_id][int(form_id_)] = form["name"]
+
+            self.base_stats[base] = monster.get('stats')
+            self.base_types[base] = _parse_types(monster.get('types'))
+            self.evolutions[base] = self._evolution_chain(j, id_, "0", [])
+            self.evolution_costs[base] = self._evolution_cost_chain(
+                j, id_, "0", [])
+
+            if len(forms) == 1 and forms.get("0"):
+                continue
+            for form_id_, form in forms.items():
+                key = (mon_id, int(form_id_))
+                if form["name"] in BASE_FORM_NAMES:
+                    self.base_stats[key] = self.base_stats[base]
+                    self.base_types[key] = self.base_types[base]
+                    self.evolutions[key] = self.evolutions[base]
+                    self.evolution_costs[key] = self.evolution_costs[base]
+                    continue
+                self.base_stats[key] = (
+                    form['stats'] if form.get('stats') is not None
+                    else self.base_stats[base])
+                self.base_types[key] = (
+                    _parse_types(form['types']) if form.get('types')
+                    is not None else self.base_types[base])
+                self.evolutions[key] = self._evolution_chain(
+                    j, id_, form_id_, [])
+                self.evolution_costs[key] = self._evolution_cost_chain(
+                    j, id_, form_id_, [])
+
+    @staticmethod
+    def _get_evolutions(j, id_, form_id_):
+        """ Returns the raw evolutions of a monster or one of its forms. """
+        monster = j.get(id_, {})
+        if form_id_ != "0":
+            monster = monster.get('forms', {}).get(form_id_, {})
+        return monster.get('evolutions') or {}
+
+    def _evolution_chain(self, j, id_, form_id_, chain):
+        """ Adds every evolution (and their evolutions) to the chain. """
+        for evo_id, evo in self._get_evolutions(j, id_, form_id_).items():
+            if int(evo_id) > MAX_RELEASED_MONSTER_ID:
+                continue
+            chain.append((int(evo_id), evo.get('form')))
+            self._evolution_chain(
+                j, str(evo.get('pokemon')),
+                str(evo.get('form')) if form_id_ != "0" else "0", chain)
+        return chain
+
+    def _evolution_cost_chain(self, j, id_, form_id_, chain):
+        """ Adds the candy cost of every evolution to the chain. """
+        for evo in self._get_evolutions(j, id_, form_id_).values():
+            candy_cost = int(evo.get('candyCost', 0))
+            if candy_cost == 0:  # block unreleased generations
+                continue
+            chain.append(candy_cost)
+            self._evolution_cost_chain(
+                j, str(evo.get('pokemon')),
+                str(evo.get('form')) if form_id_ != "0" else "0", chain)
+        return chain
+
+    def _load_best_products(self, j):
+        for id_, forms in j.items():
+            for form_id_, products in forms.items():
+                for cp_limit in (1500, 2500):
+                    self.best_products[(int(id_), int(form_id_), cp_limit)] \
+                        = products.get('{}_highest_product'.format(cp_limit))
+
+    def _load_shiny(self, j):
+        for id_form_id_, val in j.items():
+            if '*' in id_form_id_ or val != ' ✨':
+                continue
+            try:
+                ids = [int(id_) for id_ in id_form_id_.split('_')]
+            except ValueError:
+                continue
+            if len(ids) == 1:
+                self.shiny_monsters.add(ids[0])
+            else:
+                self.shiny_forms.add((ids[0], ids[1]))
+
+    def _load_moves(self, j):
+        for mv in j:
+            self.moves[mv['move_id']] = {
+                'type': self.get_type_id(mv['type']),
+                'damage': mv['power'],
+                'dps': round((mv['power'] / mv['duration']) * 1000, 2),
+                'duration': mv['duration'],
+                'energy': abs(mv['energy_delta'])
+            }
+
+    def _load_weather_boosts(self, j):
+        for w_id, types in j.items():
+            self.weather_boosts[int(w_id)] = frozenset(types)
+
+    def _load_grunts(self, j):
+        genders = {"Male": 1, "Female": 2}
+        for id_, grunt in j.items():
+            info = {
+                'name': grunt["grunt"],
+                'gender': genders.get(grunt["grunt"], 3),
+                'type': self.get_type_id(grunt.get('type')),
+                'rewards': [],
+                'battles': {}
+            }
+            if "pokemon" in grunt:
+                for i in range(1, 4):
+                    battle = grunt["pokemon"][str(i)]
+                    info['battles'][i] = battle["ids"]
+                    if battle["isReward"]:
+                        info['rewards'].extend(battle["ids"])
+            self.grunts[int(id_)] = info
+
+
+def _get_path(path):
+    return os.path.join(config['ROOT_PATH'], path)
+
+
+def _get_locale_files():
+    return sorted(glob(_get_path('locales/*.json')))
+
+
+def _read_json(path):
+    with open(_get_path(path), 'r') as f:
+        return json.load(f)
+
+
+def _snapshot_key():
+    """ Returns a description of everything a snapshot is built from. """
+    try:
+        with open(_get_path('data/.data_version'), 'r') as f:
+            signatures = json.load(f)
+    except (OSError, ValueError):
+        signatures = None
+    files = {}
+    for file_ in [_get_path(p) for p in DATA_FILES] + _get_locale_files():
+        stat = os.stat(file_)
+        files[os.path.relpath(file_, config['ROOT_PATH'])] = (
+            stat.st_size, stat.st_mtime_ns)
+    return {
+        'version': SNAPSHOT_VERSION,
+        'signatures': signatures,
+        'files': files
+    }
+
+
+def _parse_types(types):
+    """ Returns the first two type ids, padded with 0s. """
+    return ([int(k) for k in types or []] + [0] * 2)[:2]
+
+
+def get_game_data():
+    """ Returns the GameData store, loading it the first time. """
+    if not hasattr(get_game_data, 'info'):
+        get_game_data.info = GameData.load_snapshot()
+    return get_game_data.info
@@ -1,11 +1,15 @@
 # Standard Library Imports
 import re
 import logging
+from bisect import bisect_left, bisect_right
+import math
 import sys
 import traceback
 from collections import OrderedDict
 # 3rd Party Imports
+from s2cell import s2cell
 # Local Imports
+from PokeAlarm import config
 
 
 log = logging.getLogger('Geofence')
@@ -41,7 +45,7 @@ def load_geofence_file(file_path):
                 sys.exit(1)
         geofences[name] = Geofence(name, points)
         log.info("Geofence {} added!".format(name))
-        return geofences
+        return GeofenceIndex(geofences)
     except IOError:
         log.error("IOError: Please make sure a file with read/write "
                   + "permissions exist at {}".format(file_path))
@@ -55,8 +59,17 @@ def load_geofence_file(file_path):
 # Geofence object used to determine if points are in a defined range
 class Geofence(object):
 
+    # Number of edges each band of the polygon should hold on average
+    EDGES_PER_BAND = 8
+
+    # Level of the S2 cells used to cover geofences, 0 disables coverings
+    DEFAULT_CELL_LEVEL = 0
+
+    # Most cells in a covering, coarser levels are used to stay below it
+    MAX_COVERING_CELLS = 4096
+
     # Initialize the Geofence from a given name and a list of points.
-    def __init__(self, name, points):
+    def __init__(self, name, points, cell_level=None):
         self.__name = name
         self.__points = points
 
@@ -71,29 +84,292 @@ class Geofence(object):
             self.__min_y = min(p[1], self.__min_y)
             self.__max_y = max(p[1], self.__max_y)
 
+        # Split the polygon into bands along the y axis, so the raycast
+        # only has to look at the edges that cross the band of the point
+        self.__band_count = max(1, len(points) // self.EDGES_PER_BAND)
+        self.__band_size = (self.__max_y - self.__min_y) / self.__band_count
+        bands = [[] for _ in range(self.__band_count)]
+        p1x, p1y = points[-1]
+        for p2x, p2y in points:
+            if p1y != p2y:  # horizontal edges are never crossed by the ray
+                if p1y < p2y:
+                    edge = (p1y, p2y, max(p1x, p2x), p1x, p1y, p2x, p2y)
+                else:
+                    edge = (p2y, p1y, max(p1x, p2x), p1x, p1y, p2x, p2y)
+                for band in range(self.__get_band(edge[0]),
+                                  self.__get_band(edge[1]) + 1):
+                    bands[band].append(edge)
+            p1x, p1y = p2x, p2y
+        self.__bands = [tuple(band) for band in bands]
+
+        # S2 cells that are entirely inside (True) or outside (False)
+        self.__cells = {}
+        self.__cell_level = None
+        if cell_level is None:
+            cell_level = config.get(
+                'GEOFENCE_CELL_LEVEL', self.DEFAULT_CELL_LEVEL)
+        if cell_level:
+            self.__build_covering(cell_level)
+
+    # Classifies the S2 cells around the geofence as inside, outside or
+    # on the boundary (which are left out and still need a raycast)
+    def __build_covering(self, level):
+        samples = [(x, y) for x in (self.__min_x, self.__max_x)
+                   for y in (self.__min_y, self.__max_y)]
+        samples += [((self.__min_x + self.__max_x) / 2, self.__min_y),
+                    ((self.__min_x + self.__max_x) / 2, self.__max_y),
+                    (self.__min_x, (self.__min_y + self.__max_y) / 2),
+                    (self.__max_x, (self.__min_y + self.__max_y) / 2)]
+        samples = [s2cell.s2_cell_id_to_face_ij(
+            s2cell.lat_lon_to_cell_id(x, y, 30)) for x, y in samples]
+        face = samples[0][0]
+        if any(f != face for f, _, _ in samples):
+            log.debug("Geofence %s spans multiple faces of the S2 cube and "
+                      "will not be covered.", self.__name)
+            return
+
+        # Use coarser cells if the geofence would need too many of them
+        while True:
+            size = 1 << (30 - level)
+            last = (1 << level) - 1
+            min_i = max(min(i for _, i, _ in samples) // size - 1, 0)
+            max_i = min(max(i for _, i, _ in samples) // size + 1, last)
+            min_j = max(min(j for _, _, j in samples) // size - 1, 0)
+            max_j = min(max(j for _, _, j in samples) // size + 1, last)
+            count = (max_i - min_i + 1) * (max_j - min_j + 1)
+            if count <= self.MAX_COVERING_CELLS or level == 1:
+                break
+            level -= 1
+
+        # Corners of every cell, as (lat, lng) of the leaf cell at the corner
+        leaf = (1 << 30) - 1
+        corners = {}
+        for ci in range(min_i, max_i + 2):
+            for cj in range(min_j, max_j + 2):
+                corners[(ci, cj)] = s2cell.cell_id_to_lat_lon(
+                    s2cell.s2_face_ij_to_cell_id(
+                        face, min(ci * size, leaf), min(cj * size, leaf), 30))
+
+        # Every edge (including horizontal ones) by band, as boxes sorted by
+        # their lowest X, so only the edges near a cell need to be checked
+        edges = [[] for _ in range(self.__band_count)]
+        p1x, p1y = self.__points[-1]
+        for p2x, p2y in self.__points:
+            edge = (min(p1x, p2x), max(p1x, p2x), min(p1y, p2y), max(p1y, p2y))
+            for band in range(self.__get_band(edge[2]),
+                              self.__get_band(edge[3]) + 1):
+                edges[band].append(edge)
+            p1x, p1y = p2x, p2y
+        for band in edges:
+            band.sort()
+        keys = [[e[0] for e in band] for band in edges]
+        widths = [max([e[1] - e[0] for e in band] or [0]) for band in edges]
+
+        cells = {}
+        for ci in range(min_i, max_i + 1):
+            for cj in range(min_j, max_j + 1):
+                points = [corners[(ci + di, cj + dj)]
+                          for di in (0, 1) for dj in (0, 1)]
+                # Pad the box of the corners, since the edges of the cell
+                # are not quite straight lines of latitude and longitude
+                min_x = min(p[0] for p in points)
+                max_x = max(p[0] for p in points)
+                min_y = min(p[1] for p in points)
+                max_y = max(p[1] for p in points)
+                pad_x = (max_x - min_x) / 4
+                pad_y = (max_y - min_y) / 4
+                min_x, max_x = min_x - pad_x, max_x + pad_x
+                min_y, max_y = min_y - pad_y, max_y + pad_y
+
+                cell_id = s2cell.s2_face_ij_to_cell_id(
+                    face, ci * size, cj * size, level)
+                if self.__max_x < min_x or max_x < self.__min_x \
+                        or self.__max_y < min_y or max_y < self.__min_y:
+                    cells[cell_id] = False
+                    continue
+                boundary = False
+                for band in range(self.__get_band(min_y),
+                                  self.__get_band(max_y) + 1):
+                    start = bisect_left(keys[band], min_x - widths[band])
+                    end = bisect_right(keys[band], max_x)
+                    for e_min_x, e_max_x, e_min_y, e_max_y \
+                            in edges[band][start:end]:
+                        if min_x <= e_max_x and e_min_y <= max_y \
+                                and min_y <= e_max_y:
+                            boundary = True
+                            break
+                    if boundary:
+                        break
+                if not boundary:  # the whole cell is on the same side
+                    cells[cell_id] = self.contains(
+                        (min_x + max_x) / 2, (min_y + max_y) / 2)
+
+        self.__cells = cells
+        self.__cell_level = level
+        log.debug("Geofence %s covered by %s cells of level %s, %s of them "
+                  "on its boundary.", self.__name, count, level,
+                  count - len(cells))
+
+    # Returns the index of the band that contains the given Y
+    def __get_band(self, y):
+        if self.__band_size <= 0:
+            return 0
+        band = int((y - self.__min_y) / self.__band_size)
+        return min(max(band, 0), self.__band_count - 1)
+
     # Returns True if the point at the given X, Y
-    # is inside the polygon, else false
-    def contains(self, x, y):
+    # is inside the polygon, else false. The id of
+    # the leaf S2 cell of the point may be given.
+    def contains(self, x, y, cell_id=None):
         # Quick check the boundary box of the entire polygon
         if self.__max_x < x or x < self.__min_x \
                 or self.__max_y < y or y < self.__min_y:
             return False
 
+        # Check if the point is in a cell entirely inside or outside
+        if self.__cell_level is not None:
+            if cell_id is None:
+                cell_id = s2cell.lat_lon_to_cell_id(x, y, 30)
+            lsb = 1 << (2 * (30 - self.__cell_level))
+            inside = self.__cells.get((cell_id & -lsb) | lsb)
+            if inside is not None:
+                return inside
+
         # If it is inside the boundary box, use a raycast
         # from the line and toggle for every edge it hits
         inside = False
-        p1x, p1y = self.__points[0]
-        n = len(self.__points)
-        for i in range(1, n + 1):
-            p2x, p2y = self.__points[i % n]
-            if min(p1y, p2y) < y <= max(p1y, p2y) and x <= max(p1x, p2x):
-                if p1y != p2y:
-                    xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                if p1x == p2x or x <= xinters:
+        for min_y, max_y, max_x, p1x, p1y, p2x, p2y \
+                in self.__bands[self.__get_band(y)]:
+            if min_y < y <= max_y and x <= max_x:
+                if p1x == p2x or \
+                        x <= (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x:
                     inside = not inside
-            p1x, p1y = p2x, p2y
         return inside
 
+    # Returns the boundary box as (min_x, min_y, max_x, max_y)
+    def get_bounds(self):
+        return self.__min_x, self.__min_y, self.__max_x, self.__max_y
+
+    # Returns the level of the S2 cells covering this geofence, or None
+    def get_cell_level(self):
+        return self.__cell_level
+
+    # Returns the points that make up this geofence
+    def get_points(self):
+        return self.__points
+
     # Returns the name of this geofence
     def get_name(self):
         return self.__name
+
+
+class GeofenceIndex(OrderedDict):
+    """ Geofences by name, with a grid over their boundary boxes.
+
+    Each cell of the grid lists the geofences whose boundary box overlaps
+    it, so finding the geofences that might contain a point is a single
+    lookup instead of a test of every geofence. The grid is built when the
+    index is created, so geofences should not be added afterwards.
+
+    The geofences that contain a point are remembered for the most recently
+    checked points, so every filter of a Manager checking the same event
+    (or events at the same stop, gym or spawnpoint) shares the result.
+    """
+
+    # Highest number of cells along each side of the grid
+    MAX_CELLS = 256
+
+    # Points whose results are remembered, unless configured
+    DEFAULT_CACHE_SIZE = 10000
+
+    def __init__(self, geofences=(), cache_size=None):
+        super(GeofenceIndex, self).__init__(geofences)
+        if cache_size is None:
+            cache_size = config.get(
+                'GEOFENCE_CACHE_SIZE', self.DEFAULT_CACHE_SIZE)
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+        self._cells = {}
+        self._covered = any(
+            gf.get_cell_level() is not None for gf in self.values())
+        if len(self) == 0:
+            return
+
+        bounds = [gf.get_bounds() for gf in self.values()]
+        self._min_x = min(b[0] for b in bounds)
+        self._min_y = min(b[1] for b in bounds)
+        self._count = min(
+            self.MAX_CELLS, 2 * int(math.ceil(math.sqrt(len(self)))))
+        self._size_x = (max(b[2] for b in bounds) - self._min_x) / self._count
+        self._size_y = (max(b[3] for b in bounds) - self._min_y) / self._count
+
+        cells = {}
+        for name, (min_x, min_y, max_x, max_y) in zip(self.keys(), bounds):
+            for i in range(self._get_cell(min_x, self._min_x, self._size_x),
+                           self._get_cell(max_x, self._min_x, self._size_x)
+                           + 1):
+                for j in range(
+                        self._get_cell(min_y, self._min_y, self._size_y),
+                        self._get_cell(max_y, self._min_y, self._size_y) + 1):
+                    cells.setdefault((i, j), set()).add(name)
+        self._cells = {k: frozenset(v) for k, v in cells.items()}
+
+    def __reduce__(self):
+        # Rebuild the grid when copied or unpickled
+        return self.__class__, (list(self.items()), self._cache_size)
+
+    def _get_cell(self, value, start, size):
+        """ Returns the cell of a coordinate along one side of the grid. """
+        if size <= 0:
+            return 0
+        return min(max(int((value - start) / size), 0), self._count)
+
+    def get_candidates(self, x, y):
+        """ Returns the names of the geofences that may contain a point. """
+        if len(self._cells) == 0:
+            return frozenset()
+        return self._cells.get((
+            self._get_cell(x, self._min_x, self._size_x),
+            self._get_cell(y, self._min_y, self._size_y)), frozenset())
+
+    def get_cell_id(self, x, y):
+        """ Returns the id of the leaf S2 cell of a point, if needed. """
+        if not self._covered:
+            return None
+        return s2cell.lat_lon_to_cell_id(x, y, 30)
+
+    def get_containing(self, x, y):
+        """ Returns the names of the geofences that contain a point. """
+        key = (x, y)
+        containing = self._cache.get(key)
+        if containing is not None:
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return containing
+
+        self._misses += 1
+        containing = ()
+        candidates = self.get_candidates(x, y)
+        if len(candidates) > 0:
+            cell_id = self.get_cell_id(x, y)
+            containing = tuple(
+                name for name, gf in self.items()
+                if name in candidates and gf.contains(x, y, cell_id))
+        if self._cache_size > 0:
+            self._cache[key] = containing
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return containing
+
+    def get_stats(self):
+        """ Returns a dict of counters describing the remembered points. """
+        lookups = self._hits + self._misses
+        return {
+            'size': len(self._cache),
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+        }
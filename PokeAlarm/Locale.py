@@ -1,10 +1,8 @@
 # Standard Library Imports
-import os
-import json
 import logging
 # 3rd Party Imports
 # Local Imports
-from .Utils import get_path, get_raw_form_names
+from .GameData import get_game_data
 
 log = logging.getLogger('Locale')
 
@@ -17,14 +15,15 @@ class Locale(object):
     def __init__(self, language):
         # Set language name
         self.name = language
+        game_data = get_game_data()
+        if language not in game_data.locales:
+            raise ValueError("No locale file found for '{}'.".format(
+                language))
         # Load in English as the default
-        with open(os.path.join(get_path('locales'), 'en.json')) as f:
-            default = json.loads(f.read())
+        default = game_data.locales['en']
         # Now load in the actual language we want
         # (unnecessary for English but we don't want to discriminate)
-        with open(os.path.join(
-                get_path('locales'), '{}.json'.format(language))) as f:
-            info = json.loads(f.read())
+        info = game_data.locales[language]
 
         # Pokemon ID -> Name
         self.__pokemon_names = {}
@@ -91,7 +90,7 @@ class Locale(object):
                     costume_id)] = pkmn_costumes.get(costume_id, costume_name)
 
         # Pokemon ID -> { Form ID -> Explicitly English Form Name }
-        raw_form_names = get_raw_form_names()
+        raw_form_names = game_data.form_names
         self.__english_form_names = {}
         for id_ in raw_form_names:
             self.__english_form_names[id_] = {}
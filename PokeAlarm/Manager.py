@@ -9,7 +9,8 @@ from datetime import datetime, timedelta
 
 # 3rd Party Imports
 import gevent
-from gevent.queue import Queue
+import numpy as np
+from gevent.queue import Empty
 from gevent.event import Event
 
 # Local Imports
@@ -23,14 +24,62 @@ from .LocationServices import GMaps
 from PokeAlarm import Unknown
 from PokeAlarm.Utilities.Logging import ContextFilter, setup_file_handler
 from PokeAlarm.Utilities.GenUtils import parse_bool
-from .Utils import (get_earth_dist, get_path, get_cardinal_dir)
+from PokeAlarm.Utilities import PvpUtils
+from .Utils import (get_earth_dist, get_path, get_cardinal_dir,
+                    get_earth_dists, get_cardinal_dirs)
 from . import config
 Rule = namedtuple('Rule', ['filter_names', 'alarm_names'])
+# What was computed ahead for an event, as part of a batch
+Prepared = namedtuple('Prepared', ['distance', 'direction', 'rejects'])
+
+# Attribute identifying the entity of each type of event, so that the events
+# of an entity are always processed in order by the same worker
+SHARD_KEYS = {
+    Events.MonEvent: 'enc_id',
+    Events.StopEvent: 'stop_id',
+    Events.GruntEvent: 'stop_id',
+    Events.QuestEvent: 'stop_id',
+    Events.GymEvent: 'gym_id',
+    Events.EggEvent: 'gym_id',
+    Events.RaidEvent: 'gym_id',
+    Events.WeatherEvent: 's2_cell_id'
+}
+
+# Attribute holding the time each type of event expires at
+DEADLINES = {
+    Events.MonEvent: 'disappear_time',
+    Events.StopEvent: 'expiration',
+    Events.GruntEvent: 'expiration',
+    Events.EggEvent: 'hatch_time',
+    Events.RaidEvent: 'raid_end'
+}
+
+# Filters used for each type of event
+FILTERS = {
+    Events.MonEvent: '_mon_filters',
+    Events.StopEvent: '_stop_filters',
+    Events.GruntEvent: '_grunt_filters',
+    Events.GymEvent: '_gym_filters',
+    Events.EggEvent: '_egg_filters',
+    Events.RaidEvent: '_raid_filters',
+    Events.WeatherEvent: '_weather_filters',
+    Events.QuestEvent: '_quest_filters'
+}
+
+# Attributes each manager sets on events as it processes them, which can't
+# be read ahead for a batch (another manager may change them meanwhile)
+MANAGER_ATTRS = {'distance', 'direction', 'slots_available', 'guard_count',
+                 'old_team_id', 'current_team_id'}
 
 
 class Manager(object):
     def __init__(self, name, google_key, locale, units, timezone, time_limit,
-                 max_attempts, location, cache_type, geofence_file, debug):
+                 max_attempts, location, cache_type, geofence_file, debug,
+                 alarm_concurrency=1, alarm_queue_size=1000,
+                 alarm_overflow='drop_oldest', workers=1,
+                 priority_mode='fifo', priority_weights=None,
+                 deadline_first=False, batch_size=1,
+                 adaptive_filters=False):
         # Set the name of the Manager
         self.name = str(name).lower()
         self._log = self._create_logger(self.name)
@@ -76,6 +125,9 @@ class Manager(object):
         self._quest_enabled, self._quest_filters = False, OrderedDict()
         self._grunts_enabled, self._grunt_filters = False, OrderedDict()
 
+        # Whether filters order their checks by how they fare at runtime
+        self._adaptive_filters = adaptive_filters
+
         # Create the Geofences to filter with from given file
         self.geofences = None
         if str(geofence_file).lower() != 'none':
@@ -84,6 +136,12 @@ class Manager(object):
         self._alarms = {}
         self._max_attempts = int(max_attempts)  # TODO: Move to alarm level
 
+        # Dispatchers used to send notifications without blocking
+        self._dispatchers = {}
+        self._alarm_concurrency = int(alarm_concurrency)
+        self._alarm_queue_size = int(alarm_queue_size)
+        self._alarm_overflow = alarm_overflow
+
         # Initialize Rules
         self.__mon_rules = {}
         self.__stop_rules = {}
@@ -94,26 +152,54 @@ class Manager(object):
         self.__quest_rules = {}
         self.__grunt_rules = {}
 
-        # Initialize the queue and start the process
-        self.__queue = Queue()
+        # Initialize a queue for each worker and start the process, with a
+        # lane for each type of event drained by priority
+        if priority_weights is None:
+            priority_weights = Events.default_weights
+        self.__lane_of, weights = Events.get_event_lanes(priority_weights)
+        self.__queues = []
+        for _ in range(max(1, int(workers))):
+            if deadline_first:  # Events expiring first are processed first
+                queue = Events.DeadlineQueue(self.get_deadline)
+            else:
+                queue = Events.LaneQueue(weights, priority_mode)
+            self.__queues.append(queue)
+        self._stale = {}  # type of event -> number dropped for expiring
+        # Events taken from a queue at a time, and what was computed ahead
+        # for those being processed (by id of the event)
+        self.__batch_size = max(1, int(batch_size))
+        self.__prepared = {}
+        self._batch_stats = {'batches': 0, 'events': 0, 'rejected': 0}
         self.__event = Event()
         self.__process = None
 
     # ~~~~~~~~~~~~~~~~~~~~~~~ MAIN PROCESS CONTROL ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-    # Update the object into the queue
+    # Update the object into the queue of the worker handling its entity
     def update(self, obj):
-        self.__queue.put(obj)
+        queues = self.__queues
+        lane = self.__lane_of.get(type(obj), 0)
+        if len(queues) == 1:
+            queues[0].put(lane, obj)
+            return
+        key = getattr(obj, SHARD_KEYS.get(type(obj), 'id'), None)
+        queues[hash(key) % len(queues)].put(lane, obj)
 
     # Get the name of this Manager
     def get_name(self):
         return self.name
 
+    @staticmethod
+    def get_deadline(event):
+        """ Returns the time an event expires at, or None if it doesn't. """
+        deadline = getattr(event, DEADLINES.get(type(event), ''), None)
+        return deadline if isinstance(deadline, datetime) else None
+
     # Tell the process to finish up and go home
     def stop(self):
         self._log.info(
             "Manager {} shutting down... {} items in queue."
-            "".format(self.name, self.__queue.qsize()))
+            "".format(self.name, sum(q.qsize() for q in self.__queues)))
         self.__event.set()
 
     def join(self):
@@ -226,6 +312,7 @@ class Manager(object):
             raise ValueError("Unable to add Monster Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.MonFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._mon_filters[name] = f
         self._log.debug("Monster filter '%s' set: %s", name, f)
 
@@ -241,6 +328,7 @@ class Manager(object):
             raise ValueError("Unable to add Stop Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.StopFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._stop_filters[name] = f
         self._log.debug("Stop filter '%s' set: %s", name, f)
 
@@ -261,6 +349,7 @@ class Manager(object):
             raise ValueError("Unable to add Gym Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.GymFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._gym_filters[name] = f
         self._log.debug("Gym filter '%s' set: %s", name, f)
 
@@ -276,6 +365,7 @@ class Manager(object):
             raise ValueError("Unable to add Egg Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.EggFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._egg_filters[name] = f
         self._log.debug("Egg filter '%s' set: %s", name, f)
 
@@ -291,6 +381,7 @@ class Manager(object):
             raise ValueError("Unable to add Raid Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.RaidFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._raid_filters[name] = f
         self._log.debug("Raid filter '%s' set: %s", name, f)
 
@@ -306,6 +397,7 @@ class Manager(object):
             raise ValueError("Unable to add Weather Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.WeatherFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._weather_filters[name] = f
         self._log.debug("Weather filter '%s' set: %s", name, f)
 
@@ -321,6 +413,7 @@ class Manager(object):
             raise ValueError("Unable to add Quest Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.QuestFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._quest_filters[name] = f
         self._log.debug("Quest filter '%s' set: %s", name, f)
 
@@ -336,9 +429,56 @@ class Manager(object):
             raise ValueError("Unable to add Invasion Filter: Filter with the "
                              "name {} already exists!".format(name))
         f = Filters.GruntFilter(self, name, settings, self.geofences)
+        f.set_adaptive(self._adaptive_filters)
         self._grunt_filters[name] = f
         self._log.debug("Invasion filter '%s' set: %s", name, f)
 
+    # Get the kinds of events that this Manager needs to be sent
+    def get_event_types(self):
+        types = set()
+        if self._mons_enabled:
+            types.add(Events.MonEvent)
+        if self._stops_enabled:
+            types.add(Events.StopEvent)
+        if self._grunts_enabled:
+            types.add(Events.GruntEvent)
+        # Gym teams and slots are also cached for eggs and raids
+        if self._gyms_enabled or self._eggs_enabled or self._raids_enabled:
+            types.add(Events.GymEvent)
+        if self._eggs_enabled:
+            types.add(Events.EggEvent)
+        if self._raids_enabled:
+            types.add(Events.RaidEvent)
+        if self._weather_enabled:
+            types.add(Events.WeatherEvent)
+        if self._quest_enabled:
+            types.add(Events.QuestEvent)
+        return types
+
+    # Get the geofences that events of a kind must be in (None for anywhere)
+    def get_coverage(self, kind):
+        filters = {
+            Events.MonEvent: [self._mon_filters],
+            Events.StopEvent: [self._stop_filters],
+            Events.GruntEvent: [self._grunt_filters],
+            # Gym teams and slots are also cached for eggs and raids
+            Events.GymEvent: [
+                self._gym_filters, self._egg_filters, self._raid_filters],
+            Events.EggEvent: [self._egg_filters],
+            Events.RaidEvent: [self._raid_filters],
+            Events.WeatherEvent: [self._weather_filters],
+            Events.QuestEvent: [self._quest_filters]
+        }.get(kind)
+        if filters is None:
+            return None
+        coverage = set()
+        for filter_dict in filters:
+            for f in filter_dict.values():
+                if f.get_coverage() is None:
+                    return None
+                coverage.update(f.get_coverage())
+        return coverage
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ ALARMS API ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -347,9 +487,21 @@ class Manager(object):
         if name in self._alarms:
             raise ValueError("Unable to add new Alarm: Alarm with the name "
                              "{} already exists!".format(name))
+        # Dispatch settings are shared by all alarm types
+        concurrency = int(settings.pop(
+            'concurrency', self._alarm_concurrency))
+        queue_size = int(settings.pop('queue_size', self._alarm_queue_size))
+        overflow = settings.pop('overflow', self._alarm_overflow)
+
         alarm = Alarms.alarm_factory(
             self, settings, self._max_attempts, self._google_key)
         self._alarms[name] = alarm
+        self._dispatchers[name] = Alarms.Dispatcher(
+            self, name, alarm, concurrency, queue_size, overflow)
+
+    def get_alarm_stats(self):
+        """ Returns the dispatch counters for each alarm. """
+        return {name: d.get_stats() for name, d in self._dispatchers.items()}
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -527,62 +679,178 @@ class Manager(object):
             alarm.connect()
             alarm.startup_message()
 
+        # Start sending notifications
+        for dispatcher in self._dispatchers.values():
+            dispatcher.start()
+
     # Main event handler loop
     def run(self):
         self.setup_in_process()
+        workers = [gevent.spawn(self._process_queue, queue)
+                   for queue in self.__queues]
         last_clean = datetime.utcnow()
-        while True:  # Run forever and ever
+        while not self.__event.wait(timeout=5):  # Until told to stop
 
             # Clean out visited every 5 minutes
             if datetime.utcnow() - last_clean > timedelta(minutes=5):
                 self._log.debug("Cleaning cache...")
                 self.__cache.clean_and_save()
                 last_clean = datetime.utcnow()
+                for name, stats in self.get_alarm_stats().items():
+                    self._log.debug("Alarm %s dispatch stats: %s",
+                                    name, stats)
+                if self.geofences is not None:
+                    self._log.debug("Geofence lookup stats: %s",
+                                    self.geofences.get_stats())
+                self._log.debug("Cache stats: %s", self.__cache.get_stats())
+                self._log.debug("Stale events dropped: %s", self._stale)
+                self._log.debug("Batch stats: %s", self._batch_stats)
+                if self._adaptive_filters:
+                    self._log_check_stats()
+        # Let the workers empty their queues
+        gevent.joinall(workers)
+        # Finish sending notifications, save cache and exit
+        for dispatcher in self._dispatchers.values():
+            dispatcher.stop()
+        self.__cache.clean_and_save()
+        raise gevent.GreenletExit()
 
+    def _process_queue(self, queue):
+        """ Processes the events of a queue in order, until stopped. """
+        while True:
             try:  # Get next object to process
-                event = self.__queue.get(block=True, timeout=5)
-                event.update_with_cache(self.__cache)
-            except gevent.queue.Empty:
+                batch = [queue.get(block=True, timeout=5)]
+            except Empty:
                 # Check if the process should exit process
                 if self.__event.is_set():
                     break
                 # Explict context yield
                 gevent.sleep(0)
                 continue
+            # Take what else is waiting, up to the size of a batch
+            while len(batch) < self.__batch_size and queue.qsize() > 0:
+                batch.append(queue.get(block=False))
+
+            # Drop events expiring too soon, before doing any work on them
+            batch = [event for event in batch if not self._is_stale(event)]
+            if len(batch) > 1:
+                try:
+                    self._prepare_batch(batch)
+                except Exception as e:  # Events are processed one by one
+                    self._log.error("Encountered error preparing batch: "
+                                    "{}: {}".format(type(e).__name__, e))
+                    self._log.debug("Stack trace: \n {}"
+                                    "".format(traceback.format_exc()))
+            for event in batch:
+                self._process_event(event)
+                # Explict context yield
+                gevent.sleep(0)
 
-            try:
-                kind = type(event)
-                self._log.debug("Processing event: %s", event.id)
-                if kind == Events.MonEvent:
-                    self.process_monster(event)
-                elif kind == Events.StopEvent:
-                    self.process_stop(event)
-                elif kind == Events.GruntEvent:
-                    self.process_grunt(event)
-                elif kind == Events.GymEvent:
-                    self.process_gym(event)
-                elif kind == Events.EggEvent:
-                    self.process_egg(event)
-                elif kind == Events.RaidEvent:
-                    self.process_raid(event)
-                elif kind == Events.WeatherEvent:
-                    self.process_weather(event)
-                elif kind == Events.QuestEvent:
-                    self.process_quest(event)
-                else:
-                    self._log.error(
-                        "!!! Manager does not support {} events!".format(kind))
-                self._log.debug("Finished event: %s", event.id)
-            except Exception as e:
-                self._log.error("Encountered error during processing: "
-                                "{}: {}".format(type(e).__name__, e))
-                self._log.error("Stack trace: \n {}"
-                                "".format(traceback.format_exc()))
-            # Explict context yield
-            gevent.sleep(0)
-        # Save cache and exit
-        self.__cache.clean_and_save()
-        raise gevent.GreenletExit()
+    def _is_stale(self, event):
+        """ Returns true (and counts it) if an event expires too soon. """
+        deadline = self.get_deadline(event)
+        if deadline is None or (deadline - datetime.utcnow()
+                                ).total_seconds() >= self.__time_limit:
+            return False
+        kind = type(event).__name__
+        self._stale[kind] = self._stale.get(kind, 0) + 1
+        self._log.debug("Event %s was dropped because it expires "
+                        "too soon.", event.id)
+        return True
+
+    def _prepare_batch(self, events):
+        """ Computes ahead what can be computed for a batch of events at
+        once: their distance and direction, and which filters they already
+        fail the cheap checks of. """
+        distances = directions = [None] * len(events)
+        located = [i for i, e in enumerate(events)
+                   if type(e.lat) is float and type(e.lng) is float]
+        if self.__location is not None and len(located) > 0:
+            lats = np.array([events[i].lat for i in located])
+            lngs = np.array([events[i].lng for i in located])
+            distances, directions = list(distances), list(directions)
+            for i, dist, direction in zip(located, get_earth_dists(
+                    lats, lngs, self.__location, self.__units),
+                    get_cardinal_dirs(lats, lngs, self.__location)):
+                distances[i], directions[i] = dist, direction
+        rejects = [{} for _ in events]
+        # PvP info is only worked out for the events that get to need it
+        skip = MANAGER_ATTRS.union(PvpUtils.get_pvp_fields())
+
+        # Check the events of each type against the filters for it
+        kinds = {}
+        for i, event in enumerate(events):
+            kinds.setdefault(type(event), []).append(i)
+        for kind, indexes in kinds.items():
+            filters = getattr(self, FILTERS.get(kind, ''), None)
+            if not filters:
+                continue
+            values = {}
+            if self.__location is not None:
+                values['distance'] = [
+                    Unknown.TINY if distances[i] is None else distances[i]
+                    for i in indexes]
+            columns = Filters.EventColumns(
+                [events[i] for i in indexes], values, skip)
+            for f in filters.values():
+                for i, reject in zip(indexes, f.check_batch(columns)):
+                    if reject is not None:
+                        rejects[i][f] = reject
+                        self._batch_stats['rejected'] += 1
+
+        for event, dist, direction, reject in zip(
+                events, distances, directions, rejects):
+            self.__prepared[id(event)] = Prepared(dist, direction, reject)
+        self._batch_stats['batches'] += 1
+        self._batch_stats['events'] += len(events)
+
+    def _process_event(self, event):
+        """ Processes an event, notifying alarms if it passes. """
+        try:
+            event.update_with_cache(self.__cache)
+            kind = type(event)
+            self._log.debug("Processing event: %s", event.id)
+            if kind == Events.MonEvent:
+                self.process_monster(event)
+            elif kind == Events.StopEvent:
+                self.process_stop(event)
+            elif kind == Events.GruntEvent:
+                self.process_grunt(event)
+            elif kind == Events.GymEvent:
+                self.process_gym(event)
+            elif kind == Events.EggEvent:
+                self.process_egg(event)
+            elif kind == Events.RaidEvent:
+                self.process_raid(event)
+            elif kind == Events.WeatherEvent:
+                self.process_weather(event)
+            elif kind == Events.QuestEvent:
+                self.process_quest(event)
+            else:
+                self._log.error(
+                    "!!! Manager does not support {} events!".format(kind))
+            self._log.debug("Finished event: %s", event.id)
+        except Exception as e:
+            self._log.error("Encountered error during processing: "
+                            "{}: {}".format(type(e).__name__, e))
+            self._log.error("Stack trace: \n {}"
+                            "".format(traceback.format_exc()))
+        finally:
+            self.__prepared.pop(id(event), None)
+
+    def _locate(self, event):
+        """ Sets the distance and direction of an event from the Manager. """
+        if self.__location is None:
+            return
+        prepared = self.__prepared.get(id(event))
+        if prepared is not None and prepared.distance is not None:
+            event.distance = prepared.distance
+            event.direction = prepared.direction
+            return
+        event.distance = get_earth_dist(
+            [event.lat, event.lng], self.__location, self.__units)
+        event.direction = get_cardinal_dir(
+            [event.lat, event.lng], self.__location)
 
     # Set the location of the Manager
     def set_location(self, location):
@@ -606,14 +874,27 @@ class Manager(object):
             self._log.info("Location successfully set to '{},{}'.".format(
                 location[0], location[1]))
 
+    def _log_check_stats(self):
+        """ Logs how the checks of each filter fare, in their order. """
+        for attr in FILTERS.values():
+            for name, f in getattr(self, attr).items():
+                stats = f.get_check_stats()
+                if len(stats) > 0:
+                    self._log.debug("Check stats of filter %s: %s",
+                                    name, stats)
+
     def _check_filters(self, event, filter_set, filter_names):
         """ Function for checking if an event passes any filters. """
+        prepared = self.__prepared.get(id(event))
         for name in filter_names:
             f = filter_set.get(name)
             # Filter should always exist, but sanity check anyway
             if f:
+                # Skip the filters the Event already failed in its batch
+                if prepared is not None and f in prepared.rejects:
+                    f.reject(event, *prepared.rejects[f])
                 # If the Event passes, return True
-                if f.check_event(event):
+                elif f.check_event(event):
                     event.custom_dts = f.custom_dts
                     return True
             else:
@@ -634,18 +915,13 @@ class Manager(object):
                 mode, (event.lat, event.lng), self.__location,
                 self._language, self.__units))
 
-        # Spawn notifications in threads so they can work asynchronously
-        threads = []
+        # Hand notifications off to the dispatchers so they send async
         for name in alarm_names:
-            alarm = self._alarms.get(name)
-            if not alarm:
+            dispatcher = self._dispatchers.get(name)
+            if not dispatcher:
                 self._log.critical("ERROR: No alarm named %s found!", name)
                 continue
-            func = getattr(alarm, func_name)
-            threads.append(gevent.spawn(func, dts))
-
-        for thread in threads:  # Wait for all alarms to finish
-            thread.join()
+            dispatcher.put(func_name, dts)
 
     # Process new Monster data and decide if a notification needs to be sent
     def process_monster(self, mon):
@@ -680,11 +956,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            mon.distance = get_earth_dist(
-                [mon.lat, mon.lng], self.__location, self.__units)
-            mon.direction = get_cardinal_dir(
-                [mon.lat, mon.lng], self.__location)
+        self._locate(mon)
 
         # Check for Rules
         rules = self.__mon_rules
@@ -740,11 +1012,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            stop.distance = get_earth_dist(
-                [stop.lat, stop.lng], self.__location, self.__units)
-            stop.direction = get_cardinal_dir(
-                [stop.lat, stop.lng], self.__location)
+        self._locate(stop)
 
         # Check for Rules
         rules = self.__stop_rules
@@ -801,11 +1069,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            grunt.distance = get_earth_dist(
-                [grunt.lat, grunt.lng], self.__location, self.__units)
-            grunt.direction = get_cardinal_dir(
-                [grunt.lat, grunt.lng], self.__location)
+        self._locate(grunt)
 
         # Check for Rules
         rules = self.__grunt_rules
@@ -835,12 +1099,6 @@ class Manager(object):
         # type: (Events.GymEvent) -> None
         """ Process a gym event and notify alarms if it passes. """
 
-        # Update Gym details (if they exist)
-        gym.gym_name = self.__cache.gym_name(gym.gym_id, gym.gym_name)
-        gym.gym_description = self.__cache.gym_desc(
-            gym.gym_id, gym.gym_description)
-        gym.gym_image = self.__cache.gym_image(gym.gym_id, gym.gym_image)
-
         # Ignore changes to neutral
         if self._ignore_neutral and gym.new_team_id == 0:
             self._log.debug("%s gym update skipped: new team was neutral",
@@ -864,11 +1122,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            gym.distance = get_earth_dist(
-                [gym.lat, gym.lng], self.__location, self.__units)
-            gym.direction = get_cardinal_dir(
-                [gym.lat, gym.lng], self.__location)
+        self._locate(gym)
 
         # Check for Rules
         rules = self.__gym_rules
@@ -897,12 +1151,6 @@ class Manager(object):
         # type: (Events.EggEvent) -> None
         """ Process a egg event and notify alarms if it passes. """
 
-        # Update Gym details (if they exist)
-        egg.gym_name = self.__cache.gym_name(egg.gym_id, egg.gym_name)
-        egg.gym_description = self.__cache.gym_desc(
-            egg.gym_id, egg.gym_description)
-        egg.gym_image = self.__cache.gym_image(egg.gym_id, egg.gym_image)
-
         # Update Team if Unknown
         if Unknown.is_(egg.current_team_id):
             egg.current_team_id = self.__cache.gym_team(egg.gym_id)
@@ -927,11 +1175,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            egg.distance = get_earth_dist(
-                [egg.lat, egg.lng], self.__location, self.__units)
-            egg.direction = get_cardinal_dir(
-                [egg.lat, egg.lng], self.__location)
+        self._locate(egg)
 
         # Check for Rules
         rules = self.__egg_rules
@@ -960,12 +1204,6 @@ class Manager(object):
         # type: (Events.RaidEvent) -> None
         """ Process a raid event and notify alarms if it passes. """
 
-        # Update Gym details (if they exist)
-        raid.gym_name = self.__cache.gym_name(raid.gym_id, raid.gym_name)
-        raid.gym_description = self.__cache.gym_desc(
-            raid.gym_id, raid.gym_description)
-        raid.gym_image = self.__cache.gym_image(raid.gym_id, raid.gym_image)
-
         # Update Team if Unknown
         if Unknown.is_(raid.current_team_id):
             raid.current_team_id = self.__cache.gym_team(raid.gym_id)
@@ -990,11 +1228,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            raid.distance = get_earth_dist(
-                [raid.lat, raid.lng], self.__location, self.__units)
-            raid.direction = get_cardinal_dir(
-                [raid.lat, raid.lng], self.__location)
+        self._locate(raid)
 
         # Check for Rules
         rules = self.__raid_rules
@@ -1023,19 +1257,6 @@ class Manager(object):
         # type: (Events.WeatherEvent) -> None
         """ Process a weather event and notify alarms if it passes. """
 
-        # Store copy of cache info
-        cache_weather_id = self.__cache.cell_weather_id(weather.s2_cell_id)
-        cache_day_or_night_id = self.__cache.day_or_night_id(
-            weather.s2_cell_id)
-        cache_severity_id = self.__cache.severity_id(weather.s2_cell_id)
-
-        # Update cache info
-        self.__cache.cell_weather_id(weather.s2_cell_id,
-                                     weather.weather_id)
-        self.__cache.day_or_night_id(
-            weather.s2_cell_id, weather.day_or_night_id)
-        self.__cache.severity_id(weather.s2_cell_id, weather.severity_id)
-
         # Make sure that weather changes are enabled
         if self._weather_enabled is False:
             self._log.debug("Weather ignored: weather change "
@@ -1043,16 +1264,12 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            weather.distance = get_earth_dist(
-                [weather.lat, weather.lng], self.__location, self.__units)
-            weather.direction = get_cardinal_dir(
-                [weather.lat, weather.lng], self.__location)
+        self._locate(weather)
 
         # Check and see if the weather hasn't changed and ignore
-        if weather.weather_id == cache_weather_id and \
-                weather.day_or_night_id == cache_day_or_night_id and \
-                weather.severity_id == cache_severity_id:
+        if weather.weather_id == weather.old_weather_id and \
+                weather.day_or_night_id == weather.old_day_or_night_id and \
+                weather.severity_id == weather.old_severity_id:
             self._log.debug(
                 "weather of %s, alert of %s, and day or night of %s skipped: "
                 "no change detected",
@@ -1097,11 +1314,7 @@ class Manager(object):
             return
 
         # Calculate distance and direction
-        if self.__location is not None:
-            quest.distance = get_earth_dist(
-                [quest.lat, quest.lng], self.__location, self.__units)
-            quest.direction = get_cardinal_dir(
-                [quest.lat, quest.lng], self.__location)
+        self._locate(quest)
 
         # Store a copy of cache info
         previous_modified = self.__cache.quest_expiration(quest.stop_id)
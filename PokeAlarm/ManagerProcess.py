@@ -0,0 +1,277 @@
+# Standard Library Imports
+import logging
+import logging.handlers
+import os
+import pickle
+import signal
+import struct
+import time
+import traceback
+# 3rd Party Imports
+import gevent
+import gevent.os
+from gevent.lock import Semaphore
+# Local Imports
+from . import Events
+from .Cache import WorldState
+from .Cache.SqliteCache import reopen_databases
+
+log = logging.getLogger('pokealarm.processes')
+
+# Header sent before each message, holding its length
+_header = struct.Struct('!I')
+
+# Bytes read from a pipe at a time
+_read_size = 65536
+
+# Processes started by the server, whose pipes are closed in the others
+_started = []
+
+
+def admit_webhook(data, routing, duplicates):
+    """ Returns what to do with a webhook, before it is parsed. """
+    # Drop webhooks that no manager needs
+    action = routing.get_action(data)
+    if action == Events.DROP:
+        return action
+    # Drop repeats of recent webhooks, remembering the others
+    key = Events.get_identity(data)
+    if duplicates.is_repeat(key):
+        return Events.DROP
+    duplicates.remember(key)
+    return action
+
+
+def distribute_webhook(data, routing, world_state, duplicates, logger):
+    """ Parses a webhook and hands its events to the managers needing them. """
+    action = admit_webhook(data, routing, duplicates)
+    if action == Events.DROP:
+        return
+    obj = Events.event_factory(data)
+    if obj is None:  # TODO: Improve Event error checking
+        return
+    events = obj if isinstance(obj, list) else [obj]
+    # Update the shared state once, before handing out the events
+    for event in events:
+        world_state.update(event)
+    if action == Events.STATE:
+        return
+    for event in events:
+        receivers = routing.get_receivers(event)
+        for mgr in receivers:
+            mgr.update(event)
+        logger.debug("Distributed event %s to %s managers.",
+                     event.id, len(receivers))
+
+
+class Pipe(object):
+    """ One end of a pipe carrying pickled messages between processes.
+
+    Reads and writes only block the greenlet using the pipe, so the rest of
+    the process keeps running while it waits. Greenlets sending at the same
+    time take turns, so their messages are never mixed together.
+    """
+
+    def __init__(self, fd):
+        self._fd = fd
+        self._buffer = bytearray()
+        self._send_lock = Semaphore()
+        gevent.os.make_nonblocking(fd)
+
+    def send(self, obj):
+        """ Writes a message to the pipe. """
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        view = memoryview(_header.pack(len(data)) + data)
+        with self._send_lock:  # A partial write yields to other greenlets
+            while len(view) > 0:
+                view = view[gevent.os.nb_write(self._fd, view):]
+
+    def recv(self):
+        """ Returns the next message, or raises EOFError once closed. """
+        buf = self._buffer
+        while True:
+            if len(buf) >= _header.size:
+                end = _header.size + _header.unpack_from(buf)[0]
+                if len(buf) >= end:
+                    obj = pickle.loads(buf[_header.size:end])
+                    del buf[:end]
+                    return obj
+            chunk = gevent.os.nb_read(self._fd, _read_size)
+            if len(chunk) == 0:
+                raise EOFError("Pipe was closed.")
+            buf += chunk
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PipeQueue(object):
+    """ Sends the records of a QueueHandler through a pipe. """
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+
+    def put_nowait(self, record):
+        self._pipe.send(record)
+
+
+class ManagerProcess(object):
+    """ Runs a group of managers in a separate OS process.
+
+    The server forwards the raw webhooks needed by the managers through a
+    pipe, and the process parses them, keeps its own WorldState and hands
+    the events to its managers. Log records are sent back through a second
+    pipe, and handled by the loggers of the server. The process exits once
+    the server closes its end of the pipe, after its managers have stopped
+    and saved their caches.
+    """
+
+    def __init__(self, index, managers, geographic=False, persist=False):
+        self._index = index
+        self._name = "Process_{}".format(index)
+        self._managers = list(managers)
+        self._geographic = geographic
+        self._persist = persist
+        # Built now, so the server can tell which webhooks to forward
+        self._routing = Events.RoutingTable(self._managers, geographic)
+        self._pid = None
+        self._frames = None
+        self._logs = None
+        self._log_reader = None
+
+    def get_name(self):
+        return self._name
+
+    def get_manager_names(self):
+        return [mgr.get_name() for mgr in self._managers]
+
+    def start(self):
+        """ Forks the process and starts its managers. """
+        frames_r, frames_w = os.pipe()
+        logs_r, logs_w = os.pipe()
+        pid = gevent.os.fork()
+        if pid == 0:  # Child process
+            os.close(frames_w)
+            os.close(logs_r)
+            code = 0
+            try:
+                self._frames, self._logs = Pipe(frames_r), Pipe(logs_w)
+                self._run()
+            except Exception as e:
+                log.critical("Manager process {} encountered error: "
+                             "{}: {}".format(self._name, type(e).__name__, e))
+                log.debug("Stack trace: \n {}".format(traceback.format_exc()))
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(frames_r)
+        os.close(logs_w)
+        self._pid = pid
+        self._frames, self._logs = Pipe(frames_w), Pipe(logs_r)
+        self._log_reader = gevent.spawn(self._read_logs)
+        _started.append(self)
+        log.info("Started manager process %s (pid %s) for %s.", self._name,
+                 pid, ", ".join(self.get_manager_names()))
+
+    def send(self, data):
+        """ Forwards a webhook to the process, if its managers need it. """
+        if self._routing.get_action(data) != Events.DROP:
+            self._frames.send(data)
+
+    def stop(self):
+        """ Tells the process to finish up and exit. """
+        log.info("Manager process {} shutting down...".format(self._name))
+        self._frames.close()
+        self._frames = None
+
+    def join(self):
+        # Each manager may take up to 20 seconds to stop
+        deadline = time.time() + 10 + 20 * len(self._managers)
+        while gevent.os.waitpid(self._pid, os.WNOHANG)[0] == 0:
+            if time.time() > deadline:
+                log.warning("Manager process {} could not be stopped in "
+                            "time! Forcing process to stop.".format(
+                                self._name))
+                os.kill(self._pid, signal.SIGKILL)
+                gevent.os.waitpid(self._pid, 0)
+                break
+            gevent.sleep(0.1)
+        else:
+            log.info("Manager process {} successfully stopped!".format(
+                self._name))
+        self._log_reader.join(timeout=5)
+        self._release()
+        _started.remove(self)
+
+    def _read_logs(self):
+        """ Handles the log records sent by the process. """
+        while True:
+            try:
+                record = self._logs.recv()
+            except EOFError:
+                break
+            logging.getLogger(record.name).handle(record)
+
+    def _release(self):
+        """ Stops reading the logs and closes the pipes left open. """
+        self._log_reader.kill()
+        for pipe in (self._frames, self._logs):
+            if pipe is not None:
+                pipe.close()
+        self._frames = self._logs = None
+
+    def _setup_in_process(self):
+        # The server stops the process by closing the pipe
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        # Release what was inherited from the server's other processes
+        for proc in _started:
+            proc._release()
+        del _started[:]
+        reopen_databases()
+
+        # Send every record to the server, instead of writing them here
+        loggers = [logging.getLogger()] + [
+            logger for logger in logging.Logger.manager.loggerDict.values()
+            if isinstance(logger, logging.Logger)]
+        for logger in loggers:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+        logging.getLogger().addHandler(
+            logging.handlers.QueueHandler(_PipeQueue(self._logs)))
+
+    def _run(self):
+        self._setup_in_process()
+        world_state = WorldState(
+            self._persist, "world_state_{}".format(self._index))
+        duplicates = Events.DuplicateFilter(0, 0)  # Dropped by the server
+        world_state.migrate(mgr.get_name() for mgr in self._managers)
+
+        for mgr in self._managers:
+            mgr.start()
+        saver = gevent.spawn(self._save_world_state, world_state)
+        while True:
+            try:
+                data = self._frames.recv()
+            except EOFError:
+                break
+            distribute_webhook(
+                data, self._routing, world_state, duplicates, log)
+            # Explict context yield
+            gevent.sleep(0)
+
+        # Stop the managers, save the world state and exit
+        for mgr in self._managers:
+            mgr.stop()
+        for mgr in self._managers:
+            mgr.join()
+        saver.kill()
+        world_state.save()
+
+    def _save_world_state(self, world_state):
+        """ Saves the world state every 5 minutes, even with no webhooks. """
+        while True:
+            gevent.sleep(300)
+            world_state.save()
+            log.debug("World state stats of %s: %s",
+                      self._name, world_state.get_stats())
@@ -1,10 +1,8 @@
 # Standard Library Imports
-from glob import glob
-import json
 import re
 # 3rd Party Imports
 # Local Imports
-from PokeAlarm.Utils import get_path
+from PokeAlarm.GameData import get_game_data
 
 
 # Returns the id corresponding with the team name
@@ -12,18 +10,9 @@ from PokeAlarm.Utils import get_path
 def get_team_id(team_name):
     try:
         name = str(team_name).lower()
-        if not hasattr(get_team_id, 'ids'):
-            get_team_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['teams']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_team_id.ids[nm] = int(id_)
-        if name in get_team_id.ids:
-            return get_team_id.ids[name]
+        id_ = get_game_data().get_locale_id('teams', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except ValueError:
@@ -1,9 +1,7 @@
 # Standard Library Imports
-from glob import glob
-import json
 # 3rd Party Imports
 # Local Imports
-from PokeAlarm.Utils import get_path
+from PokeAlarm.GameData import get_game_data
 
 
 # Returns the id corresponding with the pokemon name
@@ -11,18 +9,9 @@ from PokeAlarm.Utils import get_path
 def get_monster_id(pokemon_name):
     try:
         name = str(pokemon_name).lower()
-        if not hasattr(get_monster_id, 'ids'):
-            get_monster_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['pokemon']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_monster_id.ids[nm] = int(id_)
-        if name in get_monster_id.ids:
-            return get_monster_id.ids[name]
+        id_ = get_game_data().get_locale_id('pokemon', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except ValueError:
@@ -34,18 +23,9 @@ def get_monster_id(pokemon_name):
 def get_move_id(move_name):
     try:
         name = str(move_name).lower()
-        if not hasattr(get_move_id, 'ids'):
-            get_move_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['moves']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_move_id.ids[nm] = int(id_)
-        if name in get_move_id.ids:
-            return get_move_id.ids[name]
+        id_ = get_game_data().get_locale_id('moves', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except Exception:
@@ -57,18 +37,9 @@ def get_move_id(move_name):
 def get_size_id(size_name):
     try:
         name = str(size_name).lower()
-        if not hasattr(get_size_id, 'sizes'):
-            get_size_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['sizes']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_size_id.ids[nm] = int(id_)
-        if name in get_size_id.ids:
-            return get_size_id.ids[name]
+        id_ = get_game_data().get_locale_id('sizes', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except Exception:
@@ -80,18 +51,9 @@ def get_size_id(size_name):
 def get_type_id(type_name):
     try:
         name = str(type_name).lower()
-        if not hasattr(get_type_id, 'types'):
-            get_type_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['types']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_type_id.ids[nm] = int(id_)
-        if name in get_type_id.ids:
-            return get_type_id.ids[name]
+        id_ = get_game_data().get_locale_id('types', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except Exception:
@@ -103,18 +65,9 @@ def get_type_id(type_name):
 def get_rarity_id(rarity_name):
     try:
         name = str(rarity_name).lower()
-        if not hasattr(get_rarity_id, 'rarity'):
-            get_rarity_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['rarity']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_rarity_id.ids[nm] = int(id_)
-        if name in get_rarity_id.ids:
-            return get_rarity_id.ids[name]
+        id_ = get_game_data().get_locale_id('rarity', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except Exception:
@@ -135,15 +88,6 @@ def get_pokemon_gender(gender):
 
 # Returns True if the pokemon is shiny in the wild
 def get_shiny_status(pokemon_id, form_id):
-    if not hasattr(get_shiny_status, 'info'):
-        get_shiny_status.info = {}
-        file_ = get_path('data/shiny_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_form_id_ in j:
-            if '*' not in id_form_id_ and j[id_form_id_] == ' \u2728':
-                get_shiny_status.info[id_form_id_] = True
-
-    return (get_shiny_status.info.get(f'{pokemon_id}', False)
-            or get_shiny_status.info.get(f'{pokemon_id}_{form_id}', False))
+    game_data = get_game_data()
+    return (pokemon_id in game_data.shiny_monsters
+            or (pokemon_id, form_id) in game_data.shiny_forms)
@@ -1,55 +1,181 @@
-import PokeAlarm.Utils as utils
+# Standard Library Imports
+from collections import OrderedDict, namedtuple
 import logging
 import re
+# 3rd Party Imports
+import numpy as np
+# Local Imports
+from PokeAlarm import config
+import PokeAlarm.Utils as utils
 
 log = logging.getLogger('PvpUtils')
 
-
-def pokemon_rating(limit, monster_id, form_id, atk, de, sta,
-                   min_level, max_level):
-    multipliers = utils.get_cp_multipliers()
-    base_stats = utils.get_base_stats(monster_id, form_id)
-    highest_rating = 0
-    highest_cp = 0
-    highest_level = 0
-    for level in range(int(min_level * 2), int((max_level + 0.5) * 2)):
-        level = str(level / float(2)).replace(".0", "")
-        cp = utils.calculate_cp(monster_id, form_id, atk, de, sta, level)
-        if not cp > limit:
-            attack = (base_stats["attack"] + atk) * multipliers[str(level)]
-            defense = (base_stats["defense"] + de) * multipliers[str(level)]
-            stamina = int(((base_stats["stamina"] + sta) *
-                           (multipliers[str(level)])))
-            product = attack * defense * stamina
-            if product > highest_rating:
-                highest_rating = product
-                highest_cp = cp
-                highest_level = level
-    return highest_rating, highest_cp, highest_level
+League = namedtuple('League', ['name', 'cp_limit'])
+
+# Leagues that are always calculated, since the built-in filters use them
+default_leagues = (League('great', 1500), League('ultra', 2500))
+
+# Attributes calculated for every league, prefixed with the league name
+league_fields = ('product', 'id', 'cp', 'level', 'candy', 'stardust', 'rank')
+
+# Rank tables ordered from least to most recently used
+_rank_tables = OrderedDict()
+
+
+def parse_league(value):
+    """ Parses a league given in the format 'name:cp_limit'. """
+    match = re.match(r'^\s*([a-z]+)\s*:\s*(\d+)\s*$', str(value).lower())
+    if match is None:
+        raise ValueError("'{}' is not a valid league! Leagues must be in the "
+                         "format 'name:cp_limit'.".format(value))
+    name, cp_limit = match.group(1), int(match.group(2))
+    if name in [league.name for league in default_leagues]:
+        raise ValueError("The {} league is always calculated and can't be "
+                         "redefined.".format(name))
+    return League(name, cp_limit)
+
+
+def get_leagues():
+    """ Returns the leagues that PvP info is calculated for. """
+    return default_leagues + tuple(config.get('PVP_LEAGUES', ()))
+
+
+def get_level_cap():
+    """ Returns the highest level a monster may be powered up to. """
+    return config.get('PVP_LEVEL_CAP', 50)
+
+
+def get_pvp_fields():
+    """ Returns the names of the attributes set by get_pvp_info. """
+    return tuple('{}_{}'.format(league.name, field)
+                 for league in get_leagues() for field in league_fields)
+
+
+class RankTable(object):
+    """ Best stats of all 4096 IV spreads of a monster in a single league.
+
+    All spreads are evaluated at once with NumPy, so building a table costs
+    less than rating a single spread level by level did, and lookups
+    afterwards are just an index into the arrays.
+    """
+
+    def __init__(self, monster_id, form_id, cp_limit, level_cap):
+        multipliers = utils.get_cp_multipliers()
+        levels = np.arange(2, int(level_cap * 2) + 1) / 2.0
+        cpm = np.array([multipliers['{:g}'.format(lvl)] for lvl in levels])
+
+        base_stats = utils.get_base_stats(monster_id, form_id)
+        ivs = np.arange(4096)
+        attack = base_stats['attack'] + (ivs >> 8)
+        defense = base_stats['defense'] + ((ivs >> 4) & 15)
+        stamina = base_stats['stamina'] + (ivs & 15)
+
+        # CP only grows with level, so the best level is the last that fits.
+        # Estimate it from the multipliers, then correct any rounding error
+        # by checking the exact CP on either side of the estimate.
+        stat_cp = attack * np.sqrt(defense) * np.sqrt(stamina)
+        cpm_sq = cpm ** 2
+        with np.errstate(divide='ignore'):
+            fits = np.searchsorted(cpm_sq, (cp_limit + 1) * 10 / stat_cp)
+        fits = np.minimum(fits, len(cpm))
+        fits -= (fits > 0) & (self._cp_at(stat_cp, cpm_sq, fits - 1)
+                              > cp_limit)
+        fits += (fits < len(cpm)) & (self._cp_at(stat_cp, cpm_sq, fits)
+                                     <= cp_limit)
+        valid = fits > 0
+        best = np.maximum(fits - 1, 0)
+        best_cpm = cpm[best]
+
+        product = (attack * best_cpm) * (defense * best_cpm) \
+            * np.floor(stamina * best_cpm)
+        self._product = np.where(valid, product, 0.0)
+        self._cp = np.where(
+            valid, self._cp_at(stat_cp, cpm_sq, best), 0).astype(np.int16)
+        self._half_level = np.where(valid, best + 2, 0).astype(np.uint8)
+
+        # Rank 1 is the highest product, equal products share a rank
+        descending = np.sort(self._product)[::-1]
+        self._rank = (np.searchsorted(
+            -descending, -self._product, side='left') + 1).astype(np.uint16)
+        self.best_product = float(descending[0])
+
+    @staticmethod
+    def _cp_at(stat_cp, cpm_sq, level_index):
+        """ Returns the CP of each spread at the given level indexes. """
+        level_index = np.clip(level_index, 0, len(cpm_sq) - 1)
+        return np.maximum(
+            (stat_cp * cpm_sq[level_index] / 10).astype(np.int64), 10)
+
+    def lookup(self, atk, de, sta):
+        """ Returns the percentage, cp, level and rank of a spread. """
+        i = (int(atk) << 8) | (int(de) << 4) | int(sta)
+        percentage = 0.0
+        if self.best_product > 0:
+            percentage = 100 * (float(self._product[i]) / self.best_product)
+        half_level = int(self._half_level[i])
+        level = '{:g}'.format(half_level / 2.0) if half_level > 0 else 0
+        return percentage, int(self._cp[i]), level, int(self._rank[i])
+
+
+def get_rank_table(monster_id, form_id, cp_limit, level_cap=None):
+    """ Returns the RankTable for a monster, building it if needed. """
+    if level_cap is None:
+        level_cap = get_level_cap()
+    key = (int(monster_id), int(form_id), int(cp_limit), level_cap)
+    table = _rank_tables.get(key)
+    if table is not None:
+        _rank_tables.move_to_end(key)
+        return table
+
+    table = RankTable(monster_id, form_id, cp_limit, level_cap)
+    _rank_tables[key] = table
+    while len(_rank_tables) > max(config.get('PVP_CACHE_SIZE', 256), 1):
+        _rank_tables.popitem(last=False)
+    return table
+
+
+def get_powerup_costs():
+    """ Returns the total candy, XL candy and stardust to reach each level.
+
+    Each list is indexed by twice the level, so the cost of powering up
+    from one level to another is the difference of two entries.
+    """
+    if not hasattr(get_powerup_costs, 'info'):
+        steps = {
+            'candy': (utils.get_candy_costs(), 40),
+            'xl_candy': (utils.get_xl_candy_costs(), 50),
+            'stardust': (utils.get_stardust_costs(), 50)
+        }
+        get_powerup_costs.info = {}
+        for name, (cost_table, max_level) in steps.items():
+            ranges = []
+            for cost_key, cost in cost_table.items():
+                lvls = re.findall(r"[\.\d]+", cost_key)
+                ranges.append((float(lvls[0]), float(lvls[1]), cost))
+            total = 0
+            totals = [0]
+            for half_level in range(0, 103):
+                level = half_level / 2.0
+                if level < max_level:
+                    total += sum(cost for low, high, cost in ranges
+                                 if low <= level <= high)
+                totals.append(total)
+            get_powerup_costs.info[name] = totals
+    return get_powerup_costs.info
+
+
+def powerup_cost(name, start_level, target_level):
+    """ Returns the cost of powering up between two levels. """
+    totals = get_powerup_costs()[name]
+    start = min(int(round(float(start_level) * 2)), len(totals) - 1)
+    target = min(int(round(float(target_level) * 2)), len(totals) - 1)
+    return totals[target] - totals[start] if target > start else 0
 
 
 def calculate_candy_cost(start_level, target_level, evo_candy_cost=0):
-    start_level = float(start_level)
-    target_level = float(target_level)
-    candy_table = utils.get_candy_costs()
-    xl_candy_table = utils.get_xl_candy_costs()
-    tmp_level = start_level
-    candy_cost = evo_candy_cost
-    xl_candy_cost = 0
-
-    while tmp_level < target_level and tmp_level < 40:
-        for cost_key in candy_table:
-            lvls = re.findall(r"[\.\d]+", cost_key)
-            if float(lvls[0]) <= tmp_level and tmp_level <= float(lvls[1]):
-                candy_cost += candy_table[cost_key]
-        tmp_level += 0.5
-
-    while tmp_level < target_level and tmp_level < 50:
-        for cost_key in xl_candy_table:
-            lvls = re.findall(r"[\.\d]+", cost_key)
-            if float(lvls[0]) <= tmp_level and tmp_level <= float(lvls[1]):
-                xl_candy_cost += xl_candy_table[cost_key]
-        tmp_level += 0.5
+    candy_cost = evo_candy_cost + powerup_cost(
+        'candy', start_level, target_level)
+    xl_candy_cost = powerup_cost('xl_candy', start_level, target_level)
 
     if xl_candy_cost != 0:
         return f'{candy_cost:,} + {xl_candy_cost:,} XL'.replace(',', ' ')
@@ -58,19 +184,7 @@ def calculate_candy_cost(start_level, target_level, evo_candy_cost=0):
 
 
 def calculate_stardust_cost(start_level, target_level):
-    start_level = float(start_level)
-    target_level = float(target_level)
-    stardust_table = utils.get_stardust_costs()
-
-    tmp_level = start_level
-    stardust_cost = 0
-    while tmp_level < target_level and tmp_level < 50:
-        for cost_key in stardust_table:
-            lvls = re.findall(r"[\.\d]+", cost_key)
-            if float(lvls[0]) <= tmp_level and tmp_level <= float(lvls[1]):
-                stardust_cost += stardust_table[cost_key]
-        tmp_level += 0.5
-
+    stardust_cost = powerup_cost('stardust', start_level, target_level)
     return f'{stardust_cost:,}'.replace(',', ' ')
 
 
@@ -93,92 +207,53 @@ def calculate_evolution_cost(monster_id, target_id, evolutions,
     return evo_candy_cost
 
 
-def get_pvp_info(monster_id, form_id, atk, de, sta, lvl):
-    lvl = float(lvl)
-
-    best_great_product = utils.get_best_great_product(monster_id, form_id)
-    best_ultra_product = utils.get_best_ultra_product(monster_id, form_id)
-
-    evolutions = utils.get_evolutions(monster_id, form_id, True)
-    evolution_costs = utils.get_evolution_costs(monster_id, form_id)
-
-    great_product, great_cp, great_level = pokemon_rating(
-        1500, monster_id, form_id, atk, de, sta, utils.min_level(
-            1500, monster_id, form_id),
-        utils.max_level(1500, monster_id, form_id))
-    great_rating = 100 * (great_product / best_great_product)
-    great_id = monster_id
-    great_candy = calculate_candy_cost(lvl, great_level)
-    great_stardust = calculate_stardust_cost(lvl, great_level)
-
-    ultra_product, ultra_cp, ultra_level = pokemon_rating(
-        2500, monster_id, form_id, atk, de, sta, utils.min_level(
-            2500, monster_id, form_id),
-        utils.max_level(2500, monster_id, form_id))
-    ultra_rating = 100 * (ultra_product / best_ultra_product)
-    ultra_id = monster_id
-    ultra_candy = calculate_candy_cost(lvl, ultra_level)
-    ultra_stardust = calculate_stardust_cost(lvl, ultra_level)
-
-    if float(great_level) < lvl:
-        great_rating = 0
-    if float(ultra_level) < lvl:
-        ultra_rating = 0
-
+def get_league_info(league, monster_id, form_id, atk, de, sta, lvl,
+                    evolutions, evolution_costs):
+    """ Returns the PvP info of the best evolution stage for a league. """
+    rating, cp, level, rank = get_rank_table(
+        monster_id, form_id, league.cp_limit).lookup(atk, de, sta)
+    best_id = monster_id
     evo_candy_cost = 0
+    if float(level) < lvl:
+        rating = 0
 
     for evolution in evolutions:
         evo_id, evo_form_id = re.findall(r"[\.\d]+", evolution)
         evo_id = int(evo_id)
         evo_form_id = int(evo_form_id)
 
-        best_great_product = utils.get_best_great_product(
-            evo_id, evo_form_id)
-        best_ultra_product = utils.get_best_ultra_product(
-            evo_id, evo_form_id)
-
-        great_product, evo_great_cp, evo_great_level = pokemon_rating(
-            1500, evo_id, evo_form_id, atk, de, sta, utils.min_level(
-                1500, evo_id, evo_form_id),
-            utils.max_level(1500, evo_id, evo_form_id))
-        ultra_product, evo_ultra_cp, evo_ultra_level = pokemon_rating(
-            2500, evo_id, evo_form_id, atk, de, sta, utils.min_level(
-                2500, evo_id, evo_form_id),
-            utils.max_level(2500, evo_id, evo_form_id))
-
-        evo_great = 100 * (great_product / best_great_product)
-        evo_ultra = 100 * (ultra_product / best_ultra_product)
-
-        if float(evo_great_level) < lvl:
-            evo_great = 0
-        if float(evo_ultra_level) < lvl:
-            evo_ultra = 0
-
-        if evo_great > great_rating:
-            great_rating = evo_great
-            great_cp = evo_great_cp
-            great_level = evo_great_level
-            great_id = evo_id
-            evo_candy_cost = calculate_evolution_cost(
-                monster_id, evo_id, evolutions, evolution_costs)
-            great_candy = calculate_candy_cost(
-                lvl, great_level, evo_candy_cost)
-            great_stardust = calculate_stardust_cost(
-                lvl, great_level)
-
-        if evo_ultra > ultra_rating:
-            ultra_rating = evo_ultra
-            ultra_cp = evo_ultra_cp
-            ultra_level = evo_ultra_level
-            ultra_id = evo_id
+        evo_rating, evo_cp, evo_level, evo_rank = get_rank_table(
+            evo_id, evo_form_id, league.cp_limit).lookup(atk, de, sta)
+        if float(evo_level) < lvl:
+            evo_rating = 0
+
+        if evo_rating > rating:
+            rating, cp, level, rank = evo_rating, evo_cp, evo_level, evo_rank
+            best_id = evo_id
             evo_candy_cost = calculate_evolution_cost(
                 monster_id, evo_id, evolutions, evolution_costs)
-            ultra_candy = calculate_candy_cost(
-                lvl, ultra_level, evo_candy_cost)
-            ultra_stardust = calculate_stardust_cost(
-                lvl, ultra_level)
-
-    return (float("{0:.2f}".format(great_rating)), great_id, great_cp,
-            great_level, great_candy, great_stardust,
-            float("{0:.2f}".format(ultra_rating)), ultra_id,
-            ultra_cp, ultra_level, ultra_candy, ultra_stardust)
+
+    name = league.name
+    return {
+        name + '_product': float("{0:.2f}".format(rating)),
+        name + '_id': best_id,
+        name + '_cp': cp,
+        name + '_level': level,
+        name + '_candy': calculate_candy_cost(lvl, level, evo_candy_cost),
+        name + '_stardust': calculate_stardust_cost(lvl, level),
+        name + '_rank': rank
+    }
+
+
+def get_pvp_info(monster_id, form_id, atk, de, sta, lvl):
+    """ Returns a dict of the PvP info of a monster for every league. """
+    lvl = float(lvl)
+    evolutions = utils.get_evolutions(monster_id, form_id, True)
+    evolution_costs = utils.get_evolution_costs(monster_id, form_id)
+
+    pvp_info = {}
+    for league in get_leagues():
+        pvp_info.update(get_league_info(
+            league, monster_id, form_id, atk, de, sta, lvl, evolutions,
+            evolution_costs))
+    return pvp_info
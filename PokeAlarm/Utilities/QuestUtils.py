@@ -1,27 +1,16 @@
 # Standard Library Imports
-from glob import glob
-import json
 # 3rd Party Imports
 # Local Imports
-from PokeAlarm.Utils import get_path
+from PokeAlarm.GameData import get_game_data
 
 
 # Returns type of quest reward (e.g. monster, dust, etc.)
 def get_reward_type(reward_type):
     try:
         name = str(reward_type).lower()
-        if not hasattr(get_reward_type, 'ids'):
-            get_reward_type.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['quest_reward_types']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_reward_type.ids[nm] = int(id_)
-        if name in get_reward_type.ids:
-            return get_reward_type.ids[name]
+        id_ = get_game_data().get_locale_id('quest_reward_types', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except ValueError:
@@ -53,18 +42,9 @@ def reward_string(quest, locale):
 def get_item_id(item_name):
     try:
         name = str(item_name).lower()
-        if not hasattr(get_item_id, 'ids'):
-            get_item_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['items']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_item_id.ids[nm] = int(id_)
-        if name in get_item_id.ids:
-            return get_item_id.ids[name]
+        id_ = get_game_data().get_locale_id('items', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except Exception:
@@ -1,9 +1,7 @@
 # Standard Library Imports
-from glob import glob
-import json
 # 3rd Party Imports
 # Local Imports
-from PokeAlarm.Utils import get_path
+from PokeAlarm.GameData import get_game_data
 
 
 # Returns the id corresponding with the lure_types name
@@ -11,18 +9,9 @@ from PokeAlarm.Utils import get_path
 def get_lure_id(lure_name):
     try:
         name = str(lure_name).lower()
-        if not hasattr(get_lure_id, 'ids'):
-            get_lure_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.loads(f.read())
-                    j = j['lure_types']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_lure_id.ids[nm] = int(id_)
-        if name in get_lure_id.ids:
-            return get_lure_id.ids[name]
+        id_ = get_game_data().get_locale_id('lure_types', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except ValueError:
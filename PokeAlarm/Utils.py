@@ -1,18 +1,18 @@
 # -*- coding: utf-8 -*-
 # Standard Library Imports
 from datetime import datetime, timedelta
-from glob import glob
-import json
 import logging
 from math import radians, sin, cos, atan2, sqrt, degrees
 import os
 import sys
 # 3rd Party Imports
+import numpy as np
 from s2cell import s2cell
 # Local Imports
 from PokeAlarm import not_so_secret_url
 from PokeAlarm import config
 from PokeAlarm import Unknown
+from PokeAlarm.GameData import get_game_data
 
 log = logging.getLogger('Utils')
 
@@ -78,393 +78,96 @@ def require_and_remove_key(key, _dict, location):
 # (use all locales for flexibility)
 def get_pkmn_id(pokemon_name):
     name = pokemon_name.lower()
-    if not hasattr(get_pkmn_id, 'ids'):
-        get_pkmn_id.ids = {}
-        files = glob(get_path('locales/*.json'))
-        for file_ in files:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-                j = j['pokemon']
-                for id_ in j:
-                    nm = j[id_].lower()
-                    get_pkmn_id.ids[nm] = int(id_)
-
-    return get_pkmn_id.ids.get(name)
+    return get_game_data().get_locale_id('pokemon', name)
 
 
 # Returns the id corresponding with the move (use all locales for flexibility)
 def get_move_id(move_name):
     name = move_name.lower()
-    if not hasattr(get_move_id, 'ids'):
-        get_move_id.ids = {}
-        files = glob(get_path('locales/*.json'))
-        for file_ in files:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-                j = j['moves']
-                for id_ in j:
-                    nm = j[id_].lower()
-                    get_move_id.ids[nm] = int(id_)
-
-    return get_move_id.ids.get(name)
+    return get_game_data().get_locale_id('moves', name)
 
 
 # Returns the id corresponding with the pokemon name
 # (use all locales for flexibility)
 def get_team_id(team_name):
     name = team_name.lower()
-    if not hasattr(get_team_id, 'ids'):
-        get_team_id.ids = {}
-        files = glob(get_path('locales/*.json'))
-        for file_ in files:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-                j = j['teams']
-                for id_ in j:
-                    nm = j[id_].lower()
-                    get_team_id.ids[nm] = int(id_)
-
-    return get_team_id.ids.get(name)
+    return get_game_data().get_locale_id('teams', name)
 
 
 # Returns type id corresponding with the type name
 def get_type_id(type_name):
-    if not hasattr(get_type_id, 'info'):
-        get_type_id.info = {}
-        file_ = get_path('locales/en.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_, name_ in j["types"].items():
-            get_type_id.info[name_.lower()] = int(id_)
-
-    return get_type_id.info.get(type_name.lower(), 0)
+    return get_game_data().get_type_id(type_name)
 
 
 # Returns the types of a move when requesting
 def get_move_type(move_id):
-    if not hasattr(get_move_type, 'info'):
-        get_move_type.info = {}
-        file1_ = get_path('data/fast_moves.json')
-        file2_ = get_path('data/charged_moves.json')
-        for file_ in [file1_, file2_]:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-            for mv in j:
-                get_move_type.info[mv['move_id']] = get_type_id(mv['type'])
-
-    return get_move_type.info.get(move_id, Unknown.SMALL)
+    move = get_game_data().moves.get(move_id)
+    return move['type'] if move is not None else Unknown.SMALL
 
 
 # Returns the damage of a move when requesting
 def get_move_damage(move_id):
-    if not hasattr(get_move_damage, 'info'):
-        get_move_damage.info = {}
-        file1_ = get_path('data/fast_moves.json')
-        file2_ = get_path('data/charged_moves.json')
-        for file_ in [file1_, file2_]:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-            for mv in j:
-                get_move_damage.info[mv['move_id']] = mv['power']
-
-    return get_move_damage.info.get(move_id, 'unkn')
+    move = get_game_data().moves.get(move_id)
+    return move['damage'] if move is not None else 'unkn'
 
 
 # Returns the dps of a move when requesting
 def get_move_dps(move_id):
-    if not hasattr(get_move_dps, 'info'):
-        get_move_dps.info = {}
-        file1_ = get_path('data/fast_moves.json')
-        file2_ = get_path('data/charged_moves.json')
-        for file_ in [file1_, file2_]:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-            for mv in j:
-                get_move_dps.info[mv['move_id']] = round(
-                    (mv['power'] / mv['duration']) * 1000, 2)
-
-    return get_move_dps.info.get(move_id, 'unkn')
+    move = get_game_data().moves.get(move_id)
+    return move['dps'] if move is not None else 'unkn'
 
 
 # Returns the duration of a move when requesting
 def get_move_duration(move_id):
-    if not hasattr(get_move_duration, 'info'):
-        get_move_duration.info = {}
-        file1_ = get_path('data/fast_moves.json')
-        file2_ = get_path('data/charged_moves.json')
-        for file_ in [file1_, file2_]:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-            for mv in j:
-                get_move_duration.info[mv['move_id']] = mv['duration']
-
-    return get_move_duration.info.get(move_id, 'unkn')
+    move = get_game_data().moves.get(move_id)
+    return move['duration'] if move is not None else 'unkn'
 
 
 # Returns the duration of a move when requesting
 def get_move_energy(move_id):
-    if not hasattr(get_move_energy, 'info'):
-        get_move_energy.info = {}
-        file1_ = get_path('data/fast_moves.json')
-        file2_ = get_path('data/charged_moves.json')
-        for file_ in [file1_, file2_]:
-            with open(file_, 'r') as f:
-                j = json.load(f)
-                f.close()
-            for mv in j:
-                get_move_energy.info[mv['move_id']] = abs(mv['energy_delta'])
-
-    return get_move_energy.info.get(move_id, 'unkn')
+    move = get_game_data().moves.get(move_id)
+    return move['energy'] if move is not None else 'unkn'
 
 
 # Returns the base height for a pokemon
 def get_base_height(pokemon_id):
-    if not hasattr(get_base_height, 'info'):
-        get_base_height.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            get_base_height.info[int(id_)] = j[id_].get('height')
-
-    return get_base_height.info.get(pokemon_id, 0)
+    return get_game_data().base_heights.get(pokemon_id, 0)
 
 
 # Returns the base weight for a pokemon
 def get_base_weight(pokemon_id):
-    if not hasattr(get_base_weight, 'info'):
-        get_base_weight.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            get_base_weight.info[int(id_)] = j[id_].get('weight')
-
-    return get_base_weight.info.get(pokemon_id, 0)
+    return get_game_data().base_weights.get(pokemon_id, 0)
 
 
 # Returns the types for a pokemon and its forms
 def get_base_stats(pokemon_id, form_id=0):
-    if not hasattr(get_base_stats, 'info'):
-        get_base_stats.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-            for id_ in j:
-                get_base_stats.info[f"{id_}_0"] = j[id_].get('stats')
-                if not (len(j[id_]["forms"]) == 1 and
-                        j[id_]["forms"].get("0")):
-                    for form_id_ in j[id_]["forms"]:
-                        if (j[id_]["forms"][form_id_]["name"] == "Shadow" or
-                                j[id_]["forms"][form_id_]["name"] ==
-                                "Purified" or
-                                j[id_]["forms"][form_id_]["name"] ==
-                                "Normal" or
-                                j[id_].get('forms').get(form_id_).get('stats')
-                                is None):
-                            get_base_stats.info[
-                                f"{id_}_{form_id_}"] = get_base_stats.info[
-                                f"{id_}_0"]
-                        else:
-                            get_base_stats.info[
-                                f"{id_}_{form_id_}"] = j[id_].get(
-                                'forms').get(
-                                form_id_).get(
-                                'stats')
-
-    return get_base_stats.info.get(f"{pokemon_id}_{form_id}",
-                                   {'attack': 0, 'defense': 0, 'stamina': 0})
+    return get_game_data().base_stats.get(
+        (pokemon_id, form_id), {'attack': 0, 'defense': 0, 'stamina': 0})
 
 
 # Returns possible evolutions for a pokemon and its forms
 def get_evolutions(base_pokemon_id, base_form_id=0, evolution_details=None):
-    if not hasattr(get_evolutions, 'info'):
-        get_evolutions.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            get_evolutions.info[f"{id_}_0"] = get_evolution_chain(
-                j,
-                id_,
-                '0',
-                None,
-                evolution_details)
-            if not (len(j[id_]["forms"]) == 1 and j[id_]["forms"].get("0")):
-                for form_id_ in j[id_]["forms"]:
-                    if (j[id_]["forms"][form_id_]["name"] == "Shadow" or
-                            j[id_]["forms"][form_id_]["name"] == "Purified" or
-                            j[id_]["forms"][form_id_]["name"] == "Normal"):
-                        get_evolutions.info[
-                            f"{id_}_{form_id_}"] = get_evolutions.info[
-                            f"{id_}_0"]
-                    else:
-                        get_evolutions.info[
-                            f"{id_}_{form_id_}"] = get_evolution_chain(
-                            j,
-                            id_,
-                            form_id_,
-                            None,
-                            evolution_details)
-
-    return get_evolutions.info.get(f"{base_pokemon_id}_{base_form_id}", [])
-
-
-# Return the list of evolutions depending on the form of the pokemon
-def get_evolution_chain(j, id_, form_id_, a=None, evolution_details=None):
-    if a is None:
-        a = []
-    if form_id_ != "0":
-        if j[id_].get('forms').get(form_id_).get('evolutions') is None:
-            pass
-        else:
-            for evo_id in j[id_].get('forms').get(form_id_).get('evolutions'):
-                if int(evo_id) <= 898:  # block unreleased generations
-                    if evolution_details:
-                        evo_form_id = j[id_].get('forms').get(form_id_).get(
-                            'evolutions').get(evo_id).get('form')
-                        a.append(f"{evo_id}_{evo_form_id}")
-                    else:
-                        a.append(int(evo_id))
-                    get_evolution_chain(
-                        j,
-                        str(j[id_].get('forms').get(form_id_).get(
-                            'evolutions').get(evo_id).get('pokemon')),
-                        str(j[id_].get('forms').get(form_id_).get(
-                            'evolutions').get(evo_id).get('form')),
-                        a,
-                        evolution_details)
-    else:
-        if j[id_].get('evolutions') is None:
-            pass
-        else:
-            for evo_id in j[id_].get('evolutions'):
-                if int(evo_id) <= 898:  # block unreleased generations
-                    if evolution_details:
-                        evo_form_id = j[id_].get(
-                            'evolutions').get(evo_id).get('form')
-                        a.append(f"{evo_id}_{evo_form_id}")
-                    else:
-                        a.append(int(evo_id))
-                    get_evolution_chain(
-                        j,
-                        str(j[id_].get('evolutions').get(
-                            evo_id).get('pokemon')),
-                        "0",
-                        a,
-                        evolution_details)
-    return a
+    evolutions = get_game_data().evolutions.get(
+        (base_pokemon_id, base_form_id), [])
+    if evolution_details:
+        return [f"{evo_id}_{evo_form_id}"
+                for evo_id, evo_form_id in evolutions]
+    return [evo_id for evo_id, _ in evolutions]
 
 
 # Returns evolution costs from a pokemon and its forms
 def get_evolution_costs(pokemon_id, form_id=0):
-    if not hasattr(get_evolution_costs, 'info'):
-        get_evolution_costs.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            get_evolution_costs.info[f"{id_}_0"] = get_evolution_cost_chain(
-                j,
-                str(id_),
-                "0")
-            if not (len(j[id_]["forms"]) == 1 and j[id_]["forms"].get("0")):
-                for form_id_ in j[id_]["forms"]:
-                    if (j[id_]["forms"][form_id_]["name"] == "Shadow" or
-                            j[id_]["forms"][form_id_]["name"] == "Purified" or
-                            j[id_]["forms"][form_id_]["name"] == "Normal"):
-                        get_evolution_costs.info[
-                            f"{id_}_{form_id_}"] = get_evolution_costs.info[
-                            f"{id_}_0"]
-                    else:
-                        get_evolution_costs.info[
-                            f"{id_}_{form_id_}"] = get_evolution_cost_chain(
-                                j,
-                                str(id_),
-                                str(form_id_))
-
-    return get_evolution_costs.info.get(f"{pokemon_id}_{form_id}", [])
-
-
-# Return the list of evolution costs depending on the form of the pokemon
-def get_evolution_cost_chain(j, id_, form_id_, a=None):
-    if a is None:
-        a = []
-    if form_id_ != "0":
-        if j[id_].get('forms').get(form_id_).get('evolutions') is None:
-            pass
-        else:
-            for evo_id in j[id_].get('forms').get(form_id_).get('evolutions'):
-
-                candy_cost = int(j[id_].get('forms').get(form_id_).get(
-                    'evolutions').get(evo_id).get('candyCost', 0))
-                if candy_cost != 0:  # block unreleased generations
-                    a.append(int(j[id_].get('forms').get(form_id_).get(
-                        'evolutions').get(evo_id).get('candyCost')))
-                    get_evolution_cost_chain(
-                        j,
-                        str(j[id_].get('forms').get(form_id_).get(
-                            'evolutions').get(evo_id).get('pokemon')),
-                        str(j[id_].get('forms').get(form_id_).get(
-                            'evolutions').get(evo_id).get('form')),
-                        a)
-    else:
-        if j[id_].get('evolutions') is None:
-            pass
-        else:
-            for evo_id in j[id_].get('evolutions'):
-                candy_cost = int((j[id_].get('evolutions').get(
-                    evo_id).get('candyCost', 0)))
-                if candy_cost != 0:  # block unreleased generations
-                    a.append(candy_cost)
-                    get_evolution_cost_chain(
-                        j,
-                        str(j[id_].get('evolutions').get(
-                            evo_id).get('pokemon')),
-                        "0",
-                        a)
-    return a
+    return get_game_data().evolution_costs.get((pokemon_id, form_id), [])
 
 
 # Returns default form names for all the pokemon
 def get_raw_form_names():
-    if not hasattr(get_raw_form_names, 'info'):
-        get_raw_form_names.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            get_raw_form_names.info[int(id_)] = {}
-            get_raw_form_names.info[int(id_)][0] = "Normal"
-            for form_id_ in j[id_]["forms"]:
-                if form_id_ != "0":
-                    get_raw_form_names.info[int(id_)][
-                        int(form_id_)] = j[id_]["forms"][form_id_]["name"]
-
-    return get_raw_form_names.info
+    return get_game_data().form_names
 
 
 # Return CP multipliers
 def get_cp_multipliers():
-    if not hasattr(get_cp_multipliers, 'info'):
-        file_ = get_path('data/cp_multipliers.json')
-        with open(file_, 'r') as f:
-            get_cp_multipliers.info = json.load(f)
-    return get_cp_multipliers.info
+    return get_game_data().cp_multipliers
 
 
 def max_level(limit, monster_id, form_id=0):
@@ -504,50 +207,19 @@ def calculate_cp(monster_id, form_id, atk, de, sta, lvl):
 
 # Returns the highest possible stat product for PvP great league for a pkmn
 def get_best_great_product(pokemon_id, form_id=0):
-    if not hasattr(get_best_great_product, 'info'):
-        get_best_great_product.info = {}
-        file_ = get_path('data/stat_products.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            for form_id_ in j[id_]:
-                get_best_great_product.info[f"{id_}_{form_id_}"] = j[id_][
-                    form_id_].get('1500_highest_product')
-
-    return get_best_great_product.info.get(f"{pokemon_id}_{form_id}")
+    return get_game_data().best_products.get((pokemon_id, form_id, 1500))
 
 
 # Returns the highest possible stat product for PvP ultra league for a pkmn
 def get_best_ultra_product(pokemon_id, form_id=0):
-    if not hasattr(get_best_ultra_product, 'info'):
-        get_best_ultra_product.info = {}
-        file_ = get_path('data/stat_products.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for id_ in j:
-            for form_id_ in j[id_]:
-                get_best_ultra_product.info[f"{id_}_{form_id_}"] = j[id_][
-                    form_id_].get('2500_highest_product')
-
-    return get_best_ultra_product.info.get(f"{pokemon_id}_{form_id}")
+    return get_game_data().best_products.get((pokemon_id, form_id, 2500))
 
 
 # Returns a cp range for a certain level of a pokemon caught in a raid
 def get_pokemon_cp_range(level, pokemon_id, form_id=0):
     stats = get_base_stats(pokemon_id, form_id)
 
-    if not hasattr(get_pokemon_cp_range, 'info'):
-        get_pokemon_cp_range.info = {}
-        file_ = get_path('data/cp_multipliers.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for lvl_ in j:
-            get_pokemon_cp_range.info[lvl_] = j[lvl_]
-
-    cp_multi = get_pokemon_cp_range.info["{}".format(level)]
+    cp_multi = get_cp_multipliers()["{}".format(level)]
 
     # minimum IV for a egg/raid pokemon is 10/10/10
     min_cp = int(
@@ -601,39 +273,7 @@ def get_gender_sym(gender):  # TODO - support other languages
 
 # Returns the types for a pokemon and its forms
 def get_base_types(pokemon_id, form_id=0):
-    if not hasattr(get_base_types, 'info'):
-        get_base_types.info = {}
-        file_ = get_path('data/pokemon_data.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-            for id_ in j:
-                get_base_types.info[
-                    f"{id_}_0"] = ([int(k) for k in j[id_].get('types')]
-                                   + [0] * 2)[:2]
-
-                if not (len(j[id_]["forms"]) == 1 and
-                        j[id_]["forms"].get("0")):
-                    for form_id_ in j[id_]["forms"]:
-                        if (j[id_]["forms"][form_id_]["name"] == "Shadow" or
-                                j[id_]["forms"][form_id_]["name"] ==
-                                "Purified" or
-                                j[id_]["forms"][form_id_]["name"] ==
-                                "Normal" or
-                                j[id_].get('forms').get(form_id_).get('types')
-                                is None):
-                            get_base_types.info[
-                                f"{id_}_{form_id_}"] = get_base_types.info[
-                                f"{id_}_0"]
-                        else:
-                            get_base_types.info[f"{id_}_{form_id_}"] = ([
-                                int(k) for k in j[id_].get(
-                                    'forms').get(
-                                    form_id_).get(
-                                    'types')]
-                                + [0] * 2)[:2]
-
-    return get_base_types.info.get(f"{pokemon_id}_{form_id}", [0, 0])
+    return get_game_data().base_types.get((pokemon_id, form_id), [0, 0])
 
 
 # Returns the types for a pokemon
@@ -644,55 +284,26 @@ def get_mon_type(pokemon_id, form_id=0):
 
 # Return the list of stardust costs for powering up a pokemon
 def get_stardust_costs():
-    if not hasattr(get_stardust_costs, 'info'):
-        get_stardust_costs.info = {}
-        file_ = get_path('data/powerup_costs.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for w_id in j:
-            get_stardust_costs.info[w_id] = j[w_id]
-
-    return get_stardust_costs.info.get('stardust')
+    return get_game_data().powerup_costs.get('stardust')
 
 
 # Return the list of candy costs for powering up a pokemon
 def get_candy_costs():
-    if not hasattr(get_stardust_costs, 'info'):
-        get_stardust_costs.info = {}
-        file_ = get_path('data/powerup_costs.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for w_id in j:
-            get_stardust_costs.info[w_id] = j[w_id]
-
-    return get_stardust_costs.info.get('candy')
+    return get_game_data().powerup_costs.get('candy')
 
 
 # Return the list of xl candy costs for powering up a pokemon
 def get_xl_candy_costs():
-    if not hasattr(get_stardust_costs, 'info'):
-        get_stardust_costs.info = {}
-        file_ = get_path('data/powerup_costs.json')
-        with open(file_, 'r') as f:
-            j = json.loads(f.read())
-        for w_id in j:
-            get_stardust_costs.info[w_id] = j[w_id]
-
-    return get_stardust_costs.info.get('xl_candy')
+    return get_game_data().powerup_costs.get('xl_candy')
 
 
 # Return a boolean for whether the monster or the type is weather boosted
 def is_weather_boosted(weather_id, pokemon_id=0, form_id=0, mon_type=None):
-    if not hasattr(is_weather_boosted, 'info'):
-        is_weather_boosted.info = {}
-        file_ = get_path('data/weather_boosts.json')
-        with open(file_, 'r') as f:
-            j = json.load(f)
-            f.close()
-        for w_id in j:
-            is_weather_boosted.info[w_id] = j[w_id]
-
-    boosted_types = is_weather_boosted.info.get(str(weather_id), {})
+    try:
+        boosted_types = get_game_data().weather_boosts.get(
+            int(weather_id), ())
+    except (TypeError, ValueError):
+        boosted_types = ()
     if mon_type is None:
         types = get_base_types(pokemon_id, form_id)
         return types[0] in boosted_types or types[1] in boosted_types
@@ -846,6 +457,18 @@ def get_cardinal_dir(pt_a, pt_b=None):
     return directions[int(round(bearing / 45))]
 
 
+# Return the cardinal directions of many points, as get_cardinal_dir would
+def get_cardinal_dirs(lats, lngs, pt_b):
+    lat1, lng1 = np.radians(pt_b[0]), np.radians(pt_b[1])
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    directions = np.array(["S", "SE", "E", "NE", "N", "NW", "W", "SW", "S"])
+    bearing = (np.degrees(np.arctan2(
+        np.cos(lat1) * np.sin(lat2)
+        - np.sin(lat1) * np.cos(lat2) * np.cos(lng2 - lng1),
+        np.sin(lng2 - lng1) * np.cos(lat2))) + 450) % 360
+    return directions[np.round(bearing / 45).astype(int)].tolist()
+
+
 # Return the distance formatted correctly
 def get_dist_as_str(dist, units):
     if units == 'imperial':
@@ -880,6 +503,20 @@ def get_earth_dist(pt_a, pt_b=None, units='imperial'):
     return dist
 
 
+# Return the distances of many points, as get_earth_dist would. Results may
+# differ from it in the last digits, as NumPy rounds slightly differently.
+def get_earth_dists(lats, lngs, pt_b, units='imperial'):
+    lat_a, lng_a = np.radians(lats), np.radians(lngs)
+    lat_b, lng_b = np.radians(pt_b[0]), np.radians(pt_b[1])
+    a = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * \
+        np.cos(lat_b) * np.sin((lng_b - lng_a) / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    radius = 6373000  # radius of earth in meters
+    if units == 'imperial':
+        radius = 6975175  # radius of earth in yards
+    return (c * radius).tolist()
+
+
 # Return the time as a string in different formats
 def get_time_as_str(t, timezone=None):
     if timezone is None:
@@ -933,19 +570,9 @@ def get_image_url(suffix):
 def get_weather_id(weather_name):
     try:
         name = str(weather_name).lower()
-        if not hasattr(get_weather_id, 'ids'):
-            get_weather_id.ids = {}
-            files = glob(get_path('locales/*.json'))
-            for file_ in files:
-                with open(file_, 'r') as f:
-                    j = json.load(f)
-                    f.close()
-                    j = j['weather']
-                    for id_ in j:
-                        nm = j[id_].lower()
-                        get_weather_id.ids[nm] = int(id_)
-        if name in get_weather_id.ids:
-            return get_weather_id.ids[name]
+        id_ = get_game_data().get_locale_id('weather', name)
+        if id_ is not None:
+            return id_
         else:
             return int(name)  # try as an integer
     except ValueError:
@@ -16,15 +16,21 @@ import traceback
 from glob import glob
 # 3rd Party Imports
 import configargparse
-from gevent import pywsgi, spawn, signal, pool, queue
+from gevent import pywsgi, spawn, signal, pool
 from flask import Flask, request, abort
 import pytz
 # Local Imports
 import PokeAlarm.Events as Events
 from PokeAlarm import config
 from PokeAlarm.Utilities.Logging import setup_std_handler, setup_file_handler
-from PokeAlarm.Cache import cache_options
+from PokeAlarm.Cache import Cache, cache_options, WorldState
+from PokeAlarm.Cache.BoundedDict import parse_map_limit
+from PokeAlarm.GameData import get_game_data
+from PokeAlarm.Alarms import overflow_options
 from PokeAlarm.Manager import Manager
+from PokeAlarm.ManagerProcess import (
+    ManagerProcess, admit_webhook, distribute_webhook)
+from PokeAlarm.Utilities.PvpUtils import parse_league
 from PokeAlarm.Utils import get_path, parse_boolean
 from PokeAlarm.Load import parse_rules_file, parse_filters_file, \
     parse_alarms_file
@@ -33,8 +39,12 @@ log = logging.getLogger('pokealarm.webserver')
 
 # Global Variables
 app = Flask(__name__)
-data_queue = queue.Queue()
+data_queue = None
 managers = {}
+processes = []
+world_state = None
+duplicates = None
+routing = None
 server = None
 
 
@@ -47,14 +57,17 @@ def index():
 def accept_webhook():
     try:
         data = json.loads(request.data)
-        count = 1
         if type(data) == dict:  # older webhook style
-            data_queue.put(data)
+            frames = [data]
         else:   # For data set in frame
-            count = len(data)
-            for frame in data:
-                data_queue.put(frame)
-        log.debug("Received %s event(s) from %s.", count, request.remote_addr)
+            frames = data
+        if not data_queue.put_frames(frames):
+            log.debug("Rejected %s event(s) from %s: queue is full.",
+                      len(frames), request.remote_addr)
+            # Send back 503, so the scanner tries again later
+            return "Queue is full", 503, {'Retry-After': '1'}
+        log.debug("Received %s event(s) from %s.",
+                  len(frames), request.remote_addr)
     except Exception as e:
         log.error("Encountered error while receiving webhook from %s: "
                   "(%s: %s)", request.remote_addr, type(e).__name__, e.message)
@@ -66,7 +79,17 @@ def accept_webhook():
 # Thread used to distribute the data into various processes
 def manage_webhook_data(_queue):
     warning_limit = datetime.utcnow()
+    last_save = datetime.utcnow()
     while True:
+        # Save the world state every 5 minutes
+        if datetime.utcnow() - last_save > timedelta(minutes=5):
+            last_save = datetime.utcnow()
+            if world_state is not None:
+                world_state.save()
+                log.debug("World state stats: %s", world_state.get_stats())
+            log.debug("Duplicate webhook stats: %s", duplicates.get_stats())
+            log.debug("Webhook routing stats: %s", routing.get_stats())
+            log.debug("Ingest queue stats: %s", _queue.get_stats())
         # Check queue length periodically
         if (datetime.utcnow() - warning_limit) > timedelta(seconds=30):
             warning_limit = datetime.utcnow()
@@ -75,21 +98,15 @@ def manage_webhook_data(_queue):
                 log.warning("Queue length at %s! This may be causing a"
                             "significant delay in notifications.", size)
         # Distribute events to the other managers
-        data = _queue.get(block=True)
-        obj = Events.event_factory(data)
-        if obj is None:  # TODO: Improve Event error checking
+        data = _queue.get()
+        if len(processes) == 0:
+            distribute_webhook(data, routing, world_state, duplicates, log)
             continue
-        for name, mgr in managers.items():
-            if isinstance(obj, list):
-                for event in obj:
-                    mgr.update(event)
-                    log.debug("Distributed event %s to %s managers.",
-                              event.id, len(managers))
-            else:
-                mgr.update(obj)
-        if not isinstance(obj, list):
-            log.debug("Distributed event %s to %s managers.",
-                      obj.id, len(managers))
+        # Forward the raw webhook to the processes, which parse it
+        if admit_webhook(data, routing, duplicates) == Events.DROP:
+            continue
+        for proc in processes:
+            proc.send(data)
 
 
 # Check for update
@@ -449,11 +466,15 @@ def parse_settings(root_path):
     # Manager Settings
     parser.add_argument(
         '-m', '--manager_count', type=int, default=1,
-        help='Number of Manager processes to start.')
+        help='Number of Managers to start.')
     parser.add_argument(
         '-M', '--manager_name',
         action='append', default=[],
-        help='Names of Manager processes to start.')
+        help='Names of Managers to start.')
+    parser.add_argument(
+        '-mp', '--manager-processes', type=int, default=0,
+        help='Number of processes to run the Managers in, splitting them '
+             + "evenly. 0 runs them in the webserver's process. default: 0")
     parser.add_argument(
         '-mll', '--mgr-log-lvl', type=int, choices=[1, 2, 3, 4, 5],
         action='append', default=[3],
@@ -468,6 +489,16 @@ def parse_settings(root_path):
     parser.add_argument(
         '-mlc', '--mgr-log-ct', type=int, action='append', default=[5],
         help="Maximum number of old manager's logs to keep before deletion.")
+    parser.add_argument(
+        '-mw', '--mgr-workers', type=int, action='append', default=[1],
+        help="Number of events a manager may process at once. Events of the "
+             + "same monster, gym, stop or weather cell are processed in "
+             + "order. default: 1")
+    parser.add_argument(
+        '-mbs', '--mgr-batch-size', type=int, action='append', default=[1],
+        help="Number of queued events a manager may take at once, to work "
+             + "out their distances and run cheap filter checks on them "
+             + "together. default: 1")
     # Files
     parser.add_argument(
         '-f', '--filters', action='append',
@@ -485,6 +516,20 @@ def parse_settings(root_path):
         '-gf', '--geofences',
         action='append', default=[None],
         help='Alarms configuration file. default: None')
+    parser.add_argument(
+        '-gcl', '--geofence-cell-level', type=int, default=0,
+        choices=range(0, 31), metavar='[0-30]',
+        help='Level of the S2 cells used to cover geofences, so points '
+             + 'inside or outside them are found without a raycast. '
+             + '0 disables coverings. default: 0')
+    parser.add_argument(
+        '-gcs', '--geofence-cache-size', type=int, default=10000,
+        help='Number of points whose geofences are remembered by each '
+             + 'manager. 0 disables it. default: 10000')
+    parser.add_argument(
+        '-gr', '--geo-routing', action='store_true', default=False,
+        help='Only send events to the managers whose filters accept events '
+             + 'at their location, based on the geofences of the filters.')
 
     # Location Specific
     parser.add_argument(
@@ -524,18 +569,107 @@ def parse_settings(root_path):
         '--gmaps-dm-transit', type=parse_boolean, action='append',
         default=[None], help='Enable Transit Distance Matrix DTS.')
 
+    # PvP
+    parser.add_argument(
+        '-pl', '--pvp-league', type=parse_league, action='append',
+        default=[],
+        help="Additional league to calculate PvP info for, in the format "
+             + "'name:cp_limit'. Ex: 'little:500'")
+    parser.add_argument(
+        '-plc', '--pvp-level-cap', type=int, default=50,
+        choices=[40, 41, 50, 51],
+        help='Highest level monsters may be powered up to for PvP info.')
+    parser.add_argument(
+        '-pcs', '--pvp-cache-size', type=int, default=256,
+        help='Maximum number of PvP rank tables kept in memory.')
+
+    # Cache Settings
+    parser.add_argument(
+        '-cms', '--cache-map-size', type=int, default=200000,
+        help='Maximum number of items kept in each map of gym, weather and '
+             + 'quest information, forgetting the least recently used ones. '
+             + '0 keeps them all. default: 200000')
+    parser.add_argument(
+        '-cml', '--cache-map-limit', type=parse_map_limit, action='append',
+        default=[],
+        help="Maximum number of items of a single map, in the format "
+             + "'name:size'. Ex: 'quest_reward:500000'")
+    parser.add_argument(
+        '-ids', '--ingest-dedup-size', type=int, default=100000,
+        help='Maximum number of recent webhooks remembered to drop their '
+             + 'repeats before they are parsed. default: 100000')
+    parser.add_argument(
+        '-idt', '--ingest-dedup-ttl', type=int, default=600,
+        help='Seconds a webhook is remembered after it was last seen. '
+             + '0 disables dropping repeats. default: 600')
+    parser.add_argument(
+        '-iqs', '--ingest-queue-size', type=int, default=0,
+        help='Maximum number of webhooks waiting to be processed. '
+             + '0 for no limit. default: 0')
+    parser.add_argument(
+        '-iqo', '--ingest-queue-overflow', default='shed',
+        choices=Events.ingest_overflow_options,
+        help="Action taken when the ingest queue is full. 'shed' drops the "
+             + "webhooks of the types listed first in the shed order, "
+             + "'reject' answers with 503 so scanners send them again "
+             + "later (requests larger than the queue are taken, and shed, "
+             + "when it is empty). default: shed")
+    parser.add_argument(
+        '-iso', '--ingest-shed-order',
+        default=','.join(Events.default_shed_order),
+        help='Comma separated types of webhooks, from the first to the last '
+             + 'shed when the ingest queue is full. Other types are shed '
+             + 'first. default: ' + ', '.join(Events.default_shed_order))
+    parser.add_argument(
+        '-pm', '--priority-mode', default='fifo',
+        choices=Events.priority_options,
+        help="Order in which webhooks and the events of managers are "
+             + "processed. 'fifo' keeps the order they were received, "
+             + "'weighted' lets each type take turns by its weight, and "
+             + "'strict' always processes types with a higher weight first. "
+             + "default: fifo")
+    parser.add_argument(
+        '-pw', '--priority-weight', action='append', default=[],
+        type=Events.parse_priority_weight,
+        help="Weight of a type of webhook (and of its events), in the "
+             + "format 'type:weight'. Types default to a weight of 1, "
+             + "except " + ", ".join("{}:{}".format(kind, weight) for
+                                     kind, weight in
+                                     Events.default_weights.items()))
+    parser.add_argument(
+        '-edf', '--deadline-first', action='store_true', default=False,
+        help='Managers process the events that expire first (like monsters '
+             + 'about to despawn) first, instead of using the priority mode.')
+    parser.add_argument(
+        '-af', '--adaptive-filters', action='store_true', default=False,
+        help='Filters run the checks that reject the most events for their '
+             + 'cost first, measuring them as events are processed.')
+
     # Misc
     parser.add_argument(
         '-ct', '--cache_type', action='append',
         default=['mem'], choices=cache_options,
         help="Specify the type of cache to use. Options: "
-             + "['mem', 'file'] (Default: 'mem')")
+             + "['mem', 'file', 'journal', 'sqlite'] (Default: 'mem')")
     parser.add_argument(
         '-tl', '--timelimit', type=int, default=[0], action='append',
         help='Minimum limit')
     parser.add_argument(
         '-ma', '--max_attempts', type=int, default=[3], action='append',
         help='Maximum attempts an alarm makes to send a notification.')
+    parser.add_argument(
+        '-ac', '--alarm-concurrency', type=int, default=[1], action='append',
+        help='Number of notifications each alarm may send at once.')
+    parser.add_argument(
+        '-aq', '--alarm-queue-size', type=int, default=[1000],
+        action='append',
+        help='Maximum notifications waiting to be sent by each alarm.')
+    parser.add_argument(
+        '-ao', '--alarm-overflow', action='append',
+        default=['drop_oldest'], choices=overflow_options,
+        help="Action taken when an alarm's queue is full. Options: "
+             + "['drop_oldest', 'drop_new', 'block'] "
+             + "(Default: 'drop_oldest')")
 
     args = parser.parse_args()
 
@@ -578,6 +712,18 @@ def parse_settings(root_path):
     config['PORT'] = args.port
     config['CONCURRENCY'] = args.concurrency
     config['DEBUG'] = args.debug
+    config['PVP_LEAGUES'] = args.pvp_league
+    config['PVP_LEVEL_CAP'] = args.pvp_level_cap
+    config['PVP_CACHE_SIZE'] = args.pvp_cache_size
+    config['GEOFENCE_CELL_LEVEL'] = args.geofence_cell_level
+    config['GEOFENCE_CACHE_SIZE'] = args.geofence_cache_size
+    config['CACHE_MAP_SIZE'] = args.cache_map_size
+    config['CACHE_MAP_LIMITS'] = args.cache_map_limit
+    for name, _ in args.cache_map_limit:
+        if name not in Cache.map_names + WorldState.table_names:
+            log.critical("'{}' is not a cache map! Valid maps are: {}".format(
+                name, ", ".join(Cache.map_names + WorldState.table_names)))
+            sys.exit(1)
 
     # Check to make sure that the same number of arguments are included
     for arg in [args.gmaps_key, args.filters, args.alarms, args.rules,
@@ -586,7 +732,9 @@ def parse_settings(root_path):
                 args.timezone, args.gmaps_rev_geocode, args.gmaps_dm_walk,
                 args.gmaps_dm_bike, args.gmaps_dm_drive,
                 args.gmaps_dm_transit, args.mgr_log_lvl, args.mgr_log_size,
-                args.mgr_log_file]:
+                args.mgr_log_file, args.mgr_workers, args.mgr_batch_size,
+                args.alarm_concurrency, args.alarm_queue_size,
+                args.alarm_overflow]:
         if len(arg) > 1:  # Remove defaults from the list
             arg.pop(0)
         size = len(arg)
@@ -611,6 +759,13 @@ def parse_settings(root_path):
                       + "/List_of_tz_database_time_zones")
             sys.exit(1)
 
+    if args.manager_processes < 0:
+        log.critical("Number of manager processes can't be negative!")
+        sys.exit(1)
+    if args.manager_processes > 0 and not hasattr(os, 'fork'):
+        log.critical("Manager processes are not supported on this platform!")
+        sys.exit(1)
+
     # Pad manager_name to match manager_count
     while len(args.manager_name) < args.manager_count:
         m_ct = len(args.manager_name)
@@ -618,6 +773,29 @@ def parse_settings(root_path):
 
     # Check for a data update before building the managers
     check_for_update()
+    # Load the game data, rebuilding its snapshot if the data has changed
+    get_game_data()
+
+    # Build the queue of webhooks waiting to be processed
+    global data_queue
+    priority_weights = dict(Events.default_weights)
+    priority_weights.update(args.priority_weight)
+    data_queue = Events.IngestQueue(
+        args.ingest_queue_size, args.ingest_queue_overflow,
+        [kind.strip() for kind in args.ingest_shed_order.split(',')],
+        args.priority_mode, priority_weights)
+
+    # Build the filter for repeated webhooks
+    global duplicates
+    duplicates = Events.DuplicateFilter(
+        args.ingest_dedup_size, args.ingest_dedup_ttl)
+
+    # Build the state shared by all managers, saved unless caches are 'mem'
+    # (with manager processes, each process keeps the state of its managers)
+    global world_state
+    persist = any(kind != 'mem' for kind in args.cache_type)
+    if args.manager_processes == 0:
+        world_state = WorldState(persist)
 
     # Build the managers
     for m_ct in range(args.manager_count):
@@ -639,7 +817,21 @@ def parse_settings(root_path):
             location=get_from_list(args.location, m_ct, args.location[0]),
             geofence_file=get_from_list(
                 args.geofences, m_ct, args.geofences[0]),
-            debug=config['DEBUG']
+            debug=config['DEBUG'],
+            alarm_concurrency=get_from_list(
+                args.alarm_concurrency, m_ct, args.alarm_concurrency[0]),
+            alarm_queue_size=get_from_list(
+                args.alarm_queue_size, m_ct, args.alarm_queue_size[0]),
+            alarm_overflow=get_from_list(
+                args.alarm_overflow, m_ct, args.alarm_overflow[0]),
+            workers=get_from_list(
+                args.mgr_workers, m_ct, args.mgr_workers[0]),
+            priority_mode=args.priority_mode,
+            priority_weights=priority_weights,
+            deadline_first=args.deadline_first,
+            batch_size=get_from_list(
+                args.mgr_batch_size, m_ct, args.mgr_batch_size[0]),
+            adaptive_filters=args.adaptive_filters
         )
 
         m.set_log_level(get_from_list(
@@ -680,8 +872,26 @@ def parse_settings(root_path):
             sys.exit(1)
         log.info("----------- Finished setting up '{}'".format(
             args.manager_name[m_ct]))
-    for m_name in managers:
-        managers[m_name].start()
+    # Decide which managers need each type of webhook
+    global routing
+    routing = Events.RoutingTable(managers.values(), args.geo_routing)
+    log.info("Webhook routes: %s", routing.get_routes())
+    if args.geo_routing:
+        log.info("Events sent to managers by geofence: %s",
+                 routing.get_coverage())
+
+    if args.manager_processes == 0:
+        world_state.migrate(managers)
+        for m_name in managers:
+            managers[m_name].start()
+    else:  # Split the managers evenly between the processes
+        mgrs = list(managers.values())
+        count = min(args.manager_processes, len(mgrs))
+        for i in range(count):
+            processes.append(ManagerProcess(
+                i, mgrs[i::count], args.geo_routing, persist))
+        for proc in processes:
+            proc.start()
 
     # Set up signal handlers for graceful exit
     signal_handler(signal.SIGINT, exit_gracefully, signal.SIGINT, None)
@@ -697,10 +907,17 @@ def exit_gracefully(signum, frame):
     log.debug(f"Signal {signal.Signals(signum).name} received")
     log.info("PokeAlarm is closing down!")
     server.stop()
-    for m_name in managers:
-        managers[m_name].stop()
-    for m_name in managers:
-        managers[m_name].join()
+    if len(processes) == 0:
+        for m_name in managers:
+            managers[m_name].stop()
+        for m_name in managers:
+            managers[m_name].join()
+        world_state.save()
+    else:
+        for proc in processes:
+            proc.stop()
+        for proc in processes:
+            proc.join()
     log.info("PokeAlarm exited!")
     exit(0)
 
@@ -0,0 +1,120 @@
+import logging
+import unittest
+import gevent
+from gevent.event import Event
+from PokeAlarm.Alarms import Dispatcher
+
+
+class MockManager(object):
+    """ Mock manager for dispatcher unit testing. """
+
+    def get_child_logger(self, name):
+        return logging.getLogger('test').getChild(name)
+
+
+class MockAlarm(object):
+    """ Alarm recording what it sends, failing for 'bad' notifications. """
+
+    def __init__(self):
+        self.sent = []
+        self.ready = Event()
+        self.ready.set()
+
+    def pokemon_alert(self, dts):
+        self.ready.wait()
+        if dts == 'bad':
+            raise ValueError("Unable to send.")
+        self.sent.append(dts)
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def gen_dispatcher(self, **kwargs):
+        self.alarm = MockAlarm()
+        return Dispatcher(MockManager(), 'test', self.alarm, **kwargs)
+
+    def test_drop_oldest(self):
+        # Fill a small queue past its size, before any worker runs
+        disp = self.gen_dispatcher(queue_size=3, overflow='drop_oldest')
+        for i in range(5):
+            self.assertTrue(disp.put('pokemon_alert', i))
+
+        # Test the newest notifications were kept
+        disp.start()
+        disp.stop()
+        self.assertEqual(self.alarm.sent, [2, 3, 4])
+        stats = disp.get_stats()
+        self.assertEqual(stats['queued'], 5)
+        self.assertEqual(stats['dropped'], 2)
+        self.assertEqual(stats['sent'], 3)
+        self.assertEqual(stats['max_depth'], 3)
+        self.assertEqual(stats['depth'], 0)
+
+    def test_drop_new(self):
+        # Fill a small queue past its size, before any worker runs
+        disp = self.gen_dispatcher(queue_size=3, overflow='drop_new')
+        kept = [disp.put('pokemon_alert', i) for i in range(5)]
+        self.assertEqual(kept, [True, True, True, False, False])
+
+        # Test the oldest notifications were kept
+        disp.start()
+        disp.stop()
+        self.assertEqual(self.alarm.sent, [0, 1, 2])
+        stats = disp.get_stats()
+        self.assertEqual(stats['queued'], 3)
+        self.assertEqual(stats['dropped'], 2)
+        self.assertEqual(stats['sent'], 3)
+
+    def test_block(self):
+        # Fill a small queue past its size, before any worker runs
+        disp = self.gen_dispatcher(queue_size=2, overflow='block')
+        putter = gevent.spawn(
+            lambda: [disp.put('pokemon_alert', i) for i in range(3)])
+        gevent.sleep(0.01)
+        self.assertFalse(putter.ready())
+        self.assertEqual(disp.get_stats()['depth'], 2)
+
+        # Test the blocked notification is queued once there is room
+        disp.start()
+        self.assertEqual(putter.get(timeout=1), [True, True, True])
+        disp.stop()
+        self.assertEqual(self.alarm.sent, [0, 1, 2])
+        stats = disp.get_stats()
+        self.assertEqual(stats['queued'], 3)
+        self.assertEqual(stats['dropped'], 0)
+
+    def test_failed(self):
+        disp = self.gen_dispatcher()
+        for dts in ('good', 'bad', 'good'):
+            disp.put('pokemon_alert', dts)
+        disp.start()
+        disp.stop()
+        self.assertEqual(self.alarm.sent, ['good', 'good'])
+        stats = disp.get_stats()
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(stats['failed'], 1)
+
+    def test_stop_timeout(self):
+        # Start sending notifications the alarm is stuck on
+        disp = self.gen_dispatcher()
+        self.alarm.ready.clear()
+        disp.start()
+        for i in range(3):
+            disp.put('pokemon_alert', i)
+        gevent.sleep(0)
+
+        # Test stopping gives up on them after the timeout
+        with self.assertLogs('test', 'WARNING'):
+            disp.stop(timeout=0.1)
+        self.assertEqual(self.alarm.sent, [])
+        self.assertEqual(disp.get_stats()['depth'], 2)
+        self.assertEqual(disp._workers, [])
+
+    def test_invalid_settings(self):
+        self.assertRaises(ValueError, self.gen_dispatcher, concurrency=0)
+        self.assertRaises(ValueError, self.gen_dispatcher, queue_size=0)
+        self.assertRaises(ValueError, self.gen_dispatcher, overflow='drop')
+
+
+if __name__ == '__main__':
+    unittest.main()
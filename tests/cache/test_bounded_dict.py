@@ -0,0 +1,59 @@
+import pickle
+import unittest
+from PokeAlarm import config
+from PokeAlarm.Cache.BoundedDict import BoundedDict, new_map, \
+    parse_map_limit
+
+
+class TestBoundedDict(unittest.TestCase):
+
+    def tearDown(self):
+        config.pop('CACHE_MAP_SIZE', None)
+        config.pop('CACHE_MAP_LIMITS', None)
+
+    def test_evicts_least_recently_used(self):
+        d = BoundedDict(3)
+        for i in range(3):
+            d['gym{}'.format(i)] = i
+        self.assertEqual(d.get('gym0'), 0)  # Now the most recently used
+        d['gym3'] = 3
+        self.assertNotIn('gym1', d)
+        self.assertEqual(sorted(d), ['gym0', 'gym2', 'gym3'])
+        self.assertEqual(d.get_stats()['evicted'], 1)
+
+    def test_unlimited(self):
+        d = BoundedDict(0)
+        for i in range(1000):
+            d[i] = i
+        self.assertEqual(len(d), 1000)
+
+    def test_memory(self):
+        d = BoundedDict(2)
+        self.assertEqual(d.get_stats()['bytes'], 0)
+        d['a'] = 'x' * 1000
+        self.assertGreater(d.get_stats()['bytes'], 1000)
+        d['a'] = 1
+        self.assertLess(d.get_stats()['bytes'], 1000)
+        one = d.get_stats()['bytes']
+        d['b'] = 2
+        d['c'] = 3  # Evicts 'a'
+        del d['b']
+        self.assertEqual(d.get_stats()['bytes'], one)
+        del d['c']
+        self.assertEqual(d.get_stats()['bytes'], 0)
+
+    def test_copy_and_pickle(self):
+        d = BoundedDict(2, [('a', 1), ('b', 2)])
+        for other in (d.copy(), pickle.loads(pickle.dumps(d))):
+            self.assertEqual(list(other.items()), [('a', 1), ('b', 2)])
+            other['c'] = 3
+            self.assertEqual(list(other), ['b', 'c'])
+        self.assertEqual(list(d), ['a', 'b'])
+
+    def test_new_map(self):
+        config['CACHE_MAP_SIZE'] = 10
+        config['CACHE_MAP_LIMITS'] = [parse_map_limit('gym_name: 20')]
+        self.assertEqual(new_map('gym_team').get_stats()['capacity'], 10)
+        self.assertEqual(new_map('gym_name').get_stats()['capacity'], 20)
+        with self.assertRaises(ValueError):
+            parse_map_limit('gym_name')
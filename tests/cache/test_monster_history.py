@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+import pickle
+import unittest
+from PokeAlarm.Cache import Cache, MonsterHistory
+from tests.filters import MockManager
+
+
+class TestMonsterHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def test_get_and_set(self):
+        hist = MonsterHistory()
+        self.assertIsNone(hist.get('1234567890.1_0'))
+        self.assertNotIn('1234567890.1_0', hist)
+        hist['1234567890.1_0'] = self.now
+        self.assertEqual(hist.get('1234567890.1_0'), self.now)
+        self.assertIn('1234567890.1_0', hist)
+        # Same encounter with another weather is a different key
+        self.assertIsNone(hist.get('1234567890.1_3'))
+        hist['1234567890.1_0'] = self.now + timedelta(minutes=5)
+        self.assertEqual(
+            hist.get('1234567890.1_0'), self.now + timedelta(minutes=5))
+        self.assertEqual(len(hist), 1)
+
+    def test_rounds_up_to_the_second(self):
+        hist = MonsterHistory()
+        hist['enc'] = self.now + timedelta(microseconds=1)
+        self.assertEqual(hist.get('enc'), self.now + timedelta(seconds=1))
+        hist['enc'] = self.now
+        self.assertEqual(hist.get('enc'), self.now)
+
+    def test_grows(self):
+        hist = MonsterHistory()
+        count = MonsterHistory.min_capacity * 3
+        for i in range(count):
+            hist['{}_0'.format(i)] = self.now + timedelta(seconds=i)
+        self.assertEqual(len(hist), count)
+        self.assertGreater(hist.get_capacity(), count)
+        for i in range(count):
+            self.assertEqual(hist.get('{}_0'.format(i)),
+                             self.now + timedelta(seconds=i))
+
+    def test_clean(self):
+        hist = MonsterHistory()
+        for i in range(100):
+            hist['{}_0'.format(i)] = self.now + timedelta(minutes=i - 50)
+        removed = sum(hist.clean(self.now))
+        self.assertEqual(removed, 50)
+        self.assertEqual(len(hist), 50)
+        for i in range(100):
+            self.assertEqual(hist.get('{}_0'.format(i)) is None, i < 50)
+        # Only the slots of the minutes that passed are checked again
+        self.assertEqual(list(hist.clean(self.now)), [])
+        # Removed slots can be used again
+        for i in range(50):
+            hist['{}_0'.format(i)] = self.now
+        self.assertEqual(len(hist), 100)
+
+    def test_reuses_removed_slots(self):
+        hist = MonsterHistory()
+        for n in range(10):
+            for i in range(500):
+                hist['{}_{}'.format(n, i)] = self.now - timedelta(minutes=2)
+            sum(hist.clean(self.now))
+        self.assertEqual(len(hist), 0)
+        # Removed slots don't make the table grow
+        self.assertLessEqual(
+            hist.get_capacity(), 2 * MonsterHistory.min_capacity)
+
+    def test_clean_changed(self):
+        # Test entries whose expiration changed are kept until it passes
+        hist = MonsterHistory()
+        hist['enc'] = self.now - timedelta(minutes=10)
+        hist['enc'] = self.now + timedelta(minutes=10)
+        self.assertEqual(sum(hist.clean(self.now)), 0)
+        self.assertIn('enc', hist)
+        self.assertEqual(sum(hist.clean(self.now + timedelta(minutes=12))), 1)
+        self.assertNotIn('enc', hist)
+
+    def test_clean_while_growing(self):
+        # Test slots moved by a resize during a clean are still cleaned
+        hist = MonsterHistory()
+        for i in range(500):
+            hist['old_{}'.format(i)] = self.now - timedelta(minutes=5)
+        cleaning = hist.clean(self.now)
+        next(cleaning)
+        for i in range(2 * MonsterHistory.min_capacity):
+            hist['new_{}'.format(i)] = self.now + timedelta(minutes=5)
+        sum(cleaning)
+        sum(hist.clean(self.now))
+        self.assertEqual(len(hist), 2 * MonsterHistory.min_capacity)
+        self.assertIsNone(hist.get('old_1'))
+
+    def test_copy_and_pickle(self):
+        hist = MonsterHistory()
+        hist['enc'] = self.now
+        for other in (hist.copy(), pickle.loads(pickle.dumps(hist))):
+            self.assertEqual(other.get('enc'), self.now)
+            other['enc2'] = self.now
+            self.assertIsNone(hist.get('enc2'))
+
+    def test_cache_monster_expiration(self):
+        cache = Cache(MockManager())
+        key = '1234567890.1_0'
+        later = self.now + timedelta(minutes=5)
+        self.assertIsNone(cache.monster_expiration(key))
+        self.assertEqual(cache.monster_expiration(key, later), later)
+        self.assertEqual(cache.monster_expiration(key), later)
+        cache.monster_expiration('old_0', self.now - timedelta(minutes=5))
+        cache._clean_hist()
+        self.assertIsNone(cache.monster_expiration('old_0'))
+        self.assertEqual(cache.monster_expiration(key), later)
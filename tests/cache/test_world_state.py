@@ -0,0 +1,62 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from PokeAlarm import config
+from PokeAlarm.Cache import WorldState
+
+
+class TestWorldState(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        root_path = config['ROOT_PATH']
+        config['ROOT_PATH'] = self.root
+        self.addCleanup(config.__setitem__, 'ROOT_PATH', root_path)
+        os.makedirs(os.path.join(self.root, "cache"))
+
+    def write_file_cache(self, name, data):
+        path = os.path.join(self.root, "cache", "{}.cache".format(name))
+        with open(path, 'wb') as f:
+            pickle.dump(data, f)
+
+    def test_file(self):
+        cache = os.path.join(self.root, "cache")
+        self.assertEqual(WorldState(persist=True)._file,
+                         os.path.join(cache, "world_state.cache"))
+        self.assertEqual(WorldState(True, "world_state_3")._file,
+                         os.path.join(cache, "world_state_3.cache"))
+        self.assertIsNone(WorldState()._file)
+
+    def test_migrates_file_caches(self):
+        # Create the file caches of older versions
+        self.write_file_cache('mgr_0', {
+            'gym_team': {'gym1': 2}, 'gym_name': {'gym1': 'Statue'},
+            'cell_weather_id': {'cell1': 3}})
+        self.write_file_cache('mgr_1', {'gym_image': {'gym2': 'gym.png'}})
+
+        # Test a new store takes in their gym and weather info
+        world = WorldState(persist=True)
+        world.migrate(['mgr_0', 'mgr_1', 'mgr_2'])
+        self.assertEqual(world.gym_name('gym1'), 'Statue')
+        self.assertEqual(world.gym_image('gym2'), 'gym.png')
+        self.assertEqual(world.cell_weather_id('cell1'), 3)
+
+        # Test a saved store is not migrated again
+        world.gym_name('gym1', 'Fountain')
+        world.save()
+        world = WorldState(persist=True)
+        world.migrate(['mgr_0'])
+        self.assertEqual(world.gym_name('gym1'), 'Fountain')
+
+    def test_no_migration_without_persist(self):
+        self.write_file_cache('mgr_0', {'gym_name': {'gym1': 'Statue'}})
+        world = WorldState()
+        world.migrate(['mgr_0'])
+        self.assertNotEqual(world.gym_name('gym1'), 'Statue')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from PokeAlarm.Events import DuplicateFilter, get_identity
+
+
+def gen_raid(**fields):
+    message = {'gym_id': 'gym1', 'pokemon_id': 150, 'start': 100, 'end': 200,
+               'name': 'Statue', 'team_id': 1}
+    message.update(fields)
+    return {'type': 'raid', 'message': message}
+
+
+class TestDuplicateFilter(unittest.TestCase):
+
+    def test_repeats(self):
+        duplicates = DuplicateFilter(10, 60)
+        key = get_identity(gen_raid())
+        self.assertFalse(duplicates.is_repeat(key))
+        duplicates.remember(key)
+        self.assertTrue(duplicates.is_repeat(get_identity(gen_raid())))
+        self.assertEqual(duplicates.get_stats()['dropped'], {'raid': 1})
+
+    def test_gym_updates(self):
+        # Test raids with new details of their gym aren't repeats
+        duplicates = DuplicateFilter(10, 60)
+        duplicates.remember(get_identity(gen_raid()))
+        for update in ({'name': 'Fountain'}, {'description': 'Old'},
+                       {'url': 'gym.png'}, {'team_id': 2}):
+            self.assertFalse(
+                duplicates.is_repeat(get_identity(gen_raid(**update))))
+
+    def test_disabled(self):
+        duplicates = DuplicateFilter(10, 0)
+        key = get_identity(gen_raid())
+        duplicates.remember(key)
+        self.assertFalse(duplicates.is_repeat(key))
+        self.assertIsNone(get_identity({'type': 'weather', 'message': {}}))
+
+
+if __name__ == '__main__':
+    unittest.main()
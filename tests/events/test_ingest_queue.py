@@ -0,0 +1,45 @@
+import unittest
+from PokeAlarm.Events import IngestQueue
+
+
+def gen_frames(kind, count):
+    return [{'type': kind, 'message': {'id': i}} for i in range(count)]
+
+
+class TestIngestQueue(unittest.TestCase):
+
+    def test_reject(self):
+        queue = IngestQueue(4, 'reject')
+        self.assertTrue(queue.put_frames(gen_frames('pokemon', 3)))
+        self.assertFalse(queue.put_frames(gen_frames('pokemon', 2)))
+        self.assertEqual(queue.qsize(), 3)
+        self.assertTrue(queue.put_frames(gen_frames('pokemon', 1)))
+        self.assertEqual(queue.qsize(), 4)
+        self.assertEqual(
+            queue.get_stats()['shed'], {'pokemon': {'rejected': 2}})
+
+    def test_reject_large_request(self):
+        # Test a request larger than the queue is taken when it is empty
+        queue = IngestQueue(4, 'reject')
+        frames = gen_frames('raid', 2) + gen_frames('weather', 4)
+        self.assertTrue(queue.put_frames(frames))
+        self.assertEqual(queue.qsize(), 4)
+        self.assertEqual(sorted(queue.get()['type'] for _ in range(4)),
+                         ['raid', 'raid', 'weather', 'weather'])
+        self.assertEqual(
+            queue.get_stats()['shed'], {'weather': {'shed': 2}})
+
+    def test_shed(self):
+        queue = IngestQueue(3, 'shed')
+        self.assertTrue(queue.put_frames(gen_frames('pokemon', 2)))
+        self.assertTrue(queue.put_frames(gen_frames('weather', 1)))
+        # Test new webhooks push out those of types shed before them
+        self.assertTrue(queue.put({'type': 'raid', 'message': {}}))
+        self.assertFalse(queue.put({'type': 'weather', 'message': {}}))
+        self.assertEqual(queue.qsize(), 3)
+        self.assertEqual(queue.get_stats()['shed'],
+                         {'weather': {'evicted': 1, 'shed': 1}})
+
+
+if __name__ == '__main__':
+    unittest.main()
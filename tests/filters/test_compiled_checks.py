@@ -0,0 +1,67 @@
+import copy
+import unittest
+from PokeAlarm.Filters import BaseFilter
+import tests.filters.test_egg_filter as test_egg_filter
+import tests.filters.test_grunt_filter as test_grunt_filter
+import tests.filters.test_gym_filter as test_gym_filter
+import tests.filters.test_monster_filter as test_monster_filter
+import tests.filters.test_quest_filter as test_quest_filter
+import tests.filters.test_raid_filter as test_raid_filter
+import tests.filters.test_stop_filter as test_stop_filter
+import tests.filters.test_weather_filter as test_weather_filter
+
+
+def record(filt, func, event):
+    """ Returns the result of func(event), and what the filter logged. """
+    logged = []
+    filt.reject = lambda *args: logged.append(('reject',) + args)
+    filt.accept = lambda *args: logged.append(('accept',) + args)
+    try:
+        return func(event), logged
+    finally:
+        del filt.reject, filt.accept
+
+
+class CompiledParityTest(object):
+    """ Runs the tests of a filter, checking every event both with the
+    compiled checks and by running each check in turn. """
+
+    def setUp(self):
+        super(CompiledParityTest, self).setUp()
+        check_event = BaseFilter.check_event
+
+        def check_both(filt, event):
+            interpreted = record(filt, filt._interpret_event, event)
+            compiled = record(
+                filt, lambda e: check_event(filt, e), event)
+            self.assertEqual(interpreted, compiled)
+            return compiled[0]
+
+        def restore():
+            BaseFilter.check_event = check_event
+
+        BaseFilter.check_event = check_both
+        self.addCleanup(restore)
+
+    def gen_filter(self, settings):
+        # Filters use up their settings, which the other tests still need
+        return super(CompiledParityTest, self).gen_filter(
+            copy.deepcopy(settings))
+
+
+def add_parity_tests(*modules):
+    """ Adds a parity test for each filter test case of the modules. """
+    for module in modules:
+        for name, case in list(vars(module).items()):
+            if isinstance(case, type) and issubclass(case, unittest.TestCase):
+                name = name.replace('Test', 'TestCompiled', 1)
+                globals()[name] = type(name, (CompiledParityTest, case), {})
+
+
+add_parity_tests(test_egg_filter, test_grunt_filter, test_gym_filter,
+                 test_monster_filter, test_quest_filter, test_raid_filter,
+                 test_stop_filter, test_weather_filter)
+
+
+if __name__ == '__main__':
+    unittest.main()
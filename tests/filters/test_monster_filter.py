@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 import time
 import unittest
 import PokeAlarm.Filters as Filters
+from PokeAlarm.Filters.BaseFilter import compile_checks
 import PokeAlarm.Events as Events
 from PokeAlarm.Geofence import load_geofence_file
 from tests.filters import MockManager, generic_filter_test, full_filter_test
@@ -268,6 +269,72 @@ class TestMonsterFilter(unittest.TestCase):
         self.assertTrue(not_missing.check_event(info_event))
         self.assertFalse(missing.check_event(info_event))
 
+    def test_check_batch(self):
+        # Create the filter
+        filt = self.gen_filter({
+            "monsters": [1, 4], "min_atk": 10, "max_dist": 1000,
+            "max_def": 5})
+
+        # Test a batch, with some events missing info
+        events = []
+        for mon_id, atk, def_ in [(1, 15, 0), (1, 5, 0), (7, 15, 0),
+                                  (4, None, 15), (4, 12, None), (1, 10, 6)]:
+            events.append(self.gen_event({
+                "pokemon_id": mon_id, "individual_attack": atk,
+                "individual_defense": def_, "individual_stamina": 0}))
+        dists = [500, 500, 500, 500, 2000, 500]
+        columns = Filters.EventColumns(events, {'distance': dists})
+        rejects = filt.check_batch(columns)
+        self.assertEqual(rejects, [
+            None, ('atk_iv', 5, 10), ('monster_id', 7, {1, 4}),
+            ('def_iv', 15, 5), ('distance', 2000, 1000.0),
+            ('def_iv', 6, 5)])
+        for event, dist, reject in zip(events, dists, rejects):
+            event.distance = dist
+            if reject is not None:
+                self.assertFalse(filt.check_event(event))
+
+    def test_adaptive_order(self):
+        # Create the filters, checking the most selective limit last
+        settings = {"min_lvl": 1, "min_cp": 10, "min_atk": 15,
+                    "is_missing_info": False}
+        filt = self.gen_filter(dict(settings))
+        filt.set_adaptive(True)
+        filt.sample_interval, filt.reorder_interval = 1, 8
+
+        # Test the checks are reordered, with the same results
+        events = []
+        for i in range(64):
+            events.append(self.gen_event({
+                "pokemon_level": 20, "cp": None if i % 4 == 1 else 100,
+                "individual_attack": 15 if i % 8 == 0 else 3,
+                "individual_defense": 0, "individual_stamina": 0}))
+        for event in events:
+            self.assertEqual(filt.check_event(event),
+                             filt._interpret_event(event))
+        self.assertEqual(filt._order[0]._attr_name, 'atk_iv')
+        self.assertEqual([attr for attr, _ in filt.get_check_stats()][0],
+                         'atk_iv')
+        passed = [e for e in events if filt.check_event(e)]
+        self.assertEqual(len(passed), 8)
+
+    def test_adaptive_order_errors(self):
+        # Create the filter, and compile its checks with the last one first
+        filt = self.gen_filter({"min_lvl": 10, "min_atk": 15})
+        checks = filt._check_list
+        compiled = compile_checks(checks[::-1], 'reordered', checks)
+        rejected = []
+        filt.reject = lambda event, attr, *args: rejected.append(attr)
+
+        # Test an error is only raised if the usual order would raise it
+        event = self.gen_event({"pokemon_level": 5})
+        event.atk_iv = 'invalid'
+        self.assertFalse(compiled(filt, event))
+        self.assertEqual(rejected, ['mon_lvl'])
+        event.mon_lvl = 20
+        self.assertRaises(TypeError, compiled, filt, event)
+        self.assertEqual(rejected, ['mon_lvl'])
+
     @generic_filter_test
     def test_cp(self):
         self.filt = {'min_cp': 20, 'max_cp': 500}
@@ -0,0 +1,85 @@
+""" Benchmark cleaning expired items out of a large Cache.
+
+Fills the monster history of a Cache with a number of encounters expiring
+over the next hour (a tenth of them already expired), then compares a full
+scan of the slots of the history against its expiry wheel. It also reports
+the longest time the cleaning held up a greenlet that wants to run meanwhile.
+The wheel leaves items expiring during the current minute for the next clean,
+so slightly more items remain after it.
+
+Usage: python tools/bench_cache.py [entries]
+"""
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+class FakeManager(object):
+    def get_child_logger(self, name):
+        return logging.getLogger(name)
+
+
+def full_scan(hist):
+    """ Removes expired items by checking every slot of the history. """
+    keys, expirations = hist._keys, hist._expirations
+    now = (datetime.utcnow() - datetime(1970, 1, 1)) // timedelta(seconds=1)
+    for i in range(len(keys)):
+        if keys[i] > 1 and expirations[i] < now:
+            keys[i] = 1
+            hist._used -= 1
+            hist._removed += 1
+
+
+def fill(cache, entries):
+    now = datetime.utcnow()
+    for i in range(entries):
+        # A tenth of the encounters have already expired
+        seconds = (i % 3600) - 360
+        cache.monster_expiration(
+            '{}_0'.format(i), now + timedelta(seconds=seconds))
+
+
+def run(label, func):
+    """ Runs func in a greenlet, while another one measures its latency. """
+    gaps = []
+
+    def ticker():
+        last = time.perf_counter()
+        while True:
+            gevent.sleep(0)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    tick = gevent.spawn(ticker)
+    gevent.sleep(0)
+    start = time.perf_counter()
+    gevent.spawn(func).join()
+    elapsed = time.perf_counter() - start
+    tick.kill()
+    print("{:<12} {:.3f}s, longest pause of other greenlets {:.3f}s".format(
+        label, elapsed, max(gaps)))
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import gevent
+    from PokeAlarm.Cache import Cache
+
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    cache = Cache(FakeManager())
+    start = time.perf_counter()
+    fill(cache, entries)
+    print("filled {} entries in {:.3f}s".format(
+        entries, time.perf_counter() - start))
+    hist = cache._mon_hist.copy()
+
+    run("full scan", lambda: full_scan(hist))
+    run("expiry wheel", cache._clean_hist)
+    print("remaining: full scan {}, expiry wheel {}".format(
+        len(hist), len(cache._mon_hist)))
+    run("again", cache._clean_hist)
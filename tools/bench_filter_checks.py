@@ -0,0 +1,101 @@
+""" Benchmark checking events against filters.
+
+Builds monster filters with many constraints (the kind of IV, level, PvP,
+move and distance limits used in practice), then checks the same monsters
+against each filter, first running each check of the filter in turn, then
+with the checks compiled into one function, and last with the checks also
+ordered by how they fare (after a round to measure them). Most monsters are
+rejected, some only by the last of the checks, and a few pass.
+
+Usage: python tools/bench_filter_checks.py [events] [rounds]
+"""
+import logging
+import os
+import random
+import sys
+import time
+
+FILTERS = {
+    'hundos': {'min_iv': 100, 'min_lvl': 1, 'max_dist': 5000},
+    'strong': {
+        'min_atk': 13, 'min_def': 13, 'min_sta': 13, 'min_iv': 90,
+        'min_lvl': 20, 'max_lvl': 35, 'min_cp': 1000, 'max_cp': 5000,
+        'min_dist': 0, 'max_dist': 2000, 'min_time_left': 300,
+        'min_weight': 0, 'max_weight': 1000, 'min_height': 0,
+        'max_height': 100},
+    'rares': {
+        'monsters': [3, 6, 9, 131, 143, 147, 148, 149], 'min_iv': 0,
+        'max_dist': 1000, 'genders': ['male', 'female'],
+        'is_missing_info': False},
+    'great_league': {'min_great': 95, 'quick_moves': ['Vine Whip']}
+}
+
+
+def gen_events(count):
+    rand = random.Random(0)
+    events = []
+    for i in range(count):
+        mon = Events.MonEvent({
+            "encounter_id": str(i),
+            "spawnpoint_id": "0",
+            "pokemon_id": rand.randint(1, 151),
+            "pokemon_level": rand.randint(1, 35),
+            "latitude": 37.7876146,
+            "longitude": -122.390624,
+            "disappear_time": int(time.time()) + 1800,
+            "cp": rand.randint(10, 3000),
+            "individual_attack": rand.randint(0, 15),
+            "individual_defense": rand.randint(0, 15),
+            "individual_stamina": rand.randint(0, 15),
+            "move_1": rand.choice([214, 216, 217, 218, 219, 221]),
+            "move_2": 13,
+            "height": 1.0,
+            "weight": 10.0,
+            "gender": 1
+        })
+        mon.distance = rand.uniform(0, 3000)
+        mon.name = str(mon.monster_id)
+        events.append(mon)
+    return events
+
+
+def run(filters, events, rounds, check):
+    """ Returns the number of filter checks made per second. """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for filt in filters:
+            for event in events:
+                check(filt, event)
+    return rounds * len(filters) * len(events) / (
+        time.perf_counter() - start)
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import PokeAlarm.Events as Events
+    from PokeAlarm.Filters import MonFilter, BaseFilter
+
+    class BenchManager(object):
+        def get_child_logger(self, name):
+            return logging.getLogger('bench').getChild(name)
+
+    logging.basicConfig(level=logging.WARNING)
+    event_ct = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    filters = [MonFilter(BenchManager(), name, dict(settings))
+               for name, settings in FILTERS.items()]
+    constraints = sum(len(f._check_list) for f in filters)
+
+    print("{} events, {} filters, {} checks".format(
+        event_ct, len(filters), constraints))
+    for label, check in [("check list", BaseFilter._interpret_event),
+                         ("compiled", BaseFilter.check_event),
+                         ("adaptive", BaseFilter.check_event)]:
+        if label == "adaptive":
+            for filt in filters:
+                filt.set_adaptive(True)
+            run(filters, gen_events(event_ct), 1, check)
+        events = gen_events(event_ct)  # PvP info is only found once
+        rate = run(filters, events, rounds, check)
+        print("{:<12} {:>10.0f} filter checks/s".format(label, rate))
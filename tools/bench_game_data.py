@@ -0,0 +1,46 @@
+""" Benchmark loading the static game data used by PokeAlarm.
+
+Reports how long it takes to build the GameData store from the files in the
+data folder, how long it takes to load it from its snapshot instead, and how
+much memory the loaded store keeps.
+
+Usage: python tools/bench_game_data.py [repeat]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from PokeAlarm.GameData import GameData
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        GameData.load()
+        timings.append(time.perf_counter() - start)
+    print("load: best {:.3f}s, mean {:.3f}s over {} runs".format(
+        min(timings), sum(timings) / len(timings), repeat))
+
+    GameData.load_snapshot()  # Make sure the snapshot is up to date
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        GameData.load_snapshot()
+        timings.append(time.perf_counter() - start)
+    print("snapshot: best {:.3f}s, mean {:.3f}s over {} runs".format(
+        min(timings), sum(timings) / len(timings), repeat))
+
+    gc.collect()
+    tracemalloc.start()
+    data = GameData.load()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    print("memory: {:.1f} MB retained, {:.1f} MB peak while loading".format(
+        current / 1e6, peak / 1e6))
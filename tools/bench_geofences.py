@@ -0,0 +1,127 @@
+""" Benchmark finding the geofences that contain a point.
+
+Builds a grid of district-like geofences with many points each, then
+compares a linear scan over every geofence (bounding box test and a raycast
+over all of its edges) against a lookup with the GeofenceIndex, both with
+and without S2 cell coverings. Lookups in the index comparisons are not
+remembered; a last run repeats the points of a few hundred stops to show the
+effect of remembering them.
+
+Usage:
+python tools/bench_geofences.py [districts] [points] [lookups] [cell_level]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+
+def gen_geofences(districts, points):
+    """ Returns districts tiling a city, each with jagged borders. """
+    rand = random.Random(0)
+    side = int(math.ceil(math.sqrt(districts)))
+    geofences = []
+    for i in range(districts):
+        center_x = 40.0 + (i // side) * 0.02
+        center_y = -74.0 + (i % side) * 0.02
+        coords = []
+        for j in range(points):
+            angle = 2 * math.pi * j / points
+            radius = 0.012 * rand.uniform(0.8, 1.0)
+            coords.append([center_x + radius * math.cos(angle),
+                           center_y + radius * math.sin(angle)])
+        geofences.append(('district{}'.format(i), coords))
+    return geofences, side
+
+
+def linear_contains(points, x, y):
+    """ Raycast over every edge, as Geofence.contains used to do. """
+    min_x = min(p[0] for p in points)
+    max_x = max(p[0] for p in points)
+    min_y = min(p[1] for p in points)
+    max_y = max(p[1] for p in points)
+    if max_x < x or x < min_x or max_y < y or y < min_y:
+        return False
+    inside = False
+    p1x, p1y = points[0]
+    n = len(points)
+    for i in range(1, n + 1):
+        p2x, p2y = points[i % n]
+        if min(p1y, p2y) < y <= max(p1y, p2y) and x <= max(p1x, p2x):
+            if p1y != p2y:
+                xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+            if p1x == p2x or x <= xinters:
+                inside = not inside
+        p1x, p1y = p2x, p2y
+    return inside
+
+
+class LinearScan(object):
+    """ Precomputes the boxes, so only the scan itself is measured. """
+
+    def __init__(self, geofences):
+        self._geofences = []
+        for name, points in geofences:
+            self._geofences.append((
+                name, points,
+                min(p[0] for p in points), max(p[0] for p in points),
+                min(p[1] for p in points), max(p[1] for p in points)))
+
+    def get_containing(self, x, y):
+        found = []
+        for name, points, min_x, max_x, min_y, max_y in self._geofences:
+            if max_x < x or x < min_x or max_y < y or y < min_y:
+                continue
+            if linear_contains(points, x, y):
+                found.append(name)
+        return found
+
+
+def run(label, func, coords):
+    start = time.perf_counter()
+    results = [func(x, y) for x, y in coords]
+    elapsed = time.perf_counter() - start
+    print("{:<16} {:>10.0f} lookups/s ({:.3f}s for {})".format(
+        label, len(coords) / elapsed, elapsed, len(coords)))
+    return results
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from PokeAlarm.Geofence import Geofence, GeofenceIndex
+
+    districts = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    lookups = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    cell_level = int(sys.argv[4]) if len(sys.argv) > 4 else 16
+    geofences, side = gen_geofences(districts, points)
+
+    indexes = {}
+    for level in sorted({0, cell_level}):
+        start = time.perf_counter()
+        indexes[level] = GeofenceIndex(
+            ((name, Geofence(name, coords, level))
+             for name, coords in geofences), cache_size=0)
+        print("index with cell level {} built in {:.3f}s ({} geofences, {} "
+              "points each)".format(level, time.perf_counter() - start,
+                                    districts, points))
+    linear = LinearScan(geofences)
+
+    rand = random.Random(1)
+    coords = [(rand.uniform(39.99, 40.0 + side * 0.02),
+               rand.uniform(-74.01, -74.0 + side * 0.02))
+              for _ in range(lookups)]
+    expected = run("linear scan", linear.get_containing, coords)
+    for level, index in indexes.items():
+        actual = run("index, level {}".format(level),
+                     index.get_containing, coords)
+        print("results match: {}".format(expected == [
+            list(containing) for containing in actual]))
+
+    stops = coords[:300]
+    remembered = GeofenceIndex(indexes[0].items(), cache_size=1000)
+    run("index, remembered", remembered.get_containing,
+        [rand.choice(stops) for _ in range(lookups)])
+    print("stats: {}".format(remembered.get_stats()))
@@ -0,0 +1,94 @@
+""" Benchmark the throughput of a manager taking its events in batches.
+
+Builds a manager with a handful of typical monster filters (IVs, levels,
+monster ids and distances), which reject most monsters, and queues the same
+IV-bearing monsters scattered around its location for it at each batch size.
+Each run ends once the manager has stopped, so the time taken by an empty run
+(mostly the manager waiting for its queue to time out) is subtracted.
+
+Usage: python tools/bench_manager_batches.py [webhooks] [batch sizes...]
+"""
+import os
+import random
+import sys
+import time
+
+FILTERS = {
+    'perfect': {'min_iv': 100},
+    'nearby_rares': {'monsters': [3, 6, 9, 131, 143, 147, 148, 149],
+                     'max_dist': 1000},
+    'high_level': {'min_lvl': 30, 'min_iv': 90},
+    'nundo': {'max_atk': 0, 'max_def': 0, 'max_sta': 0}
+}
+
+
+def gen_webhooks(count):
+    rand = random.Random(0)
+    webhooks = []
+    for i in range(count):
+        webhooks.append({'type': 'pokemon', 'message': {
+            "encounter_id": str(i),
+            "spawnpoint_id": "0",
+            "pokemon_id": rand.randint(1, 151),
+            "pokemon_level": rand.randint(1, 35),
+            "latitude": 37.7876146 + rand.uniform(-0.05, 0.05),
+            "longitude": -122.390624 + rand.uniform(-0.05, 0.05),
+            "disappear_time": int(time.time()) + 1800,
+            "cp": 500,
+            "individual_attack": rand.randint(0, 15),
+            "individual_defense": rand.randint(0, 15),
+            "individual_stamina": rand.randint(0, 15),
+            "move_1": 221,
+            "move_2": 13,
+            "height": 1.0,
+            "weight": 10.0,
+            "gender": 1
+        }})
+    return webhooks
+
+
+def build_manager(batch_size):
+    mgr = Manager(
+        name="Manager_0", google_key=None, locale='en', units='metric',
+        timezone=None, time_limit=0, max_attempts=1,
+        location='37.7876146,-122.390624', cache_type='mem',
+        geofence_file=None, debug=False, batch_size=batch_size)
+    mgr.set_log_level(1)
+    mgr.set_monsters_enabled(True)
+    for name, settings in FILTERS.items():
+        mgr.add_monster_filter(name, dict(settings))
+    return mgr
+
+
+def run(webhooks, batch_size):
+    """ Returns the seconds taken to process the webhooks and stop. """
+    mgr = build_manager(batch_size)
+    events = [Events.event_factory(data) for data in webhooks]
+    start = time.perf_counter()
+    for event in events:
+        mgr.update(event)
+    mgr.start()
+    mgr.stop()
+    mgr.join()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import logging
+    import PokeAlarm.Events as Events
+    from PokeAlarm.Manager import Manager
+
+    logging.basicConfig(level=logging.WARNING)
+    webhook_ct = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sizes = [int(s) for s in sys.argv[2:]] or [1, 16, 64, 256]
+    webhooks = gen_webhooks(webhook_ct)
+
+    print("{} webhooks, {} filters".format(webhook_ct, len(FILTERS)))
+    idle = run([], 1)
+    for size in sizes:
+        busy = run(webhooks, size)
+        elapsed = max(busy - idle, 1e-9)
+        print("{:<16} {:>8.0f} events/s ({:.2f}s, {:.2f}s idle)".format(
+            "batches of {}".format(size), webhook_ct / elapsed, busy, idle))
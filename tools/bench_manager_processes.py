@@ -0,0 +1,119 @@
+""" Benchmark the throughput of managers run in separate processes.
+
+Builds a number of managers, each with monster filters checking PvP ranks,
+and hands them the same IV-bearing webhooks, first with every manager in
+this process and then split between 1 to N ManagerProcess. Each run ends
+once every manager has stopped, so the time taken by an empty run (mostly
+the managers waiting for their queues to time out) is subtracted. The
+speedup is limited by the number of cores of the host.
+
+Usage: python tools/bench_manager_processes.py [managers] [webhooks] [max]
+"""
+import os
+import random
+import sys
+import time
+
+import gevent
+
+
+def gen_webhooks(count, monster_ids):
+    rand = random.Random(0)
+    webhooks = []
+    for i in range(count):
+        webhooks.append({'type': 'pokemon', 'message': {
+            "encounter_id": str(i),
+            "spawnpoint_id": "0",
+            "pokemon_id": rand.choice(monster_ids),
+            "pokemon_level": rand.randint(1, 35),
+            "latitude": 37.7876146,
+            "longitude": -122.390624,
+            "disappear_time": int(time.time()) + 1800,
+            "cp": 500,
+            "individual_attack": rand.randint(0, 15),
+            "individual_defense": rand.randint(0, 15),
+            "individual_stamina": rand.randint(0, 15),
+            "move_1": 221,
+            "move_2": 13,
+            "height": 1.0,
+            "weight": 10.0,
+            "gender": 1
+        }})
+    return webhooks
+
+
+def build_managers(count):
+    managers = []
+    for i in range(count):
+        mgr = Manager(
+            name="Manager_{}".format(i), google_key=None, locale='en',
+            units='metric', timezone=None, time_limit=0, max_attempts=1,
+            location='37.7876146,-122.390624', cache_type='mem',
+            geofence_file=None, debug=False)
+        mgr.set_log_level(1)
+        mgr.set_monsters_enabled(True)
+        mgr.add_monster_filter('great', {'max_great': 100 + i})
+        mgr.add_monster_filter('ultra', {'max_ultra': 100 + i})
+        managers.append(mgr)
+    return managers
+
+
+def run(managers, webhooks, processes):
+    """ Returns the seconds taken to process the webhooks and stop. """
+    start = time.perf_counter()
+    if processes == 0:
+        routing = Events.RoutingTable(managers)
+        world_state = WorldState()
+        duplicates = Events.DuplicateFilter(0, 0)
+        for mgr in managers:
+            mgr.start()
+        for data in webhooks:
+            distribute_webhook(data, routing, world_state, duplicates, log)
+            gevent.sleep(0)
+        for mgr in managers:
+            mgr.stop()
+        for mgr in managers:
+            mgr.join()
+    else:
+        procs = [ManagerProcess(i, managers[i::processes])
+                 for i in range(processes)]
+        for proc in procs:
+            proc.start()
+        for data in webhooks:
+            for proc in procs:
+                proc.send(data)
+        for proc in procs:
+            proc.stop()
+        for proc in procs:
+            proc.join()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import logging
+    import PokeAlarm.Events as Events
+    from PokeAlarm.Cache import WorldState
+    from PokeAlarm.Manager import Manager
+    from PokeAlarm.ManagerProcess import ManagerProcess, distribute_webhook
+    from PokeAlarm.Utils import get_raw_form_names, get_best_great_product
+
+    logging.basicConfig(level=logging.WARNING)
+    log = logging.getLogger('bench')
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    webhook_ct = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    max_procs = int(sys.argv[3]) if len(sys.argv) > 3 else count
+    monster_ids = [id_ for id_ in sorted(get_raw_form_names().keys())
+                   if get_best_great_product(id_, 0) is not None]
+    webhooks = gen_webhooks(webhook_ct, monster_ids)
+
+    print("{} managers, {} webhooks, {} cores".format(
+        count, webhook_ct, os.cpu_count()))
+    for procs in range(0, min(max_procs, count) + 1):
+        idle = run(build_managers(count), [], procs)
+        busy = run(build_managers(count), webhooks, procs)
+        elapsed = max(busy - idle, 1e-9)
+        print("{:<22} {:>8.0f} webhooks/s ({:.2f}s, {:.2f}s idle)".format(
+            "{} processes".format(procs) if procs else "in server process",
+            webhook_ct / elapsed, busy, idle))
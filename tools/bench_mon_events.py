@@ -0,0 +1,63 @@
+""" Benchmark the cost of building Monster Events from IV-bearing webhooks.
+
+Compares building events alone (PvP info is lazy and never used) against
+building events and reading a PvP field (the cost every event used to pay).
+
+Usage: python tools/bench_mon_events.py [count]
+"""
+import os
+import random
+import sys
+import time
+
+
+def gen_webhooks(count, monster_ids):
+    rand = random.Random(0)
+    webhooks = []
+    for i in range(count):
+        webhooks.append({
+            "encounter_id": str(i),
+            "spawnpoint_id": "0",
+            "pokemon_id": rand.choice(monster_ids),
+            "pokemon_level": rand.randint(1, 35),
+            "latitude": 37.7876146,
+            "longitude": -122.390624,
+            "disappear_time": int(time.time()) + 1800,
+            "cp": 500,
+            "individual_attack": rand.randint(0, 15),
+            "individual_defense": rand.randint(0, 15),
+            "individual_stamina": rand.randint(0, 15),
+            "move_1": 221,
+            "move_2": 13,
+            "height": 1.0,
+            "weight": 10.0,
+            "gender": 1
+        })
+    return webhooks
+
+
+def run(label, webhooks, use_pvp):
+    start = time.perf_counter()
+    for data in webhooks:
+        event = Events.MonEvent(data)
+        if use_pvp:
+            event.great_product
+    elapsed = time.perf_counter() - start
+    print("{:<24} {:>8.0f} events/s ({:.3f}s for {})".format(
+        label, len(webhooks) / elapsed, elapsed, len(webhooks)))
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import PokeAlarm.Events as Events
+    from PokeAlarm.Utils import get_raw_form_names, get_best_great_product
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    monster_ids = [id_ for id_ in sorted(get_raw_form_names().keys())
+                   if get_best_great_product(id_, 0) is not None]
+    webhooks = gen_webhooks(count, monster_ids)
+
+    run("warm up", webhooks[:100], True)
+    run("lazy (no PvP access)", webhooks, False)
+    run("eager (PvP accessed)", webhooks, True)
@@ -0,0 +1,61 @@
+""" Benchmark the memory taken by the history of monsters.
+
+Fills the history with a number of live spawns, keyed the way
+Manager.process_monster does, and compares the dict of str keys and
+datetimes that used to hold it against the MonsterHistory table. Memory is
+measured with tracemalloc, and includes the keys and expirations themselves.
+
+Usage: python tools/bench_monster_history.py [spawns]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+now = datetime.utcnow().replace(microsecond=0)
+
+
+def gen_keys(spawns):
+    """ Yields keys and expirations of spawns, like in process_monster. """
+    for i in range(spawns):
+        enc_id = 10000000000000000000 + i * 7919
+        weight = 10.0 + (i % 997) / 100.0
+        weather_id = i % 8
+        yield (f'{enc_id}{weight}_{weather_id}',
+               now + timedelta(seconds=i % 3600))
+
+
+def run(label, hist, spawns):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for key, expiration in gen_keys(spawns):
+        hist[key] = expiration
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    keys = [key for key, _ in gen_keys(spawns)]
+    start = time.perf_counter()
+    for key in keys:
+        hist.get(key)
+    lookups = time.perf_counter() - start
+    print("{:<16} {:>8.1f} MB ({:>4.0f} bytes per spawn), {:>7.0f} "
+          "inserts/s, {:>7.0f} lookups/s".format(
+              label, size / 2 ** 20, size / spawns, spawns / elapsed,
+              spawns / lookups))
+    return hist
+
+
+if __name__ == '__main__' and __package__ is None:
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from PokeAlarm.Cache import MonsterHistory
+
+    spawns = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    print("{} spawns".format(spawns))
+    old = run("dict", {}, spawns)
+    new = run("MonsterHistory", MonsterHistory(), spawns)
+    print("results match: {}".format(all(
+        new.get(key) == old.get(key) for key, _ in gen_keys(spawns))))
@@ -1,7 +1,6 @@
 import json
 import sys
 import os
-import itertools
 import requests
 
 
@@ -27,75 +26,37 @@ class PVP:
             for form_id_ in monster_forms[id_]:
                 monster_products[id_][form_id_] = {}
                 for limit in [1500, 2500]:
-                    highest, lowest = self.spreads(
-                        limit, id_, form_id_, utils.min_level(
-                            limit, id_, form_id_),
-                        utils.max_level(limit, id_, form_id_), cp_multipliers)
+                    highest = PvpUtils.get_rank_table(
+                        id_, form_id_, limit, 50).best_product
+                    lowest = self.lowest_product(
+                        id_, form_id_, utils.min_level(limit, id_, form_id_),
+                        cp_multipliers)
 
                     monster_products[id_
                                      ][form_id_]["{}_highest_product".format(
-                                         limit)] = highest["product"]
+                                         limit)] = highest
                     monster_products[id_][form_id_]["{}_lowest_product".format(
-                        limit)] = lowest["product"]
+                        limit)] = lowest
 
                     print("{}_{}: highest product at {}: {}".format(
-                        id_, form_id_, limit, highest['product']))
+                        id_, form_id_, limit, highest))
                     print("{}_{}: lowest product at {}: {}".format(
-                        id_, form_id_, limit, lowest['product']))
+                        id_, form_id_, limit, lowest))
 
         with open(pa_root + "/tools/generated_stat_products.json", "w+") as f:
             json.dump(monster_products, f, indent=2)
             f.close()
 
     @staticmethod
-    def spreads(limit, monster_id, form_id, min_level, max_level,
-                cp_multipliers):
-        smallest = {"product": 999999999}
-        highest = {"product": 0}
-
-        for level in range(int(min_level * 2), int((max_level + 0.5) * 2)):
-            level = str(level / 2).replace('.0', '')
-
-            for stat_product in \
-                    itertools.product(range(16), range(16), range(16)):
-                cp = utils.calculate_cp(monster_id, form_id, stat_product[0],
-                                        stat_product[1], stat_product[2],
-                                        level)
-                if cp > limit:
-                    continue
-                base_stats = utils.get_base_stats(monster_id, form_id)
-                attack = ((base_stats["attack"] + stat_product[0]) * (
-                    cp_multipliers[str(level)]))
-                defense = ((base_stats["defense"] + stat_product[1]) * (
-                    cp_multipliers[str(level)]))
-                stamina = int(((base_stats["stamina"] + stat_product[2]) * (
-                    cp_multipliers[str(level)])))
-                product = (attack * defense * stamina)
-                if product > highest["product"]:
-                    highest.update({
-                        'product': product,
-                        'attack': attack,
-                        'defense': defense,
-                        'stamina': stamina,
-                        'atk': stat_product[0],
-                        'de': stat_product[1],
-                        'sta': stat_product[2],
-                        'cp': cp,
-                        'level': level
-                    })
-                if product < smallest["product"]:
-                    smallest.update({
-                        'product': product,
-                        'attack': attack,
-                        'defense': defense,
-                        'stamina': stamina,
-                        'atk': stat_product[0],
-                        'de': stat_product[1],
-                        'sta': stat_product[2],
-                        'cp': cp,
-                        'level': level
-                    })
-        return highest, smallest
+    def lowest_product(monster_id, form_id, min_level, cp_multipliers):
+        # Product only grows with IVs and level, so 0/0/0 at min_level is
+        # the lowest
+        level = str(min_level).replace('.0', '')
+        base_stats = utils.get_base_stats(monster_id, form_id)
+        attack = base_stats["attack"] * cp_multipliers[level]
+        defense = base_stats["defense"] * cp_multipliers[level]
+        stamina = int(base_stats["stamina"] * cp_multipliers[level])
+        return attack * defense * stamina
 
 
 if __name__ == '__main__' and __package__ is None:
@@ -103,5 +64,6 @@ if __name__ == '__main__' and __package__ is None:
         os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     import PokeAlarm.Utils as utils
+    from PokeAlarm.Utilities import PvpUtils
 
     PVP(root)
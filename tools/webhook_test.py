@@ -250,8 +250,8 @@ def cache_or_invalid():
     if os.path.exists(os.path.join(path, "cache", f"{cache_input}.cache")):
         file = os.path.join(path, "cache", "{cache_input}.cache")
         print(f"Valid file: {file}")
-    elif os.path.exists(os.path.join(path, "cache", "manager_0.cache")):
-        file = os.path.join(path, "cache", "manager_0.cache")
+    elif os.path.exists(os.path.join(path, "cache", "world_state.cache")):
+        file = os.path.join(path, "cache", "world_state.cache")
         print(f"Invalid file, using default: {file}")
     else:
         print("No valid cache file found, terminating..")